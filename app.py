@@ -2,28 +2,57 @@
 """
 Main application using pywebview with Flask backend
 """
-import json
+import multiprocessing
+import sys
+
+if __name__ == '__main__':
+    # Exécutable PyInstaller relancé comme processus enfant (pool de
+    # vérification, worker de traduction): rien de l'application n'est
+    # initialisé, et stdout reste réservé au protocole du worker
+    multiprocessing.freeze_support()
+    if '--translation-worker' in sys.argv:
+        from src.backend.translation_worker import worker_main
+        worker_main()
+        sys.exit(0)
+
+# pylint: disable=wrong-import-position
 import os
 import shutil
 import subprocess
-import sys
 import threading
 import time
 import tkinter as tk
 from pathlib import Path
-from subprocess import CalledProcessError
 from tkinter import filedialog
 from typing import Callable, List, Optional, Tuple
 
 import webview
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 from src.backend.backup_manager import BackupManager
+from src.backend.batch import MAX_BATCH_SIZE, BatchDispatcher
+from src.backend.compression import init_compression, send_static_asset
+from src.backend.event_bus import EventBus
+from src.backend.extraction import extract_game, extracted_roots
+from src.backend.file_content import FileContentStore
+from src.backend.game_inventory import GameScanner
+from src.backend.reconstruction import reconstruct_game
+from src.backend.search import search_game, update_search_index
+from src.backend.settings_schema import settings_schema
+from src.backend.settings_store import SettingsStore
+from src.backend.translation_backends import AUTO_BACKEND, BACKENDS
+from src.backend.translation_jobs import TranslationJobManager
+from src.backend.translation_memory import open_translation_memory
+from src.backend.translation_worker import DEFAULT_MODEL, TranslationWorkerPool
+from src.backend.translator_health import TranslatorHealth
 from src.backend.update_manager import UpdateManager
+from src.backend.verification import verify_game
 from src.backend.config import AppConfig
 
+# pylint: enable=wrong-import-position
+
 # Load environment variables
 load_dotenv()
 
@@ -91,7 +120,12 @@ def get_static_path():
 
 # Flask configuration
 app = Flask(__name__, static_folder=get_static_path(), static_url_path='')
-CORS(app)
+# Origines de l'application (fenêtre pywebview, serveur Vite en développement):
+# une autre page ouverte dans le navigateur n'a pas accès à l'API
+CORS(app, origins=['http://127.0.0.1:5000', 'http://localhost:5000',
+                   'http://127.0.0.1:3000', 'http://localhost:3000'])
+# Fichiers statiques précompressés + cache immuable, compression JSON
+init_compression(app)
 
 # Global variables for communication
 api_data = {
@@ -130,8 +164,49 @@ def wsl_mode_response(endpoint_hint: str):
 # Importer le nouveau gestionnaire de backup
 
 
+# Bus d'événements (Server-Sent Events vers l'interface)
+event_bus = EventBus()
+
+# Exécution groupée des appels API (/api/batch)
+batch_dispatcher = BatchDispatcher(app)
+
+# Workers de traduction persistants (modèle gardé en mémoire entre les runs,
+# un processus par shard quand la traduction est parallélisée)
+translation_worker = TranslationWorkerPool(
+    max_workers=AppConfig.TRANSLATION_MAX_PROCESSES,
+    threads_per_worker=AppConfig.TRANSLATION_THREADS_PER_PROCESS,
+    idle_timeout=AppConfig.TRANSLATION_WORKER_IDLE_TIMEOUT)
+
+# État du traducteur mis en cache (invalidé par .git/HEAD et le cache du modèle)
+translator_health_cache = TranslatorHealth(
+    Path('external/TranslationToolsIA'), translation_worker)
+
+# Mémoire de traduction (lignes déjà traduites, bornée en LRU)
+translation_memory = open_translation_memory(
+    Path(app_base_dir or '.') / '04_Configs' / 'translation_memory.json',
+    AppConfig.TRANSLATION_MEMORY_MAX_ENTRIES)
+
+# Jobs de traduction en arrière-plan (journaux complets dans 02_Reports)
+translation_jobs = TranslationJobManager(
+    translation_worker, Path(app_base_dir or '.') / '02_Reports',
+    event_bus=event_bus, memory=translation_memory,
+    manifest_dir=Path(app_base_dir or '.') / '04_Configs' / 'translation_manifests')
+
 # Initialiser les gestionnaires
-backup_manager = BackupManager()
+backup_manager = BackupManager(event_bus=event_bus)
+
+# Inventaires des fichiers des jeux, revalidés par date des dossiers
+game_scanner = GameScanner()
+
+
+def game_roots():
+    """Jeux dont l'éditeur peut ouvrir les scripts: inventoriés, puis extraits"""
+    yield from game_scanner.roots()
+    yield from extracted_roots(Path(app_base_dir or '.') / '01_Temporary')
+
+
+# Contenu des fichiers de l'éditeur, lu et édité par plages de lignes
+file_contents = FileContentStore(backup_manager, game_roots)
 
 # Initialiser la configuration
 AppConfig.ensure_directories()
@@ -148,10 +223,29 @@ if config_errors:
 update_manager = UpdateManager(
     AppConfig.GITHUB_REPO_OWNER,
     AppConfig.GITHUB_REPO_NAME,
-    AppConfig.APP_VERSION
+    AppConfig.APP_VERSION,
+    event_bus=event_bus
 )
 
 
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Flux Server-Sent Events (topics: updates, translator, backups...)
+
+    Query: ?topics=updates,backups (tous les topics si absent)
+    """
+    topics = [t.strip() for t in request.args.get('topics', '').split(',')]
+    subscription = event_bus.subscribe(topics)
+    return Response(
+        event_bus.stream(subscription),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @app.route('/api/backups', methods=['GET'])
 def get_backups():
     """Liste toutes les sauvegardes avec filtres optionnels"""
@@ -203,6 +297,7 @@ def restore_backup(backup_id):
         os.remove(backup['backup_path'])
         del backup_manager.metadata[backup_id]
         backup_manager.save_metadata()
+        event_bus.publish('backups', {'type': 'restored', 'backup_id': backup_id})
 
         return jsonify({
             'success': True,
@@ -269,6 +364,8 @@ def restore_backup_to(backup_id):
         shutil.copy2(backup['backup_path'], target_path)
 
         print("DEBUG: Restore successful")
+        event_bus.publish('backups', {'type': 'restored', 'backup_id': backup_id,
+                                      'target_path': target_path})
         return jsonify({
             'success': True,
             'message': f'Fichier restauré vers {target_path}'
@@ -303,6 +400,8 @@ def delete_backup(backup_id):
         del backup_manager.metadata[backup_id]
         backup_manager.save_metadata()
 
+        event_bus.publish('backups', {'type': 'deleted', 'backup_id': backup_id})
+
         # Nettoyer les dossiers vides
         backup_manager.cleanup_empty_folders()
 
@@ -394,277 +493,253 @@ def delete_item(item_id):
 # TranslationToolsIA integration
 @app.route('/api/translator/health', methods=['GET'])
 def translator_health():
-    """Vérifie la présence du dépôt TranslationToolsIA et retourne des infos basiques."""
+    """État du traducteur (mis en cache): dépôt TranslationToolsIA, modèle
+    en local et worker chaud ou démarrage à froid."""
     try:
-        repo_path = Path('external/TranslationToolsIA')
-        exists = repo_path.exists()
-        head = None
-        if exists:
-            try:
-                # Lire le commit courant si git est présent
-                result = subprocess.run(
-                    ['git', '-C', str(repo_path), 'rev-parse',
-                     '--short', 'HEAD'],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                head = result.stdout.strip()
-            except (CalledProcessError, FileNotFoundError):
-                head = None
-
-        return jsonify({
-            'success': True,
-            'exists': exists,
-            'gitHead': head
-        })
+        model = request.args.get('model') or DEFAULT_MODEL
+        return jsonify({'success': True, **translator_health_cache.snapshot(model)})
     except (OSError, ValueError) as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/translator/run', methods=['POST'])
 def translator_run():
-    """Lance la traduction via TranslationToolsIA pour un dossier Ren'Py."""
+    """Lance la traduction d'un dossier Ren'Py en tâche de fond (job)."""
     try:
         data = request.get_json() or {}
         input_folder = data.get('inputFolder')
-        recursive = bool(data.get('recursive', True))
-        model_path = data.get('modelPath', 'virusf/nllb-renpy-rory-v4')
-        source_lang = data.get('sourceLang', 'auto')
-        target_lang = data.get('targetLang', 'fra_Latn')
-
         if not input_folder or not os.path.isdir(input_folder):
             return jsonify(
                 {'success': False, 'error': 'Dossier source invalide'}), 400
-
-        repo_path = Path('external/TranslationToolsIA')
-        if not repo_path.exists():
-            return jsonify({
-                'success': False,
-                'error': (
-                    'TranslationToolsIA non installé. '
-                    'Exécutez pnpm run ttia:clone'
-                )
-            }), 400
-
-        # Choisir le script de batch pour un dossier entier, tel que documenté dans le README
-        # Fallback: traducteur_renpy_jeu_complet.py si présent, sinon
-        # traducteur_renpy.py
-        candidate_scripts = [
-            repo_path / 'script' / 'traducteur_renpy_jeu_complet.py',
-            repo_path / 'script' / 'traducteur_renpy.py',
-        ]
-        script_path = None
-        for c in candidate_scripts:
-            if c.exists():
-                script_path = c
-                break
-        if script_path is None:
-            return jsonify({
-                'success': False,
-                'error': 'Script de traduction introuvable dans TranslationToolsIA'
-            }), 500
-
-        # Construire la commande Python
-        # On suppose que le script accepte des arguments standards; si
-        # différent, on adaptera
-        cmd = [
-            sys.executable,
-            str(script_path),
-            '--input-folder', input_folder,
-            '--recursive', str(int(recursive)),
-            '--model', model_path,
-            '--source', source_lang,
-            '--target', target_lang
-        ]
-
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        success = proc.returncode == 0
-        return jsonify({
-            'success': success,
-            'returncode': proc.returncode,
-            'stdout': proc.stdout[-5000:],
-            'stderr': proc.stderr[-5000:],
-        }), (200 if success else 500)
+        if data.get('backend') and data['backend'] not in (AUTO_BACKEND, *BACKENDS):
+            return jsonify(
+                {'success': False, 'error': f"Backend inconnu: {data['backend']}"}), 400
+        try:
+            # Nombre de processus worker (shards traduits en parallèle)
+            processes = max(1, min(int(data.get('processes') or 1),
+                                   AppConfig.TRANSLATION_MAX_PROCESSES))
+            # Textes par appel au modèle et budget de tokens par paquet
+            # (padding compris, 0 = paquets de taille fixe)
+            batch_size = max(1, min(int(data.get('batchSize') or 16), 256))
+            token_budget = max(0, int(data.get('tokenBudget') or 0))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': "'processes', 'batchSize' et "
+                            "'tokenBudget' doivent être des nombres entiers"}), 400
+
+        job = translation_jobs.start({
+            'inputFolder': input_folder,
+            'recursive': bool(data.get('recursive', True)),
+            'modelPath': data.get('modelPath') or DEFAULT_MODEL,
+            'sourceLang': data.get('sourceLang', 'auto'),
+            'targetLang': data.get('targetLang', 'fra_Latn'),
+            # Retraduit tous les fichiers, même inchangés depuis le dernier run
+            'force': bool(data.get('force', False)),
+            'runnerOptions': {
+                'processes': processes,
+                'batch_size': batch_size,
+                'token_budget': token_budget,
+                # Balises Ren'Py protégées par des placeholders pendant la traduction
+                'placeholder_format': settings_store.snapshot()[0].get(
+                    'extraction', {}).get('placeholderFormat'),
+                # Moteur d'inférence: fp32, int8, onnx ou auto (le plus rapide)
+                'backend': data.get('backend') or AUTO_BACKEND,
+            },
+        })
+        return jsonify({'success': True, 'jobId': job.id,
+                        'job': job.to_dict()}), 202
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
     except (OSError, ValueError) as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-# Settings endpoints - Structure mise à jour
-settings_data = {
-    'language': 'fr',
-    'theme': 'dark',
-    'debugActive': False,  # false=Level 3, true=Level 4
-    'translatorFeature': False,
-    'autoOpenings': {
-        'files': True,
-        'folders': True,
-        'reports': False,
-        'outputField': False
-    },
-    'externalTools': {
-        'textEditor': 'VS Code',
-        'translator': ''
-    },
-    'paths': {
-        'renpySdk': '',
-        'editor': ''
-    },
-    'folders': {
-        'temporary': '01_Temporary/',
-        'reports': '02_Reports/',
-        'backups': '03_Backups/',
-        'configs': '04_Configs/'
-    },
-    'extraction': {
-        'placeholderFormat': 'PLACEHOLDER_{n}',
-        'encoding': 'UTF-8'
-    },
-    'colors': {
-        'extractButton': '#3B82F6',
-        'reconstructButton': '#10B981',
-        'verifyButton': '#F59E0B',
-        'accents': '#6366F1'
-    }
-}
+@app.route('/api/translator/jobs', methods=['GET'])
+def translator_jobs():
+    """Liste les jobs de traduction récents."""
+    active = translation_jobs.active
+    return jsonify({'success': True, 'jobs': translation_jobs.list(),
+                    'activeJobId': active.id if active else None})
+
+
+@app.route('/api/translator/jobs/<job_id>', methods=['GET'])
+def translator_job(job_id):
+    """État d'un job de traduction."""
+    job = translation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
+@app.route('/api/translator/jobs/<job_id>/logs', methods=['GET'])
+def translator_job_logs(job_id):
+    """Lignes de log d'un job postérieures au curseur 'since'."""
+    job = translation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', 500, type=int), 2000)
+    return jsonify({'success': True, 'status': job.status,
+                    **job.logs.read(since, limit)})
+
+
+@app.route('/api/translator/jobs/<job_id>/cancel', methods=['POST'])
+def translator_job_cancel(job_id):
+    """Annule un job et tue l'arbre de processus du worker."""
+    job = translation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    if not translation_jobs.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job déjà terminé',
+                        'job': job.to_dict()}), 409
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
+@app.route('/api/translator/memory', methods=['GET', 'DELETE'])
+def translator_memory():
+    """Statistiques (GET) ou vidage (DELETE) de la mémoire de traduction."""
+    if translation_memory is None:
+        return jsonify({'success': True, 'enabled': False})
+    if request.method == 'DELETE':
+        if translation_jobs.active is not None:
+            return jsonify({'success': False,
+                            'error': 'Une traduction est en cours'}), 409
+        translation_memory.clear()
+    return jsonify({'success': True, 'enabled': True,
+                    **translation_memory.stats()})
+
+
+@app.route('/api/extract', methods=['POST'])
+def extract():
+    """Extrait les dialogues et menus d'un jeu Ren'Py vers 01_Temporary."""
+    data = request.get_json() or {}
+    game_path = data.get('gamePath')
+    if not game_path or not os.path.isdir(game_path):
+        return jsonify({'success': False, 'error': 'Dossier du jeu invalide'}), 400
+
+    # Format des placeholders et encodage des scripts (paramètres d'extraction)
+    extraction = settings_store.snapshot()[0].get('extraction', {})
+    # Encodage de chaque script, détecté et mis en cache par l'inventaire
+    inventory = game_scanner.scan(game_path)
+    encodings = {entry['path']: entry['encoding'] for entry in inventory.get('files', [])
+                 if entry['encoding']}
+    result = extract_game(game_path, Path(app_base_dir or '.') / '01_Temporary',
+                          placeholder_format=extraction.get('placeholderFormat'),
+                          encoding=extraction.get('encoding'), encodings=encodings)
+    if result['success']:
+        # Scripts non UTF-8 au-delà de l'échantillon lu par l'inventaire
+        game_scanner.record_encodings(game_path, result['redetected'])
+        # Index de recherche construit en arrière-plan (une recherche l'attend)
+        threading.Thread(target=update_search_index, args=(Path(result['outputDir']),),
+                         daemon=True).start()
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/reconstruct', methods=['POST'])
+def reconstruct():
+    """Recolle les traductions de 01_Temporary dans les scripts du jeu."""
+    data = request.get_json() or {}
+    game_path = data.get('gamePath')
+    if not game_path or not os.path.isdir(game_path):
+        return jsonify({'success': False, 'error': 'Dossier du jeu invalide'}), 400
+
+    result = reconstruct_game(game_path, Path(app_base_dir or '.') / '01_Temporary',
+                              backup_manager)
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/verify', methods=['POST'])
+def verify():
+    """Revérifie les scripts reconstruits; rapport JSON/HTML dans 02_Reports."""
+    data = request.get_json() or {}
+    game_path = data.get('gamePath')
+    if not game_path or not os.path.isdir(game_path):
+        return jsonify({'success': False, 'error': 'Dossier du jeu invalide'}), 400
+
+    result = verify_game(game_path, Path(app_base_dir or '.') / '01_Temporary',
+                         Path(app_base_dir or '.') / '02_Reports')
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/games/scan', methods=['POST'])
+def scan_game():
+    """Inventaire des fichiers .rpy/.rpyc/.rpa d'un jeu (en cache)."""
+    data = request.get_json() or {}
+    game_path = data.get('gamePath')
+    if not game_path or not os.path.isdir(game_path):
+        return jsonify({'success': False, 'error': 'Dossier du jeu invalide'}), 400
+
+    result = game_scanner.scan(game_path)
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Recherche plein texte dans les chaînes extraites d'un jeu (paginée)."""
+    result = search_game(Path(app_base_dir or '.') / '01_Temporary',
+                         request.args.get('game', ''), request.args.get('q', ''),
+                         page=request.args.get('page', 1, type=int),
+                         page_size=request.args.get('pageSize', 50, type=int),
+                         field=request.args.get('field', 'all'))
+    return jsonify(result), 200 if result['success'] else 400
+
+
+@app.route('/api/files/content', methods=['GET', 'PATCH'])
+def file_content():
+    """Lignes start..end d'un fichier (GET) ou remplacement d'une plage de
+    lignes (PATCH, précédé d'une sauvegarde REALTIME_EDIT)."""
+    encoding = settings_store.snapshot()[0].get('extraction', {}).get('encoding')
+    if request.method == 'GET':
+        result = file_contents.read_lines(
+            request.args.get('path'),
+            start=request.args.get('start', 1, type=int),
+            end=request.args.get('end', type=int),
+            encoding=encoding)
+        return jsonify(result), 200 if result['success'] else 400
+
+    data = request.get_json() or {}
+    try:
+        start, end = int(data['start']), int(data['end'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'error': "'start' et 'end' sont requis"}), 400
+    result = file_contents.replace_lines(
+        data.get('path'), start, end, data.get('lines'),
+        version=data.get('version'), encoding=encoding)
+    if result['success']:
+        return jsonify(result)
+    return jsonify(result), 409 if result['conflict'] else 400
+
 
+# Settings endpoints
 # Fichier de configuration persistant
 settings_file_path = Path(app_base_dir or '.') / \
     '04_Configs' / 'app_settings.json'
 
-
-def load_settings_from_disk():
-    """Charge les paramètres depuis le disque si disponible."""
-    try:
-        if settings_file_path.exists():
-            with open(settings_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    sanitized = sanitize_settings_payload(data)
-                    # Mise à jour superficielle (shallow merge) avec données
-                    # propres
-                    for key, value in sanitized.items():
-                        if key in settings_data and isinstance(
-                                settings_data[key],
-                                dict) and isinstance(
-                                value,
-                                dict):
-                            settings_data[key].update(value)
-                        else:
-                            settings_data[key] = value
-    except (OSError, json.JSONDecodeError) as e:
-        print(f"DEBUG: Failed to load settings: {e}")
-
-
-def save_settings_to_disk():
-    """Sauvegarde les paramètres courants sur le disque."""
-    try:
-        settings_file_path.parent.mkdir(parents=True, exist_ok=True)
-        # Écrire un JSON trié pour une diff plus lisible
-        with open(settings_file_path, 'w', encoding='utf-8') as f:
-            json.dump(settings_data, f, ensure_ascii=False,
-                      indent=2, sort_keys=True)
-    except (OSError, TypeError) as e:
-        print(f"DEBUG: Failed to save settings: {e}")
-
-
-def sanitize_settings_payload(payload: dict) -> dict:
-    # pylint: disable=too-many-branches
-    """Nettoie/valide un payload de paramètres et ne retourne que les clés supportées.
-
-    - language: str non vide sinon ignore
-    - theme: 'light' | 'dark' | 'auto'
-    - debugActive: bool
-    - translatorFeature: bool
-    - autoOpenings: sous-clés booleans
-    - externalTools: textEditor/translator str
-    - paths: editor/renpySdk str
-    - folders: temporary/reports/backups/configs str
-    - extraction: placeholderFormat/encoding str
-    """
-    allowed_themes = {'light', 'dark', 'auto'}
-
-    result = {}
-    if not isinstance(payload, dict):
-        return result
-
-    # Simples
-    if isinstance(payload.get('language'),
-                  str) and payload.get('language').strip():
-        result['language'] = payload['language'].strip()
-
-    theme = payload.get('theme')
-    if isinstance(theme, str) and theme in allowed_themes:
-        result['theme'] = theme
-
-    if isinstance(payload.get('debugActive'), bool):
-        result['debugActive'] = payload['debugActive']
-
-    if isinstance(payload.get('translatorFeature'), bool):
-        result['translatorFeature'] = payload['translatorFeature']
-
-    # Objets imbriqués
-    def pick_bools(obj: dict, keys: list[str]) -> dict:
-        return {
-            k: bool(
-                obj[k]) for k in keys if k in obj and isinstance(
-                obj[k],
-                bool)}
-
-    def pick_strs(obj: dict, keys: list[str]) -> dict:
-        picked = {}
-        for k in keys:
-            v = obj.get(k)
-            if isinstance(v, str):
-                picked[k] = v
-        return picked
-
-    auto_openings = payload.get('autoOpenings')
-    if isinstance(auto_openings, dict):
-        picked = pick_bools(
-            auto_openings, ['files', 'folders', 'reports', 'outputField'])
-        if picked:
-            result['autoOpenings'] = picked
-
-    external_tools = payload.get('externalTools')
-    if isinstance(external_tools, dict):
-        picked = pick_strs(external_tools, ['textEditor', 'translator'])
-        if picked:
-            result['externalTools'] = picked
-
-    paths_obj = payload.get('paths')
-    if isinstance(paths_obj, dict):
-        picked = pick_strs(paths_obj, ['editor', 'renpySdk'])
-        if picked:
-            result['paths'] = picked
-
-    folders_obj = payload.get('folders')
-    if isinstance(folders_obj, dict):
-        picked = pick_strs(
-            folders_obj, ['temporary', 'reports', 'backups', 'configs'])
-        if picked:
-            result['folders'] = picked
-
-    extraction_obj = payload.get('extraction')
-    if isinstance(extraction_obj, dict):
-        picked = pick_strs(extraction_obj, ['placeholderFormat', 'encoding'])
-        if picked:
-            result['extraction'] = picked
-
-    return result
-
+# Magasin de paramètres (écriture différée et atomique), validé par le
+# schéma déclaratif compilé au démarrage
+settings_store = SettingsStore(
+    settings_file_path,
+    settings_schema.defaults(),
+    validator=settings_schema.validate,
+    migrator=settings_schema.migrate,
+    schema_version=settings_schema.version
+)
 
 # Charger dès le démarrage
-load_settings_from_disk()
+settings_store.load()
 
 
 @app.route('/api/settings', methods=['GET'])
 def get_settings():
-    """Get current settings"""
-    return jsonify({
+    """Get current settings (304 si l'ETag du client est à jour)"""
+    data, version = settings_store.snapshot()
+    response = jsonify({
         'success': True,
-        'data': settings_data
+        'data': data,
+        'version': version
     })
+    response.set_etag(settings_store.etag(version))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @app.route('/api/settings', methods=['POST'])
@@ -676,28 +751,21 @@ def update_settings():
             return jsonify(
                 {'success': False, 'message': 'No settings provided'}), 400
 
-        # Filtrer, normaliser et merger proprement
-        clean = sanitize_settings_payload(new_settings)
-        for key, value in clean.items():
-            if key not in settings_data:
-                continue
-            if isinstance(
-                    settings_data[key],
-                    dict) and isinstance(
-                    value,
-                    dict):
-                settings_data[key].update(value)
-            else:
-                settings_data[key] = value
-
-        # Sauvegarde sur disque
-        save_settings_to_disk()
+        # Valider, normaliser et merger proprement; l'écriture disque est
+        # regroupée en arrière-plan par le magasin
+        data, version, rejected = settings_store.update(new_settings)
+        if rejected:
+            print(f"DEBUG: Rejected settings keys: {rejected}")
 
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Settings updated successfully',
-            'data': settings_data
+            'data': data,
+            'version': version,
+            'rejected': rejected
         })
+        response.set_etag(settings_store.etag(version))
+        return response
 
     except (ValueError, KeyError, OSError) as e:
         return jsonify({
@@ -934,14 +1002,8 @@ def download_update():
 
         download_url = data['download_url']
 
-        # Fonction de callback pour le progrès (optionnel)
-        def progress_callback(progress, downloaded, total):
-            # Ici on pourrait envoyer des événements WebSocket ou stocker le progrès
-            print(
-                f"Download progress: {progress:.1f}% ({downloaded}/{total} bytes)")
-
-        result = update_manager.download_update(
-            download_url, progress_callback)
+        # La progression est publiée sur le topic 'updates' (/api/events)
+        result = update_manager.download_update(download_url)
         return jsonify(result)
 
     except Exception as e:
@@ -1030,10 +1092,42 @@ def should_auto_check():
         }), 500
 
 
+@app.route('/api/batch', methods=['POST'])
+def batch_requests():
+    """Exécute plusieurs appels API en un seul aller-retour.
+
+    Body JSON attendu:
+    {
+      "requests": [{"id": "settings", "method": "GET", "path": "/api/settings",
+                    "body"?: {...}}],
+      "parallel"?: bool
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'success': False,
+            'error': "Le champ 'requests' doit être une liste non vide"
+        }), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f'Maximum {MAX_BATCH_SIZE} sous-requêtes par lot'
+        }), 400
+
+    responses = batch_dispatcher.dispatch(
+        items, parallel=bool(data.get('parallel', False)))
+    return jsonify({
+        'success': True,
+        'responses': responses
+    })
+
+
 @app.route('/')
 def index():
     """Serve Svelte application"""
-    return app.send_static_file('index.html')
+    return send_static_asset(app, 'index.html')
 
 
 def start_flask():
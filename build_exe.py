@@ -9,6 +9,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from src.backend.compression import brotli, precompress_directory
+
 
 def check_dependencies():
     """Check that all dependencies are installed"""
@@ -51,6 +53,21 @@ def clean_build():
             print(f"OK: Old executable removed: {exe_path}")
 
 
+def precompress_assets():
+    """Precompress frontend assets (gzip, brotli if installed)"""
+    print("Precompressing frontend assets...")
+
+    try:
+        created = precompress_directory(Path("dist"))
+    except OSError as e:
+        print(f"WARNING: Precompression failed: {e}")
+        return
+
+    print(f"OK: {len(created)} precompressed files created")
+    if brotli is None:
+        print("ADVICE: pip install brotli to also produce .br files")
+
+
 def build_executable():
     """Build executable with PyInstaller"""
     print("Building executable...")
@@ -175,6 +192,8 @@ def clean_external_files():
     # Files to remove (as they are now integrated into the executable)
     files_to_remove = [
         Path("dist/index.html"),
+        Path("dist/index.html.gz"),
+        Path("dist/index.html.br"),
         Path("dist/assets"),
     ]
 
@@ -204,6 +223,9 @@ def main():
     # Clean old builds
     clean_build()
 
+    # Precompress static files (served as-is by the Flask backend)
+    precompress_assets()
+
     # Build executable
     if not build_executable():
         print("\nERROR: Executable build failed")
@@ -11,6 +11,8 @@ import json
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from src.backend.event_bus import EventBus
+
 
 class BackupType:
     """Énumération des types de sauvegarde"""
@@ -36,8 +38,9 @@ class BackupManager:
         # Autres types: pas de rotation (None)
     }
 
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, event_bus: Optional[EventBus] = None):
         """Initialise le gestionnaire de sauvegardes"""
+        self.event_bus = event_bus
         if base_dir is None:
             # Déterminer le répertoire de base de l'application
             if getattr(sys, 'frozen', False):
@@ -64,6 +67,11 @@ class BackupManager:
 
         self._load_metadata()
 
+    def _publish(self, data: Dict):
+        """Publie un événement 'backups' si un bus est configuré"""
+        if self.event_bus is not None:
+            self.event_bus.publish('backups', data)
+
     def _normalize_path(self, path: str) -> str:
         """Normalise un chemin pour qu'il soit accessible sur le système actuel"""
         if not path:
@@ -227,10 +235,20 @@ class BackupManager:
 
             print(
                 f"Backup créé: {game_name}/{file_name}/{backup_type}/{backup_filename}")
+            self._publish({
+                'type': 'created',
+                'backup_id': backup_id,
+                'game_name': game_name,
+                'file_name': file_name,
+                'backup_type': backup_type,
+                'size': backup_metadata['size']
+            })
 
         except (OSError, PermissionError, FileNotFoundError, ValueError) as e:
             result['error'] = str(e)
             print(f"Erreur création backup: {e}")
+            self._publish({'type': 'failed', 'source_path': source_path,
+                           'error': str(e)})
 
         return result
 
@@ -264,6 +282,9 @@ class BackupManager:
 
                     # Supprimer des métadonnées si présent
                     self._remove_from_metadata(oldest_file['path'])
+                    self._publish({'type': 'rotated',
+                                   'backup_filename': oldest_file['name'],
+                                   'backup_type': backup_type})
 
                 except (OSError, PermissionError) as e:
                     print(
@@ -449,6 +470,7 @@ class BackupManager:
 
             if cleaned_count > 0:
                 print(f"Nettoyage: {cleaned_count} dossiers vides supprimés")
+                self._publish({'type': 'cleaned', 'count': cleaned_count})
 
             return cleaned_count
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Batch RPC for RenExtract v2
+Exécute plusieurs appels API dans une seule requête HTTP, dans le processus
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from flask import Flask
+from werkzeug.test import EnvironBuilder
+
+# Nombre maximum de sous-requêtes par lot
+MAX_BATCH_SIZE = 32
+
+# Routes qui n'ont pas de sens dans un lot (flux continu, récursion)
+EXCLUDED_PATHS = ('/api/batch', '/api/events')
+
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class BatchDispatcher:
+    """Répartit les sous-requêtes d'un lot vers les routes Flask existantes"""
+
+    def __init__(self, app: Flask, max_workers: int = 4):
+        self.app = app
+        self.max_workers = max_workers
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='batch')
+        return self._executor
+
+    def _validate(self, item: Any) -> str:
+        """Retourne un message d'erreur, ou une chaîne vide si valide"""
+        if not isinstance(item, dict):
+            return 'Sous-requête invalide'
+        path = item.get('path')
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            return "Le champ 'path' doit commencer par /api/"
+        if path.split('?', 1)[0].rstrip('/') in EXCLUDED_PATHS:
+            return f"Route non autorisée dans un lot: {path}"
+        if str(item.get('method', 'GET')).upper() not in ALLOWED_METHODS:
+            return 'Méthode HTTP non supportée'
+        return ''
+
+    def _dispatch_one(self, index: int, item: Any) -> Dict:
+        """Exécute une sous-requête via le routage Flask, sans passer par HTTP"""
+        request_id = item.get('id', index) if isinstance(item, dict) else index
+        error = self._validate(item)
+        if error:
+            return {'id': request_id, 'status': 400,
+                    'body': {'success': False, 'error': error}}
+
+        method = str(item.get('method', 'GET')).upper()
+        builder = EnvironBuilder(
+            path=item['path'],
+            method=method,
+            json=item.get('body') if method != 'GET' else None,
+            headers=item.get('headers') or {},
+        )
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+
+        try:
+            with self.app.request_context(environ):
+                response = self.app.full_dispatch_request()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Une sous-requête en échec ne doit pas faire échouer tout le lot
+            return {'id': request_id, 'status': 500,
+                    'body': {'success': False, 'error': str(e)}}
+
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        result = {'id': request_id, 'status': response.status_code, 'body': body}
+        if response.headers.get('ETag'):
+            result['etag'] = response.headers['ETag']
+        return result
+
+    def dispatch(self, items: List[Any], parallel: bool = False) -> List[Dict]:
+        """Exécute les sous-requêtes (en parallèle si demandé), dans l'ordre"""
+        if parallel and len(items) > 1:
+            futures = [self._get_executor().submit(self._dispatch_one, i, item)
+                       for i, item in enumerate(items)]
+            return [future.result() for future in futures]
+        return [self._dispatch_one(i, item) for i, item in enumerate(items)]
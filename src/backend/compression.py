@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compression et cache HTTP pour RenExtract v2
+- Fichiers statiques précompressés (gzip/brotli) produits au build
+- En-têtes de cache immuables pour les bundles Vite hashés
+- Compression à la volée des réponses JSON volumineuses
+"""
+import gzip
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from flask import Flask, Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # Optionnel: pip install brotli
+except ImportError:
+    brotli = None
+
+# Extensions qui valent la peine d'être compressées
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.map', '.xml'
+}
+
+# Taille minimale (octets) en dessous de laquelle la compression est inutile
+MIN_COMPRESS_SIZE = 1024
+
+# Bundles Vite: assets/index-[hash].js, assets/logo-[hash].webp, ...
+HASHED_ASSET_PATTERN = re.compile(r'(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'no-cache'
+
+
+def _accepts(encoding: str) -> bool:
+    """Le client accepte-t-il 'encoding'? (q-values et '*' pris en compte:
+    'br;q=0' refuse brotli même si '*' est présent)"""
+    return request.accept_encodings[encoding] > 0
+
+
+def precompress_directory(directory: Path, min_size: int = MIN_COMPRESS_SIZE) -> List[Path]:
+    """Génère les variantes .gz (et .br si brotli est installé) des fichiers
+    compressibles d'un dossier. Retourne la liste des fichiers créés."""
+    created = []
+    for file_path in Path(directory).rglob('*'):
+        if not file_path.is_file() or file_path.suffix not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        raw = file_path.read_bytes()
+        if len(raw) < min_size:
+            continue
+
+        variants = [('.gz', gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(raw, quality=11)))
+
+        for suffix, compressed in variants:
+            # Inutile de garder une variante qui ne fait rien gagner
+            if len(compressed) >= len(raw):
+                continue
+            target = file_path.with_name(file_path.name + suffix)
+            target.write_bytes(compressed)
+            created.append(target)
+    return created
+
+
+def _cache_control_for(filename: str) -> str:
+    if HASHED_ASSET_PATTERN.search(filename.replace('\\', '/')):
+        return CACHE_IMMUTABLE
+    return CACHE_REVALIDATE
+
+
+def send_static_asset(app: Flask, filename: str) -> Response:
+    """Sert un fichier statique en privilégiant une variante précompressée"""
+    static_folder = app.static_folder
+    full_path = safe_join(static_folder, filename) if static_folder else None
+    if full_path is None or not os.path.isfile(full_path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding: Optional[str] = None
+    served_path = full_path
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if _accepts(candidate) and os.path.isfile(full_path + suffix):
+            encoding = candidate
+            served_path = full_path + suffix
+            break
+
+    response = send_file(served_path, mimetype=mimetype, conditional=True,
+                         etag=True, max_age=None)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = _cache_control_for(filename)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def compress_response(response: Response, threshold: int = MIN_COMPRESS_SIZE) -> Response:
+    """Compresse à la volée une réponse JSON au-delà d'un certain seuil"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or response.status_code == 204
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    use_brotli = brotli is not None and _accepts('br')
+    if not use_brotli and not _accepts('gzip'):
+        return response
+
+    data = response.get_data()
+    if len(data) < threshold:
+        return response
+
+    if use_brotli:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_compression(app: Flask, threshold: int = MIN_COMPRESS_SIZE):
+    """Branche le service statique précompressé et la compression JSON"""
+    def static_view(filename):
+        return send_static_asset(app, filename)
+
+    # Remplacer la vue statique par défaut de Flask
+    app.view_functions['static'] = static_view
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, threshold)
@@ -27,6 +27,22 @@ class AppConfig:
     AUTO_INSTALL_UPDATES = os.getenv(
         'AUTO_INSTALL_UPDATES', 'false').lower() == 'true'
 
+    # Worker de traduction: arrêt (et libération du modèle) après inactivité
+    TRANSLATION_WORKER_IDLE_TIMEOUT = int(
+        os.getenv('TRANSLATION_WORKER_IDLE_TIMEOUT', '600'))
+
+    # Mémoire de traduction: nombre maximum d'entrées (0 = désactivée)
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(
+        os.getenv('TRANSLATION_MEMORY_MAX_ENTRIES', '100000'))
+
+    # Traduction parallèle: processus worker maximum (par défaut, un quart des
+    # cœurs; vide = défaut) et threads de calcul par processus (0 = cœurs
+    # disponibles / nombre de processus)
+    TRANSLATION_MAX_PROCESSES = int(
+        os.getenv('TRANSLATION_MAX_PROCESSES') or max(1, (os.cpu_count() or 1) // 4))
+    TRANSLATION_THREADS_PER_PROCESS = int(
+        os.getenv('TRANSLATION_THREADS_PER_PROCESS', '0'))
+
     # Configuration de l'application
     APP_NAME = "RenExtract"
     APP_DESCRIPTION = "Outil d'extraction et de reconstruction pour les jeux Ren'Py"
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Event Bus for RenExtract v2
+Diffusion d'événements (progression, état) vers l'interface via Server-Sent Events
+"""
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+
+class Subscription:
+    """Abonnement d'un client: file bornée avec suppression des plus anciens"""
+
+    def __init__(self, bus: 'EventBus', topics: Optional[Set[str]], max_queue: int):
+        self.bus = bus
+        self.topics = topics
+        self.queue = deque(maxlen=max_queue)
+        self.dropped = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def matches(self, topic: str) -> bool:
+        """Indique si l'abonnement écoute ce topic (None = tous les topics)"""
+        if self.topics is None:
+            return True
+        return topic in self.topics or topic.split('.', 1)[0] in self.topics
+
+    def push(self, event: Dict):
+        """Ajoute un événement; le plus ancien est supprimé si la file est pleine"""
+        with self._cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Attend le prochain événement (None si délai dépassé ou fermé)"""
+        with self._cond:
+            if not self.queue and not self.closed:
+                self._cond.wait(timeout)
+            if self.queue:
+                return self.queue.popleft()
+            return None
+
+    def close(self):
+        """Ferme l'abonnement et le retire du bus"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Bus d'événements en mémoire, thread-safe"""
+
+    def __init__(self, max_queue: int = 256, heartbeat_seconds: float = 15.0):
+        self.max_queue = max_queue
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None,
+                  max_queue: Optional[int] = None) -> Subscription:
+        """Crée un abonnement aux topics donnés (tous si vide)"""
+        topic_set = {t for t in (topics or []) if t} or None
+        subscription = Subscription(self, topic_set, max_queue or self.max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Retire un abonnement"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, topic: str, data: Dict):
+        """Publie un événement vers tous les abonnés intéressés.
+
+        Ne bloque jamais l'appelant: un client lent perd ses plus vieux
+        événements plutôt que de ralentir le travail en cours.
+        """
+        event = {
+            'id': next(self._ids),
+            'topic': topic,
+            'time': time.time(),
+            'data': data,
+        }
+        with self._lock:
+            targets = [s for s in self._subscriptions if s.matches(topic)]
+        for subscription in targets:
+            subscription.push(event)
+
+    def subscriber_count(self) -> int:
+        """Nombre de clients connectés"""
+        with self._lock:
+            return len(self._subscriptions)
+
+    def stream(self, subscription: Subscription) -> Iterator[str]:
+        """Générateur au format text/event-stream pour un abonnement"""
+        try:
+            yield f"retry: 3000\n: connected ({subscription.bus.subscriber_count()})\n\n"
+            while not subscription.closed:
+                event = subscription.get(self.heartbeat_seconds)
+                if event is None:
+                    # Commentaire SSE pour garder la connexion ouverte
+                    yield ": heartbeat\n\n"
+                    continue
+                payload = json.dumps(event['data'], ensure_ascii=False)
+                yield (f"id: {event['id']}\n"
+                       f"event: {event['topic']}\n"
+                       f"data: {payload}\n\n")
+        finally:
+            subscription.close()
+
+
+class ProgressThrottle:
+    """Limite la fréquence des événements de progression (par pourcentage entier)"""
+
+    def __init__(self, bus: Optional[EventBus], topic: str, min_interval: float = 0.1):
+        self.bus = bus
+        self.topic = topic
+        self.min_interval = min_interval
+        self._last_percent = -1
+        self._last_time = 0.0
+
+    def __call__(self, progress: float, **data):
+        if self.bus is None:
+            return
+        percent = int(progress)
+        now = time.monotonic()
+        if percent == self._last_percent or (
+                percent < 100 and now - self._last_time < self.min_interval):
+            return
+        self._last_percent = percent
+        self._last_time = now
+        self.bus.publish(self.topic, {'type': 'progress', 'progress': progress, **data})
@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+"""
+Extraction for RenExtract v2
+Extrait les dialogues et les choix de menu des scripts Ren'Py d'un jeu vers
+01_Temporary/<jeu>/, en flux: les scripts sont projetés en mémoire (mmap) et
+analysés sur leurs octets; seules les chaînes extraites sont décodées et
+chacune est écrite dès qu'elle est trouvée (ni copie ni décodage des
+fichiers entiers, même pour un script.rpy de plusieurs dizaines de Mo).
+
+Format de sortie:
+    strings.txt   une ligne par texte d'origine distinct du jeu (balises
+                  remplacées par des placeholders), le fichier que le
+                  traducteur édite: une réplique répétée ("...", choix de
+                  menu, noms) n'y figure et n'est traduite qu'une fois
+    tokens.txt    une ligne par ligne de strings.txt: éléments protégés par les
+                  placeholders (séparés par TOKEN_SEPARATOR, ligne vide si aucun)
+    index.bin     un enregistrement binaire de taille fixe par occurrence, dans
+                  l'ordre des scripts: fichier, ligne, colonnes et position en
+                  octets du littéral, type, ligne de strings.txt (voir INDEX_FIELDS)
+    keys.bin      une clé 64 bits par ligne de strings.txt: empreinte du texte
+                  d'origine
+    manifest.json fichiers extraits (taille, date, empreinte, encodage),
+                  paramètres et compteurs
+
+L'encodage est détecté par script (voir script_encoding): un jeu peut
+mélanger UTF-8, cp1252 et UTF-16. Un script UTF-16/UTF-32 est analysé sur
+une copie UTF-8 gardée dans transcoded/, à laquelle renvoient ses positions.
+
+Les positions en octets permettent à la reconstruction de recoller les
+traductions par une simple fusion séquentielle, sans ré-analyser les scripts.
+"""
+import bisect
+import codecs
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.backend.file_utils import atomic_write_text, mapped_file
+from src.backend.placeholders import (PROTECTION_VERSION, PlaceholderProtector,
+                                      create_protector)
+from src.backend.script_encoding import (SAMPLE_SIZE, is_wide, legacy_encoding,
+                                         resolve_encoding, sniff_encoding,
+                                         transcode_to_utf8)
+
+# Version du format de sortie
+EXTRACTION_FORMAT_VERSION = 3
+
+STRINGS_FILE = 'strings.txt'
+TOKENS_FILE = 'tokens.txt'
+INDEX_FILE = 'index.bin'
+# Clé de chaque chaîne (ré-extraction incrémentale, voir ExtractionCache)
+KEYS_FILE = 'keys.bin'
+MANIFEST_FILE = 'manifest.json'
+# Copies des scripts tels qu'extraits, prises à la première reconstruction
+ORIGINALS_DIR = 'originals'
+# Copies UTF-8 des scripts UTF-16/UTF-32, analysées à leur place
+TRANSCODED_DIR = 'transcoded'
+
+# Types de chaînes extraites (champ 'kind' de l'index)
+KIND_DIALOGUE = 0
+KIND_MENU = 1
+
+# Enregistrement de index.bin (entiers 32 bits non signés, petit-boutiste)
+INDEX_FIELDS = ('file', 'line', 'start', 'end', 'offset', 'length', 'kind', 'string')
+INDEX_RECORD = struct.Struct(f"<{len(INDEX_FIELDS)}I")
+# Champs par enregistrement selon la version du format: le format 2 (une
+# ligne de strings.txt par occurrence, sans champ 'string') reste lisible
+INDEX_WIDTHS = {2: len(INDEX_FIELDS) - 1, EXTRACTION_FORMAT_VERSION: len(INDEX_FIELDS)}
+INDEX_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# Séparateur des éléments protégés d'une chaîne dans tokens.txt
+TOKEN_SEPARATOR = '\x1f'
+
+# Dossiers ignorés: traductions existantes, SDK embarqué, caches
+IGNORED_DIRS = frozenset({'tl', 'renpy', 'cache', 'saves', '__pycache__'})
+
+# Les scripts sont analysés sur leurs octets (mmap), ligne par ligne via les
+# ancres ^/$ (re.MULTILINE). Un BOM UTF-8 en début de fichier précède la
+# première ligne; \x80-\xff accepte les identifiants non ASCII. Les
+# littéraux sont écrits en boucle déroulée (sans alternative par caractère).
+OPTIONAL_BOM = rb'(?:\xef\xbb\xbf)?'
+
+# Dialogue: [personnage [attributs...]] "texte" [with transition] [id ...]
+# ou menu: "choix" [if condition]:
+SAY_LINE = re.compile(rb"""
+    ^""" + OPTIONAL_BOM + rb"""(?P<indent>[ \t]*)
+    (?:(?P<who>[A-Za-z_\x80-\xff][\w\x80-\xff]*
+        (?:[ \t]+[A-Za-z_@\x80-\xff][\w\x80-\xff-]*)*)[ \t]+
+      |"(?P<name>[^"\\\n]*(?:\\.[^"\\\n]*)*)"[ \t]+)?
+    "(?P<text>[^"\\\n]*(?:\\.[^"\\\n]*)*)"
+    (?P<rest>[^"\r\n]*)\r?$
+""", re.VERBOSE | re.MULTILINE)
+
+MENU_TAIL = re.compile(rb'^[ \t]*(?:\([^)]*\)[ \t]*)?(?:if[ \t].*)?:[ \t]*(?:#.*)?$')
+SAY_TAIL = re.compile(
+    rb'^(?:[ \t]+(?:(?:with|id)[ \t]+[\w.]+|nointeract|\([^)]*\)))*[ \t]*(?:#.*)?$')
+
+# Bloc Python (init python:, python early:...): son contenu n'est pas du dialogue
+PYTHON_BLOCK = re.compile(
+    rb'^' + OPTIONAL_BOM +
+    rb'(?P<indent>[ \t]*)(?:init(?:[ \t]+-?\d+)?[ \t]+)?python\b[^:\n]*:[ \t]*\r?$',
+    re.MULTILINE)
+
+# Taille des blocs lus pour compter les lignes (copie bornée, pas le fichier)
+SCAN_CHUNK = 1024 * 1024
+
+# Premiers mots qui ne peuvent pas être un personnage
+STATEMENT_KEYWORDS = frozenset({
+    'action', 'add', 'at', 'attribute', 'call', 'camera', 'default', 'define',
+    'elif', 'else', 'font', 'for', 'hide', 'if', 'image', 'imagebutton', 'init',
+    'jump', 'key', 'label', 'layeredimage', 'menu', 'new', 'old', 'pause', 'play',
+    'python', 'queue', 'return', 'scene', 'screen', 'show', 'sound', 'stop',
+    'style', 'text', 'textbutton', 'tooltip', 'transform', 'translate', 'use',
+    'voice', 'while', 'window', 'with',
+})
+
+
+class ExtractedString:
+    """Chaîne trouvée dans un script: ligne (1-based), colonnes du littéral
+    dans la ligne et position en octets dans le fichier"""
+
+    __slots__ = ('line', 'start', 'end', 'offset', 'length', 'kind', 'text')
+
+    def __init__(self, line: int, start: int, end: int, offset: int, length: int,
+                 kind: str, text: str):
+        self.line = line
+        self.start = start
+        self.end = end
+        self.offset = offset
+        self.length = length
+        self.kind = kind
+        self.text = text
+
+
+class ExtractionIndex:
+    """index.bin chargé en colonnes: une array par champ, indexée par chaîne"""
+
+    def __init__(self, raw: array, width: int = len(INDEX_FIELDS)):
+        self.count = len(raw) // width
+        self.files = raw[0::width]
+        self.lines = raw[1::width]
+        self.starts = raw[2::width]
+        self.ends = raw[3::width]
+        self.offsets = raw[4::width]
+        self.lengths = raw[5::width]
+        self.kinds = raw[6::width]
+        # Ligne de strings.txt de chaque occurrence
+        if width > 7:
+            self.strings = raw[7::width]
+        else:
+            self.strings = array(INDEX_TYPECODE, range(self.count))
+
+    @property
+    def unique_count(self) -> int:
+        """Nombre de lignes de strings.txt (chaînes uniques)"""
+        return max(self.strings) + 1 if self.count else 0
+
+    @classmethod
+    def load(cls, path: Path, width: int = len(INDEX_FIELDS)) -> 'ExtractionIndex':
+        """Lit index.bin d'un bloc"""
+        raw = array(INDEX_TYPECODE)
+        raw.frombytes(Path(path).read_bytes())
+        if sys.byteorder == 'big':
+            raw.byteswap()
+        return cls(raw, width)
+
+    def file_range(self, file_index: int) -> range:
+        """Chaînes d'un fichier (elles sont contiguës dans l'index)"""
+        return range(bisect.bisect_left(self.files, file_index),
+                     bisect.bisect_right(self.files, file_index))
+
+
+def source_encoding(encoding: Optional[str]) -> str:
+    """Encodage de lecture des scripts (paramètre extraction.encoding).
+
+    Les scripts sont analysés sur leurs octets: seuls l'UTF-8 et les
+    encodages 8 bits compatibles ASCII sont acceptés (tout octet non ASCII
+    y est >= 0x80 et ne peut pas être pris pour un guillemet ou une fin de
+    ligne).
+    """
+    try:
+        name = codecs.lookup(encoding or 'utf-8').name
+    except LookupError as e:
+        raise ValueError(f"Encodage inconnu: {encoding}") from e
+    if name == 'utf-8-sig':
+        return 'utf-8'
+    if ('\n"a'.encode(name) != b'\n"a' or (
+            name != 'utf-8'
+            and len(bytes(range(0x80, 0x100)).decode(name, errors='replace')) != 0x80)):
+        raise ValueError(f"Encodage non supporté pour l'extraction: {encoding}")
+    return name
+
+
+def text_encoding(encoding: str) -> str:
+    """Encodage d'un fragment de texte (sans BOM)"""
+    return 'utf-8' if encoding == 'utf-8-sig' else encoding
+
+
+def detect_encoding(data, configured: str) -> str:
+    """Encodage d'un script, détecté sur son début (SAMPLE_SIZE octets):
+    BOM, UTF-16, UTF-8 valide, sinon l'encodage 8 bits configuré ou supposé.
+    Les chaînes sont validées à leur décodage."""
+    return resolve_encoding(sniff_encoding(data[:SAMPLE_SIZE]), text_encoding(configured))
+
+
+def count_newlines(data, start: int = 0, end: Optional[int] = None) -> int:
+    """Fins de ligne entre deux positions, comptées par blocs de SCAN_CHUNK"""
+    end = len(data) if end is None else end
+    return sum(data[position:min(position + SCAN_CHUNK, end)].count(b'\n')
+               for position in range(start, end, SCAN_CHUNK))
+
+
+def count_lines(data) -> int:
+    """Nombre de lignes d'un script (la dernière peut ne pas finir par \\n)"""
+    size = len(data)
+    return count_newlines(data) + (1 if size and data[size - 1:size] != b'\n' else 0)
+
+
+def _python_blocks(data) -> List[Tuple[int, int]]:
+    """Plages d'octets du contenu des blocs Python, dans l'ordre du fichier"""
+    blocks: List[Tuple[int, int]] = []
+    size = len(data)
+    # Recherche du mot 'python' (rapide), puis vérification de sa ligne
+    found = data.find(b'python')
+    while found >= 0:
+        header = PYTHON_BLOCK.match(data, data.rfind(b'\n', 0, found) + 1)
+        if header is None:
+            line_end = data.find(b'\n', found)
+            found = data.find(b'python', line_end) if line_end >= 0 else -1
+            continue
+        indent = len(header.group('indent'))
+        begin = position = header.end() + 1
+        # Le bloc s'arrête à la première ligne non vide pas plus indentée
+        while position < size:
+            end = data.find(b'\n', position)
+            end = size if end < 0 else end
+            line = data[position:end]
+            stripped = line.lstrip()
+            if stripped and not stripped.startswith(b'#') and len(line) - len(stripped) <= indent:
+                break
+            position = end + 1
+        position = min(position, size)
+        blocks.append((begin, position))
+        found = data.find(b'python', position)
+    return blocks
+
+
+def iter_strings(data, encoding: str = 'utf-8') -> Iterator[ExtractedString]:
+    """Dialogues et choix de menu d'un script Ren'Py, dans l'ordre du fichier.
+
+    data: contenu du script (bytes ou mmap), analysé sur les octets: seuls
+    les littéraux extraits (et le début de leur ligne s'il n'est pas ASCII)
+    sont décodés.
+    """
+    encoding = text_encoding(encoding)
+    blocks = _python_blocks(data)
+    block = 0
+    number, scanned = 1, 0
+    for match in SAY_LINE.finditer(data):
+        line_start = match.start()
+        while block < len(blocks) and blocks[block][1] <= line_start:
+            block += 1
+        if block < len(blocks) and blocks[block][0] <= line_start:
+            continue
+        offset, end = match.span('text')
+        if offset == end:
+            continue
+        who = match.group('who')
+        if who and who.split(None, 1)[0].decode('latin-1') in STATEMENT_KEYWORDS:
+            continue
+        rest = match.group('rest')
+        if MENU_TAIL.match(rest):
+            if who or match.group('name') is not None:
+                continue
+            kind = KIND_MENU
+        elif SAY_TAIL.match(rest):
+            kind = KIND_DIALOGUE
+        else:
+            continue
+
+        if line_start - scanned <= SCAN_CHUNK:
+            number += data[scanned:line_start].count(b'\n')
+        else:
+            number += count_newlines(data, scanned, line_start)
+        scanned = line_start
+        text = match.group('text').decode(encoding)
+        prefix = data[match.start('indent'):offset]
+        start = len(prefix) if prefix.isascii() else len(prefix.decode(encoding))
+        yield ExtractedString(number, start, start + len(text), offset, end - offset,
+                              kind, text)
+
+
+def game_scripts_root(game_path: Path) -> Path:
+    """Dossier des scripts: <jeu>/game s'il existe, sinon le dossier donné"""
+    game_dir = Path(game_path) / 'game'
+    return game_dir if game_dir.is_dir() else Path(game_path)
+
+
+def game_name_for(game_path: Path) -> str:
+    """Nom du jeu (dossier de sortie dans 01_Temporary)"""
+    path = Path(game_path).resolve()
+    if path.name.lower() == 'game' and path.parent.name:
+        path = path.parent
+    return path.name or 'Projet_Inconnu'
+
+
+def collect_scripts(root: Path) -> List[Path]:
+    """Scripts .rpy du jeu, triés, hors traductions et SDK"""
+    scripts = []
+    for current, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs
+                         if d.lower() not in IGNORED_DIRS and not d.startswith('.'))
+        scripts.extend(Path(current) / name for name in sorted(files)
+                       if name.lower().endswith('.rpy'))
+    return scripts
+
+
+def read_manifest(output_dir: Path) -> Dict:
+    """Manifeste d'une extraction (ValueError si absent ou d'un autre format)"""
+    try:
+        manifest = json.loads((Path(output_dir) / MANIFEST_FILE).read_text(encoding='utf-8'))
+    except FileNotFoundError as e:
+        raise ValueError("Aucune extraction pour ce jeu: lancez d'abord l'extraction") from e
+    if manifest.get('version') not in INDEX_WIDTHS:
+        raise ValueError("Extraction d'une version précédente: relancez l'extraction")
+    return manifest
+
+
+def extracted_roots(temporary_dir: Path) -> Iterator[Path]:
+    """Dossiers de scripts des jeux extraits dans temporary_dir"""
+    try:
+        outputs = sorted(Path(temporary_dir).iterdir())
+    except OSError:
+        return
+    for output_dir in outputs:
+        if (output_dir / MANIFEST_FILE).is_file():
+            try:
+                yield Path(read_manifest(output_dir)['scriptsRoot'])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"DEBUG: Extraction of {output_dir.name} ignored: {e}")
+
+
+def read_lines(path: Path) -> List[str]:
+    """Lignes d'un fichier texte UTF-8 produit par l'extraction (décodage d'un bloc)"""
+    text = Path(path).read_bytes().decode('utf-8')
+    if text.endswith('\n'):
+        text = text[:-1]
+    lines = text.split('\n') if text else []
+    if '\r' in text:
+        # Fichier réenregistré avec des fins de ligne Windows
+        lines = [line.rstrip('\r') for line in lines]
+    return lines
+
+
+def load_strings(output_dir: Path, manifest: Optional[Dict] = None
+                 ) -> Tuple[ExtractionIndex, List[str], List[str]]:
+    """Index, textes (strings.txt) et éléments protégés d'une extraction,
+    une ligne par chaîne unique (index.strings renvoie chaque occurrence à
+    sa ligne).
+
+    strings.txt doit avoir gardé une ligne par chaîne: le traducteur modifie
+    les lignes sans en ajouter ni en retirer.
+    """
+    output_dir = Path(output_dir)
+    if manifest is None:
+        manifest = read_manifest(output_dir)
+    index = ExtractionIndex.load(output_dir / INDEX_FILE, INDEX_WIDTHS[manifest['version']])
+    texts = read_lines(output_dir / STRINGS_FILE)
+    tokens = read_lines(output_dir / TOKENS_FILE)
+    unique = index.unique_count
+    if len(texts) != unique:
+        raise ValueError(f"{STRINGS_FILE} a {len(texts)} ligne(s) au lieu de {unique}: "
+                         "des lignes ont été ajoutées ou supprimées")
+    if len(tokens) != unique:
+        raise ValueError(f"{TOKENS_FILE} ne correspond pas à l'index: relancez l'extraction")
+    return index, texts, tokens
+
+
+def string_key(text: str) -> int:
+    """Clé d'une chaîne (empreinte 64 bits de son texte d'origine): retrouve
+    sa traduction quand le script change autour d'elle"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(),
+                          'little')
+
+
+def file_digest(data) -> str:
+    """Empreinte du contenu d'un script (bytes ou mmap)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _stat_matches(stat: os.stat_result, expected: Optional[Dict]) -> bool:
+    return bool(expected) and (stat.st_size, stat.st_mtime_ns) == (expected['size'],
+                                                                   expected['mtime'])
+
+
+def original_script(path: Path, original: Path, info: Dict) -> Optional[Path]:
+    """Script tel qu'à l'extraction: le fichier du jeu s'il n'a pas changé,
+    sinon la copie prise à la première reconstruction (si le fichier n'a pas
+    été modifié depuis cette reconstruction)"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if _stat_matches(stat, info):
+        return path
+    if (_stat_matches(stat, info.get('reconstructed')) and original.is_file()
+            and original.stat().st_size == info['size']):
+        return original
+    return None
+
+
+class ExtractionCache:
+    """Extraction précédente d'un jeu, pour une ré-extraction incrémentale.
+
+    Un script inchangé (même taille et date, ou même empreinte, ou tel que
+    réécrit par la reconstruction) reprend ses chaînes, traductions
+    comprises, sans être relu. Dans un script modifié, chaque chaîne dont le
+    texte d'origine n'a pas changé retrouve sa traduction par sa clé, où
+    qu'elle ait été dans le jeu (chaîne déplacée d'un fichier à l'autre),
+    si ses éléments protégés sont les mêmes. Après un changement des règles
+    de protection, tous les scripts sont relus.
+    """
+
+    def __init__(self, output_dir: Path, encoding: str, placeholder_format: str):
+        """ValueError si l'extraction précédente est absente ou inutilisable"""
+        self.manifest = read_manifest(output_dir)
+        if (self.manifest['encoding'] != encoding
+                or self.manifest['placeholderFormat'] != placeholder_format):
+            raise ValueError("Paramètres d'extraction modifiés")
+        self.index, self.texts, self.tokens = load_strings(output_dir, self.manifest)
+        self.keys = array('Q')
+        try:
+            self.keys.frombytes((Path(output_dir) / KEYS_FILE).read_bytes())
+        except FileNotFoundError as e:
+            raise ValueError(f"{KEYS_FILE} absent") from e
+        if sys.byteorder == 'big':
+            self.keys.byteswap()
+        if len(self.keys) != len(self.texts):
+            raise ValueError(f"{KEYS_FILE} ne correspond pas à l'index")
+        self.files = {info['path']: (position, info)
+                      for position, info in enumerate(self.manifest['files'])}
+        self._strings: Optional[Dict[int, int]] = None
+        self.rules_changed = self.manifest.get('protection') != PROTECTION_VERSION
+
+    def unchanged(self, relative: str, path: Path) -> Optional[Dict]:
+        """Informations du manifeste précédent si le script n'a pas changé"""
+        entry = self.files.get(relative)
+        if entry is None or self.rules_changed:
+            return None
+        info = entry[1]
+        stat = path.stat()
+        if _stat_matches(stat, info) or _stat_matches(stat, info.get('reconstructed')):
+            return info
+        if stat.st_size != info['size'] or not info.get('hash'):
+            return None
+        # Fichier touché (date changée) ou restauré, contenu d'origine
+        with mapped_file(path) as data:
+            if file_digest(data) != info['hash']:
+                return None
+        info = {key: value for key, value in info.items() if key != 'reconstructed'}
+        return {**info, 'mtime': stat.st_mtime_ns}
+
+    def copy_file(self, relative: str, file_index: int, index_out,
+                  table: 'StringTable') -> Dict:
+        """Recopie les chaînes d'un script inchangé; retourne ses compteurs"""
+        entries = self.index.file_range(self.files[relative][0])
+        first, last = entries.start, entries.stop
+        index = self.index
+        strings = table.extend(index.strings[first:last], self.keys, self.texts, self.tokens)
+        pack = INDEX_RECORD.pack
+        index_out.write(b''.join(
+            pack(file_index, *record) for record in zip(
+                index.lines[first:last], index.starts[first:last], index.ends[first:last],
+                index.offsets[first:last], index.lengths[first:last],
+                index.kinds[first:last], strings)))
+        kinds = index.kinds[first:last]
+        return {KIND_DIALOGUE: kinds.count(KIND_DIALOGUE), KIND_MENU: kinds.count(KIND_MENU)}
+
+    def translation(self, key: int, tokens: str) -> Optional[str]:
+        """Traduction précédente d'un texte d'origine (script modifié), si
+        ses éléments protégés n'ont pas changé"""
+        if self._strings is None:
+            # Première ligne de chaque clé (plusieurs au format 2)
+            count = len(self.keys)
+            self._strings = dict(zip(reversed(self.keys), range(count - 1, -1, -1)))
+        string = self._strings.get(key)
+        if string is None or self.tokens[string] != tokens:
+            return None
+        return self.texts[string]
+
+
+class StringTable:
+    """Chaînes uniques en cours d'écriture: un texte d'origine répété dans le
+    jeu n'a qu'une ligne dans strings.txt et tokens.txt, à laquelle renvoient
+    toutes ses occurrences (champ 'string' de index.bin)"""
+
+    def __init__(self, strings_out, tokens_out):
+        self.strings_out = strings_out
+        self.tokens_out = tokens_out
+        self.lines: Dict[int, int] = {}
+        self.keys = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: int, text: str, tokens: str) -> int:
+        """Ligne de la chaîne de clé 'key', écrite si elle est nouvelle"""
+        string = self.lines.get(key)
+        if string is None:
+            string = self.lines[key] = len(self.keys)
+            self.keys.append(key)
+            self.strings_out.write(text.encode('utf-8') + b'\n')
+            self.tokens_out.write(tokens.encode('utf-8') + b'\n')
+        return string
+
+    def extend(self, strings, keys: array, texts: List[str], tokens: List[str]) -> List[int]:
+        """Lignes d'une suite de chaînes d'une autre table ('strings': leurs
+        numéros dans keys, texts et tokens); écritures groupées"""
+        lines, table_keys = self.lines, self.keys
+        result, added = [], []
+        for string in strings:
+            key = keys[string]
+            line = lines.get(key)
+            if line is None:
+                line = lines[key] = len(table_keys)
+                table_keys.append(key)
+                added.append(string)
+            result.append(line)
+        if added:
+            self.strings_out.write(('\n'.join([texts[string] for string in added])
+                                    + '\n').encode('utf-8'))
+            self.tokens_out.write(('\n'.join([tokens[string] for string in added])
+                                   + '\n').encode('utf-8'))
+        return result
+
+    def truncate(self, size: int):
+        """Oublie les chaînes ajoutées après les 'size' premières (script
+        ignoré; les fichiers sont tronqués par l'appelant)"""
+        for key in self.keys[size:]:
+            del self.lines[key]
+        del self.keys[size:]
+
+    def mark(self) -> Tuple[int, int, int]:
+        """Position de la table, pour revenir sur un script (voir rewind)"""
+        return len(self.keys), self.strings_out.tell(), self.tokens_out.tell()
+
+    def rewind(self, mark: Tuple[int, int, int]):
+        """Revient à une position donnée par mark(), fichiers compris"""
+        size, strings_position, tokens_position = mark
+        self.truncate(size)
+        for handle, position in ((self.strings_out, strings_position),
+                                 (self.tokens_out, tokens_position)):
+            handle.seek(position)
+            handle.truncate()
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _write_strings(data, encoding: str, file_index: int, protector: PlaceholderProtector,
+                   index_out, table: StringTable,
+                   carry: Optional[Callable[[int, str], Optional[str]]]) -> Tuple[Dict, int]:
+    """Écrit les chaînes d'un script; retourne (compteurs par type,
+    traductions reprises)"""
+    counts = {KIND_DIALOGUE: 0, KIND_MENU: 0}
+    carried = 0
+    lines = table.lines
+    for extracted in iter_strings(data, encoding):
+        key = string_key(extracted.text)
+        string = lines.get(key)
+        if string is None:
+            text, tokens = protector.protect(extracted.text)
+            tokens = TOKEN_SEPARATOR.join(tokens)
+            if carry is not None:
+                # Même texte d'origine et mêmes placeholders: la traduction reste valide
+                previous = carry(key, tokens)
+                if previous is not None and previous != text:
+                    text = previous
+                    carried += 1
+            string = table.add(key, text, tokens)
+        index_out.write(INDEX_RECORD.pack(file_index, extracted.line, extracted.start,
+                                          extracted.end, extracted.offset,
+                                          extracted.length, extracted.kind, string))
+        counts[extracted.kind] += 1
+    return counts, carried
+
+
+def _extract_file(path: Path, configured: str, file_index: int,
+                  protector: PlaceholderProtector, index_out, table: StringTable,
+                  carry: Optional[Callable[[int, str], Optional[str]]] = None,
+                  detected: Optional[str] = None, transcoded: Optional[Path] = None) -> Dict:
+    """Écrit les chaînes d'un fichier; retourne lignes, compteurs par type,
+    encodage (effectivement utilisé), empreinte, nombre de traductions
+    reprises (chaînes uniques nouvelles de la table) et 'redetected' si
+    l'encodage supposé UTF-8 a dû être remplacé.
+
+    Args:
+        detected: Encodage déjà détecté (inventaire du jeu), sinon détecté ici
+        transcoded: Emplacement de la copie UTF-8 d'un script UTF-16/UTF-32
+    """
+    with mapped_file(path) as data:
+        if detected:
+            encoding = resolve_encoding(detected, text_encoding(configured))
+        else:
+            encoding = detect_encoding(data, configured)
+        digest = file_digest(data)
+        redetected = False
+        if not is_wide(encoding):
+            mark = index_out.tell(), table.mark()
+            try:
+                counts, carried = _write_strings(data, encoding, file_index, protector,
+                                                 index_out, table, carry)
+            except UnicodeDecodeError:
+                if encoding != 'utf-8':
+                    raise
+                # UTF-8 supposé sur l'échantillon seul (sans BOM): accents 8 bits
+                # plus loin dans le script, relu en entier dans cet encodage
+                index_out.seek(mark[0])
+                index_out.truncate()
+                table.rewind(mark[1])
+                encoding = resolve_encoding(legacy_encoding(data), text_encoding(configured))
+                redetected = True
+                print(f"DEBUG: {path.name} is not UTF-8 past its first "
+                      f"{SAMPLE_SIZE} bytes, extracted as {encoding}")
+                counts, carried = _write_strings(data, encoding, file_index, protector,
+                                                 index_out, table, carry)
+            lines = count_lines(data)
+    if is_wide(encoding):
+        if transcoded is None:
+            raise ValueError(f"Script {encoding}: copie UTF-8 requise")
+        transcode_to_utf8(path, transcoded, encoding)
+        with mapped_file(transcoded) as data:
+            counts, carried = _write_strings(data, 'utf-8', file_index, protector,
+                                             index_out, table, carry)
+            lines = count_lines(data)
+    return {'lines': lines, 'counts': counts, 'encoding': encoding, 'hash': digest,
+            'carried': carried, 'redetected': redetected}
+
+
+def extract_game(game_path: str, temporary_dir: Path,
+                 placeholder_format: Optional[str] = None,
+                 encoding: Optional[str] = None,
+                 encodings: Optional[Dict[str, str]] = None) -> Dict:
+    """Extrait les chaînes d'un jeu vers temporary_dir/<jeu>/.
+
+    'encoding' est l'encodage des scripts 8 bits sans indice (paramètre
+    extraction.encoding); 'encodings' donne l'encodage déjà détecté de
+    chaque script (chemin relatif, inventaire du jeu), les autres sont
+    détectés à la lecture. 'redetected' dans le résultat donne l'encodage
+    des scripts qui n'étaient pas en UTF-8 comme le laissait croire leur
+    début.
+
+    Les chaînes sont dédoublonnées dans tout le jeu (voir StringTable): le
+    résultat donne le nombre de chaînes uniques et la part d'occurrences
+    qui n'ont pas à être traduites ('dedupRatio').
+
+    Les fichiers de sortie sont écrits à côté puis remplacés en fin
+    d'extraction: une extraction interrompue laisse la précédente intacte.
+    Un script illisible (encodage) est ignoré et signalé, sans laisser de
+    chaînes partielles dans la sortie. Une extraction précédente sert de
+    cache (voir ExtractionCache): seuls les scripts modifiés sont relus et
+    les traductions des chaînes inchangées sont conservées.
+    """
+    result = {'success': False, 'error': None}
+    started = time.perf_counter()
+    temporary: List[Path] = []
+    try:
+        read_encoding = source_encoding(encoding)
+        protector = create_protector(placeholder_format)
+        root = game_scripts_root(Path(game_path))
+        output_dir = Path(temporary_dir) / game_name_for(Path(game_path))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            cache = ExtractionCache(output_dir, read_encoding, protector.placeholder_format)
+        except ValueError as e:
+            cache = None
+            print(f"DEBUG: No extraction cache for {game_path}: {e}")
+
+        scripts = collect_scripts(root)
+        files, errors = [], []
+        totals = {KIND_DIALOGUE: 0, KIND_MENU: 0}
+        reused = carried = 0
+        redetected: Dict[str, str] = {}
+        names = (STRINGS_FILE, TOKENS_FILE, INDEX_FILE, KEYS_FILE)
+        temporary = [output_dir / f".{name}.tmp" for name in names]
+        with ExitStack() as stack:
+            strings_out, tokens_out, index_out = [stack.enter_context(open(path, 'wb'))
+                                                   for path in temporary[:3]]
+            table = StringTable(strings_out, tokens_out)
+            for path in scripts:
+                relative = path.relative_to(root).as_posix()
+                position, mark = index_out.tell(), table.mark()
+                try:
+                    previous = cache.unchanged(relative, path) if cache else None
+                    if previous is not None:
+                        counts = cache.copy_file(relative, len(files), index_out, table)
+                        files.append(previous)
+                        reused += 1
+                    else:
+                        extracted = _extract_file(
+                            path, read_encoding, len(files), protector, index_out, table,
+                            cache.translation if cache else None,
+                            detected=(encodings or {}).get(relative),
+                            transcoded=output_dir / TRANSCODED_DIR / relative)
+                        counts = extracted['counts']
+                        carried += extracted['carried']
+                        if extracted['redetected']:
+                            redetected[relative] = extracted['encoding']
+                        stat = path.stat()
+                        files.append({'path': relative, 'lines': extracted['lines'],
+                                      'strings': sum(counts.values()),
+                                      'encoding': extracted['encoding'],
+                                      'hash': extracted['hash'],
+                                      'size': stat.st_size, 'mtime': stat.st_mtime_ns})
+                except (OSError, ValueError) as e:
+                    # Retour à l'état d'avant ce fichier
+                    index_out.seek(position)
+                    index_out.truncate()
+                    table.rewind(mark)
+                    errors.append({'file': relative, 'error': str(e)})
+                    print(f"DEBUG: Extraction skipped {relative}: {e}")
+                    continue
+                for kind, count in counts.items():
+                    totals[kind] += count
+        temporary[3].write_bytes(_little_endian(table.keys))
+
+        for path, name in zip(temporary, names):
+            os.replace(path, output_dir / name)
+        # Les copies des scripts relus ne correspondent plus aux positions
+        kept = {ORIGINALS_DIR: {info['path'] for info in files if info.get('reconstructed')},
+                TRANSCODED_DIR: {info['path'] for info in files
+                                 if is_wide(info.get('encoding', ''))}}
+        for folder, paths in kept.items():
+            copies = output_dir / folder
+            if copies.is_dir():
+                for copy in [p for p in copies.rglob('*') if p.is_file()]:
+                    if copy.relative_to(copies).as_posix() not in paths:
+                        copy.unlink()
+        occurrences = totals[KIND_DIALOGUE] + totals[KIND_MENU]
+        unique = len(table)
+        elapsed = time.perf_counter() - started
+        manifest = {
+            'version': EXTRACTION_FORMAT_VERSION,
+            'gamePath': str(Path(game_path).resolve()),
+            'scriptsRoot': str(root.resolve()),
+            'encoding': read_encoding,
+            'placeholderFormat': protector.placeholder_format,
+            'protection': PROTECTION_VERSION,
+            'created': time.time(),
+            'strings': occurrences,
+            'uniqueStrings': unique,
+            'files': files,
+        }
+        atomic_write_text(output_dir / MANIFEST_FILE,
+                          json.dumps(manifest, ensure_ascii=False, indent=1))
+
+        result.update({
+            'success': True,
+            'outputDir': str(output_dir),
+            'files': len(files),
+            'reused': reused,
+            'parsed': len(files) - reused,
+            'carried': carried,
+            'strings': occurrences,
+            'unique': unique,
+            'dedupRatio': round(1 - unique / occurrences, 3) if occurrences else 0,
+            'dialogue': totals[KIND_DIALOGUE],
+            'menu': totals[KIND_MENU],
+            'redetected': redetected,
+            'errors': errors,
+            'elapsed': round(elapsed, 3),
+        })
+        print(f"DEBUG: Extraction of {game_path}: {occurrences} string(s) "
+              f"({unique} unique) from {len(files)} file(s) ({reused} unchanged, {carried} translation(s) "
+              f"carried over) in {elapsed:.2f}s")
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+        print(f"Erreur extraction: {e}")
+        for path in temporary:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return result
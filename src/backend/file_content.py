@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+File Content for RenExtract v2
+Lecture et édition d'un script par plages de lignes pour l'éditeur
+principal: seules les lignes affichées transitent par HTTP.
+
+Les débuts de ligne de chaque fichier ouvert sont indexés une fois (balayage
+par blocs d'une projection mmap), puis gardés en cache tant que la taille et
+la date du fichier ne changent pas. Une plage de lignes se lit alors d'un
+seul accès disque, quelle que soit sa position dans le fichier.
+
+Seuls les scripts .rpy des jeux ouverts (inventoriés ou extraits) sont
+accessibles. Chaque édition est précédée d'une sauvegarde REALTIME_EDIT et
+écrite de façon atomique; les octets hors de la plage éditée sont recopiés
+tels quels.
+"""
+import codecs
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Union
+
+from src.backend.backup_manager import BackupManager, BackupType
+from src.backend.extraction import (SCAN_CHUNK, detect_encoding, source_encoding,
+                                    text_encoding)
+from src.backend.file_utils import atomic_writer, mapped_file
+from src.backend.script_encoding import is_wide
+
+# Nombre maximum de lignes renvoyées par requête
+MAX_RANGE_LINES = 5000
+
+# Nombre de fichiers dont l'index de lignes est gardé en cache (LRU)
+MAX_CACHED_FILES = 8
+
+NEWLINES = re.compile(r'\r?\n')
+
+
+class LineIndex:
+    """Débuts de ligne d'un fichier, relevés à une taille et une date données"""
+
+    __slots__ = ('starts', 'size', 'mtime', 'encoding', 'newline', 'ends_with_newline')
+
+    def __init__(self, data, size: int, mtime: int, configured: str):
+        self.size = size
+        self.mtime = mtime
+        self.encoding = detect_encoding(data, configured)
+        # Le BOM reste hors des lignes: il est conservé à l'écriture
+        first = len(codecs.BOM_UTF8) if self.encoding == 'utf-8-sig' else 0
+        self.starts = array('Q')
+        if first < size:
+            self.starts.append(first)
+            for position in range(first, size, SCAN_CHUNK):
+                pieces = data[position:position + SCAN_CHUNK].split(b'\n')
+                pieces.pop()
+                # Position après chaque fin de ligne du bloc
+                self.starts.extend(islice(accumulate(
+                    map(len, pieces), lambda total, length: total + length + 1,
+                    initial=position), 1, None))
+        self.ends_with_newline = size > first and data[size - 1:size] == b'\n'
+        if self.ends_with_newline:
+            # Une fin de ligne finale n'ouvre pas de ligne supplémentaire
+            self.starts.pop()
+        first_end = data.find(b'\n', first, first + SCAN_CHUNK)
+        self.newline = b'\r\n' if first_end > first and data[first_end - 1] == 0x0D else b'\n'
+
+    @property
+    def total(self) -> int:
+        """Nombre de lignes"""
+        return len(self.starts)
+
+    @property
+    def version(self) -> str:
+        """Version du fichier (taille et date): refuse les éditions concurrentes"""
+        return f"{self.size}-{self.mtime}"
+
+    def line_end(self, line: int) -> int:
+        """Position du \\n qui termine la ligne 'line' (1-based), ou fin du
+        fichier pour une dernière ligne sans fin de ligne"""
+        if line < self.total:
+            return self.starts[line] - 1
+        return self.size - 1 if self.ends_with_newline else self.size
+
+
+def _content_end(source: BinaryIO, position: int, floor: int) -> int:
+    """Fin du contenu d'une ligne terminée en 'position': un \\r qui précède
+    est laissé à la fin de ligne (fichiers aux fins de ligne mélangées)"""
+    if position > floor:
+        source.seek(position - 1)
+        if source.read(1) == b'\r':
+            return position - 1
+    return position
+
+
+def _copy_range(source: BinaryIO, out: BinaryIO, start: int, end: int):
+    """Recopie les octets [start, end) de 'source' par blocs"""
+    source.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = source.read(min(SCAN_CHUNK, remaining))
+        if not block:
+            raise OSError("Fichier tronqué pendant l'écriture")
+        out.write(block)
+        remaining -= len(block)
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    """'path' (résolu) est-il dans le dossier 'root'?"""
+    try:
+        path.relative_to(Path(root).resolve())
+        return True
+    except ValueError:
+        return False
+
+
+class FileContentStore:
+    """Lecture/édition par plages de lignes, avec index de lignes en cache"""
+
+    def __init__(self, backup_manager: BackupManager, roots: Callable[[], Iterable[Path]]):
+        """
+        Args:
+            roots: Dossiers de scripts des jeux dont les fichiers sont accessibles
+        """
+        self.backup_manager = backup_manager
+        self.roots = roots
+        self._indexes: 'OrderedDict[str, LineIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index(self, path: Path, encoding: Optional[str]) -> LineIndex:
+        """Index des lignes, reconstruit si le fichier a changé"""
+        configured = source_encoding(encoding)
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            index = self._indexes.get(key)
+            if (index is not None and index.size == stat.st_size
+                    and index.mtime == stat.st_mtime_ns
+                    and index.encoding in (configured, 'utf-8-sig')):
+                self._indexes.move_to_end(key)
+                return index
+        with mapped_file(path) as data:
+            index = LineIndex(data, stat.st_size, stat.st_mtime_ns, configured)
+        if is_wide(index.encoding):
+            # Lignes repérées sur les octets: encodages compatibles ASCII seulement
+            raise ValueError(f"Script en {index.encoding}: édition non prise en charge")
+        print(f"DEBUG: Line index built for {path}: {index.total} line(s)")
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > MAX_CACHED_FILES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _forget(self, path: Path):
+        with self._lock:
+            self._indexes.pop(str(path), None)
+
+    def _file(self, path: Union[str, Path]) -> Path:
+        """Chemin résolu d'un script .rpy d'un jeu ouvert (ValueError sinon)"""
+        if not path:
+            raise ValueError('Chemin du fichier manquant')
+        if Path(path).suffix.lower() != '.rpy':
+            raise ValueError(f"Seuls les scripts .rpy sont accessibles: {path}")
+        resolved = Path(path).resolve()
+        if not any(_is_within(resolved, root) for root in self.roots()):
+            raise ValueError(f"Fichier hors des jeux ouverts: {path}")
+        if not resolved.is_file():
+            raise ValueError(f"Fichier introuvable: {path}")
+        return resolved
+
+    def read_lines(self, path: Union[str, Path], start: int = 1,
+                   end: Optional[int] = None, encoding: Optional[str] = None) -> Dict:
+        """Lignes start..end (1-based, incluses) et nombre total de lignes.
+
+        La plage est bornée au fichier et à MAX_RANGE_LINES lignes.
+        """
+        result = {'success': False, 'error': None}
+        try:
+            path = self._file(path)
+            index = self._index(path, encoding)
+            start = max(1, int(start))
+            end = index.total if end is None else int(end)
+            end = min(end, index.total, start + MAX_RANGE_LINES - 1)
+            lines: List[str] = []
+            lossy = False
+            if start <= end:
+                first, last = index.starts[start - 1], index.line_end(end)
+                with open(path, 'rb') as f:
+                    f.seek(first)
+                    raw = f.read(last - first)
+                codec = text_encoding(index.encoding)
+                try:
+                    text = raw.decode(codec)
+                except UnicodeDecodeError:
+                    # Affichage malgré tout: seules les lignes éditées sont réencodées
+                    text = raw.decode(codec, errors='replace')
+                    lossy = True
+                lines = NEWLINES.split(text)
+                if lines[-1].endswith('\r'):
+                    lines[-1] = lines[-1][:-1]
+            result.update({
+                'success': True,
+                'path': str(path),
+                'start': start,
+                'end': start + len(lines) - 1,
+                'lines': lines,
+                'totalLines': index.total,
+                'size': index.size,
+                'encoding': index.encoding,
+                'newline': index.newline.decode('ascii'),
+                'version': index.version,
+                'lossy': lossy,
+            })
+        except (OSError, ValueError) as e:
+            result['error'] = str(e)
+            print(f"Erreur lecture fichier: {e}")
+        return result
+
+    def replace_lines(self, path: Union[str, Path], start: int, end: int, lines: List[str],
+                      version: Optional[str] = None, encoding: Optional[str] = None) -> Dict:
+        """Remplace les lignes start..end (1-based, incluses) par 'lines'
+        (liste vide: suppression). Refusé si 'version' ne correspond plus au
+        fichier (modifié ailleurs depuis sa lecture)."""
+        result = {'success': False, 'error': None, 'conflict': False}
+        try:
+            path = self._file(path)
+            index = self._index(path, encoding)
+            if version is not None and version != index.version:
+                result['conflict'] = True
+                raise ValueError('Le fichier a été modifié depuis son chargement')
+            start, end = int(start), int(end)
+            if index.total == 0 and (start, end) == (1, 0):
+                # Fichier vide (ou BOM seul): le texte est ajouté à la fin
+                span_start = span_end = index.size
+            elif not 1 <= start <= end <= index.total:
+                raise ValueError(f"Plage de lignes invalide: {start}-{end} "
+                                 f"(fichier de {index.total} lignes)")
+            else:
+                span_start, span_end = index.starts[start - 1], index.line_end(end)
+                with open(path, 'rb') as source:
+                    span_end = _content_end(source, span_end, span_start)
+            if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+                raise ValueError("'lines' doit être une liste de textes")
+
+            if lines:
+                text = '\n'.join(lines)
+                replacement = index.newline.join(
+                    line.encode(text_encoding(index.encoding))
+                    for line in NEWLINES.split(text))
+            else:
+                # Suppression: la fin de ligne des lignes retirées part avec elles
+                replacement = b''
+                if end < index.total:
+                    span_end = index.starts[end]
+                elif start > 1:
+                    with open(path, 'rb') as source:
+                        span_start = _content_end(source, index.line_end(start - 1),
+                                                  index.starts[start - 2])
+                else:
+                    # Toutes les lignes: la fin de ligne finale part aussi (BOM conservé)
+                    span_end = index.size
+
+            backup = self.backup_manager.create_backup(
+                str(path), BackupType.REALTIME_EDIT, f"Édition lignes {start}-{end}")
+            if not backup['success']:
+                raise OSError(f"Sauvegarde impossible: {backup['error']}")
+
+            # La source est fermée avant le remplacement atomique (Windows)
+            with atomic_writer(path) as out:
+                with open(path, 'rb') as source:
+                    _copy_range(source, out, 0, span_start)
+                    out.write(replacement)
+                    _copy_range(source, out, span_end, index.size)
+            self._forget(path)
+            index = self._index(path, encoding)
+            result.update({
+                'success': True,
+                'path': str(path),
+                'totalLines': index.total,
+                'size': index.size,
+                'version': index.version,
+                'backupId': backup.get('backup_id'),
+            })
+            print(f"DEBUG: Lines {start}-{end} of {path} replaced by {len(lines)} line(s)")
+        except UnicodeEncodeError as e:
+            result['error'] = (f"Caractère non représentable en {e.encoding}: "
+                               f"{e.object[e.start:e.end]!r}")
+        except (OSError, ValueError) as e:
+            result['error'] = str(e)
+            print(f"Erreur édition fichier: {e}")
+        return result
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Utilitaires fichiers pour RenExtract v2
+"""
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+
+
+@contextmanager
+def atomic_writer(path: Union[str, Path]) -> Iterator[BinaryIO]:
+    """Fichier binaire écrit en flux puis mis en place de façon atomique.
+
+    Le contenu est écrit dans un fichier temporaire du même dossier, qui
+    remplace la cible (os.replace) seulement si le bloc se termine sans
+    erreur: la cible n'est jamais laissée à moitié écrite.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp',
+                                    dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """Écrit des octets de façon atomique (fichier temporaire + os.replace).
+
+    Le fichier cible n'est jamais laissé à moitié écrit: soit l'ancien
+    contenu, soit le nouveau.
+    """
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def atomic_write_text(path: Union[str, Path], content: str, encoding: str = 'utf-8'):
+    """Écrit du texte de façon atomique (les fins de ligne sont conservées)"""
+    atomic_write_bytes(path, content.encode(encoding))
+
+
+@contextmanager
+def mapped_file(path: Union[str, Path]) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Fichier projeté en mémoire en lecture seule (mmap).
+
+    Les pages sont lues à la demande par le système, sans copie du fichier
+    dans la mémoire de Python: un script de plusieurs dizaines de Mo se
+    parcourt par tranches. Un fichier vide (refusé par mmap) donne b''.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            mapping = None
+    if mapping is None:
+        yield b''
+        return
+    try:
+        yield mapping
+    finally:
+        try:
+            mapping.close()
+        except BufferError:
+            # Une vue (memoryview) existe encore: libéré avec elle
+            pass
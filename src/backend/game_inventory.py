@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Game Inventory for RenExtract v2
+Inventaire des fichiers d'un jeu Ren'Py (.rpy, .rpyc, .rpa): chemin,
+taille, date, type, nombre de lignes et encodage détecté des scripts.
+
+Les dossiers sont parcourus en parallèle (os.scandir, un dossier par tâche)
+et l'inventaire reste en cache par jeu. Un nouveau scan ne relit que les
+dossiers dont la date a changé (fichier ajouté, supprimé ou renommé); dans
+les autres, les fichiers connus sont seulement revérifiés (stat) et leurs
+lignes recomptées (encodage redétecté) s'ils ont changé.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.backend.extraction import IGNORED_DIRS, count_lines, game_scripts_root
+from src.backend.file_utils import mapped_file
+from src.backend.script_encoding import SAMPLE_SIZE, sniff_encoding
+
+# Types de fichiers inventoriés, par extension
+INVENTORY_KINDS = {'.rpy': 'rpy', '.rpyc': 'rpyc', '.rpa': 'rpa'}
+
+# Tâches de parcours simultanées (accès disque: plus que de cœurs)
+SCAN_WORKERS = 8
+
+# Nombre de jeux dont l'inventaire est gardé en cache (LRU)
+MAX_CACHED_GAMES = 8
+
+
+def file_kind(name: str) -> Optional[str]:
+    """Type d'un fichier inventorié ('rpy', 'rpyc', 'rpa'), sinon None"""
+    return INVENTORY_KINDS.get(os.path.splitext(name)[1].lower())
+
+
+class DirectoryListing:
+    """Contenu d'un dossier à une date donnée: fichiers inventoriés et
+    sous-dossiers parcourus"""
+
+    __slots__ = ('mtime', 'files', 'subdirs')
+
+    def __init__(self, mtime: int, files: List[str], subdirs: List[str]):
+        self.mtime = mtime
+        self.files = files
+        self.subdirs = subdirs
+
+
+class GameInventory:
+    """Inventaire en cache d'un dossier de scripts"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.directories: Dict[str, DirectoryListing] = {}
+        self.files: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _join(directory: str, name: str) -> str:
+        return f"{directory}/{name}" if directory else name
+
+    def _file_entry(self, relative: str) -> Tuple[Dict, bool]:
+        """Entrée d'un fichier; (entrée, relue?). L'entrée en cache est
+        reprise si la taille et la date n'ont pas changé."""
+        path = self.root / relative
+        stat = path.stat()
+        previous = self.files.get(relative)
+        if previous and (previous['size'], previous['mtime']) == (stat.st_size,
+                                                                  stat.st_mtime_ns):
+            return previous, False
+        kind = file_kind(relative)
+        entry = {'path': relative, 'kind': kind, 'size': stat.st_size,
+                 'mtime': stat.st_mtime_ns, 'lines': None, 'encoding': None}
+        if kind == 'rpy':
+            with mapped_file(path) as data:
+                entry['encoding'] = sniff_encoding(data[:SAMPLE_SIZE])
+                entry['lines'] = count_lines(data)
+        return entry, True
+
+    def _scan_directory(self, directory: str) -> Tuple[str, DirectoryListing, List[Dict],
+                                                       bool, int]:
+        """Parcourt un dossier (tâche parallèle, lecture seule du cache);
+        retourne (dossier, contenu, entrées, relu?, fichiers relus)"""
+        path = self.root / directory if directory else self.root
+        mtime = path.stat().st_mtime_ns
+        listing = self.directories.get(directory)
+        listed = listing is None or listing.mtime != mtime
+        if listed:
+            files, subdirs = [], []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if name.lower() not in IGNORED_DIRS and not name.startswith('.'):
+                            subdirs.append(name)
+                    elif file_kind(name) and entry.is_file():
+                        files.append(name)
+            listing = DirectoryListing(mtime, sorted(files), sorted(subdirs))
+
+        entries, reread = [], 0
+        for name in listing.files:
+            try:
+                entry, changed = self._file_entry(self._join(directory, name))
+            except OSError as e:
+                # Supprimé entre le listage et la lecture
+                print(f"DEBUG: Inventory skipped {self._join(directory, name)}: {e}")
+                continue
+            entries.append(entry)
+            reread += changed
+        return directory, listing, entries, listed, reread
+
+    def scan(self) -> Dict[str, int]:
+        """Met l'inventaire à jour; retourne les compteurs du scan"""
+        directories: Dict[str, DirectoryListing] = {}
+        files: Dict[str, Dict] = {}
+        counts = {'rescanned': 0, 'reread': 0}
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            pending: Set[Future] = {executor.submit(self._scan_directory, '')}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        directory, listing, entries, listed, reread = future.result()
+                    except OSError as e:
+                        # Dossier supprimé ou illisible: ignoré
+                        print(f"DEBUG: Inventory directory skipped: {e}")
+                        continue
+                    directories[directory] = listing
+                    files.update((entry['path'], entry) for entry in entries)
+                    counts['rescanned'] += listed
+                    counts['reread'] += reread
+                    pending.update(executor.submit(self._scan_directory,
+                                                   self._join(directory, name))
+                                   for name in listing.subdirs)
+        self.directories = directories
+        self.files = files
+        counts['directories'] = len(directories)
+        return counts
+
+
+class GameScanner:
+    """Inventaires des jeux, gardés en cache par dossier de scripts"""
+
+    def __init__(self):
+        self._inventories: 'OrderedDict[str, GameInventory]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def roots(self) -> List[Path]:
+        """Dossiers de scripts des jeux inventoriés"""
+        with self._lock:
+            return [Path(key) for key in self._inventories]
+
+    def record_encodings(self, game_path: str, encodings: Dict[str, str]):
+        """Corrige l'encodage en cache de scripts (chemin relatif -> encodage)
+        que l'échantillon lu au scan avait mal classés"""
+        if not encodings:
+            return
+        key = str(game_scripts_root(Path(game_path)).resolve())
+        with self._lock:
+            inventory = self._inventories.get(key)
+            if inventory is None:
+                return
+            for relative, encoding in encodings.items():
+                entry = inventory.files.get(relative)
+                if entry is not None:
+                    entry['encoding'] = encoding
+
+    def scan(self, game_path: str) -> Dict:
+        """Inventaire à jour des fichiers d'un jeu"""
+        result = {'success': False, 'error': None}
+        started = time.perf_counter()
+        try:
+            root = game_scripts_root(Path(game_path)).resolve()
+            if not root.is_dir():
+                raise ValueError(f"Dossier du jeu introuvable: {game_path}")
+            key = str(root)
+            # Scans d'un même jeu (ou de plusieurs) l'un après l'autre
+            with self._lock:
+                inventory = self._inventories.get(key) or GameInventory(root)
+                counts = inventory.scan()
+                self._inventories[key] = inventory
+                self._inventories.move_to_end(key)
+                while len(self._inventories) > MAX_CACHED_GAMES:
+                    self._inventories.popitem(last=False)
+                files = sorted(inventory.files.values(), key=lambda entry: entry['path'])
+
+            kinds = {kind: 0 for kind in INVENTORY_KINDS.values()}
+            for entry in files:
+                kinds[entry['kind']] += 1
+            elapsed = time.perf_counter() - started
+            result.update({
+                'success': True,
+                'root': key,
+                'files': files,
+                'counts': kinds,
+                'totalSize': sum(entry['size'] for entry in files),
+                **counts,
+                'elapsed': round(elapsed, 3),
+            })
+            print(f"DEBUG: Inventory of {key}: {len(files)} file(s), "
+                  f"{counts['rescanned']}/{counts['directories']} folder(s) rescanned "
+                  f"in {elapsed:.3f}s")
+        except (OSError, ValueError) as e:
+            result['error'] = str(e)
+            print(f"Erreur inventaire: {e}")
+        return result
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Placeholders for RenExtract v2
+Protège les éléments Ren'Py qui ne doivent pas être traduits (balises de
+texte, interpolations, séquences d'échappement, formats printf) en les
+remplaçant par des placeholders numérotés, puis les restaure après
+traduction en vérifiant qu'aucun n'a été perdu ou inventé.
+"""
+import operator
+import re
+from collections import deque
+from itertools import chain, compress, repeat
+from typing import List, Optional, Tuple
+
+DEFAULT_PLACEHOLDER_FORMAT = 'PLACEHOLDER_{n}'
+
+# Textes restaurés ensemble par restore_many (un split par bloc)
+RESTORE_BLOCK = 4096
+
+# Numéro du placeholder qui sépare les textes d'un bloc: jamais émis par
+# protect() et refusé par restore() (numéro non canonique)
+BOUNDARY_NUMBER = '00'
+
+# Version des règles de protection: les textes protégés selon d'autres
+# règles ne sont pas repris tels quels (voir extraction.ExtractionCache)
+PROTECTION_VERSION = 2
+
+# Grammaire Ren'Py compilée en un seul scanner. Chaque alternative n'utilise
+# que des classes de caractères niées: pas de retour arrière, temps linéaire.
+RENPY_TOKEN = re.compile(r'''
+      \{\{                                   # accolade littérale échappée
+    | \[\[                                   # crochet littéral échappé
+    | %%                                     # pourcentage littéral
+    | \\.                                    # séquence d'échappement (\n, \\, \%...)
+    | \{[^{}]*\}                             # balise de texte: {b}, {/i}, {color=#f00}, {w=.5}
+    | \[[^\[\]]*\]                           # interpolation: [player_name], [mc!t]
+    | %(?:\([^()]*\))?[-#0+]*(?:\d+|\*)?(?:\.\d+)?[sdif]  # printf: %s, %(name)d
+''', re.VERBOSE)
+
+
+class PlaceholderProtector:
+    """Protection/restauration des éléments Ren'Py autour de la traduction"""
+
+    def __init__(self, placeholder_format: str = DEFAULT_PLACEHOLDER_FORMAT):
+        """
+        Args:
+            placeholder_format: Format des placeholders, '{n}' étant remplacé
+                par le numéro (paramètre extraction.placeholderFormat)
+        """
+        if not placeholder_format or placeholder_format.count('{n}') != 1:
+            raise ValueError("Le format des placeholders doit contenir '{n}' une fois")
+        self.placeholder_format = placeholder_format
+        prefix, suffix = placeholder_format.split('{n}')
+        self._prefix = prefix
+        self._suffix = suffix
+        # Le modèle peut changer la casse d'un placeholder: on la tolère
+        self._placeholder = re.compile(
+            re.escape(prefix) + r'(\d+)' + re.escape(suffix), re.IGNORECASE)
+        # Séparateur des textes restaurés par blocs (voir restore_many), si
+        # aucun placeholder ne peut empiéter dessus: premier caractère du
+        # préfixe ni chiffre, ni répété dans le préfixe ou le suffixe
+        first = prefix[:1].lower()
+        safe = first and not first.isdigit() and first not in (prefix[1:] + suffix).lower()
+        self._boundary = self.placeholder(BOUNDARY_NUMBER) if safe else None
+        # Numéros attendus dans un texte à n+1 éléments, séparateur compris
+        self._expected: List[Tuple[str, ...]] = []
+
+    def placeholder(self, index: int) -> str:
+        """Placeholder numéro 'index'"""
+        return f"{self._prefix}{index}{self._suffix}"
+
+    def has_placeholder(self, text: str) -> bool:
+        """Le texte contient-il un placeholder (restauré ou non)?"""
+        return self._placeholder.search(text) is not None
+
+    def protect(self, text: str) -> Tuple[str, List[str]]:
+        """Remplace les éléments protégés; retourne (texte, éléments).
+
+        Un texte qui contient déjà quelque chose ressemblant à un placeholder
+        n'est pas protégé (la restauration serait ambiguë), pas plus qu'un
+        texte où un chiffre suit un élément protégé quand le format n'a pas
+        de suffixe ('[day]0' donnerait 'PLACEHOLDER_00').
+        """
+        if self.has_placeholder(text):
+            return text, []
+        tokens: List[str] = []
+        ambiguous = False
+
+        def replace(match: re.Match) -> str:
+            nonlocal ambiguous
+            if not self._suffix and text[match.end():match.end() + 1].isdecimal():
+                ambiguous = True
+            tokens.append(match.group(0))
+            return self.placeholder(len(tokens) - 1)
+
+        protected = RENPY_TOKEN.sub(replace, text)
+        if ambiguous:
+            return text, []
+        return protected, tokens
+
+    def restore(self, text: str, tokens: List[str]) -> Optional[str]:
+        """Restaure les éléments protégés; None si la traduction a perdu,
+        dupliqué ou inventé un placeholder."""
+        if not tokens:
+            return text
+        # [texte, numéro, texte, numéro, ..., texte]
+        parts = self._placeholder.split(text)
+        if len(parts) != 2 * len(tokens) + 1:
+            return None
+        # Chaque numéro exactement une fois (l'ordre peut changer à la
+        # traduction), écrit tel qu'émis: '00' est un chiffre collé à '0'
+        indexes = [int(index) for index in parts[1::2]]
+        if sorted(indexes) != list(range(len(tokens))):
+            return None
+        if any(str(index) != number for index, number in zip(indexes, parts[1::2])):
+            return None
+        parts[1::2] = [tokens[index] for index in indexes]
+        return ''.join(parts)
+
+    def restore_many(self, texts: List[str], tokens: List[str],
+                     separator: str) -> List[Optional[str]]:
+        """restore() de chaque texte, ses éléments protégés étant joints par
+        'separator' ('' = aucun), comme dans tokens.txt.
+
+        Les textes protégés sont traités par blocs: un bloc dont les
+        placeholders sont tous intacts et dans l'ordre est restauré en un
+        split et un join, sans boucle par texte; les autres blocs le sont
+        texte par texte.
+        """
+        restored: List[Optional[str]] = list(texts)
+        protected = list(compress(range(len(tokens)), tokens))
+        for start in range(0, len(protected), RESTORE_BLOCK):
+            positions = protected[start:start + RESTORE_BLOCK]
+            block_texts = list(map(texts.__getitem__, positions))
+            block_tokens = list(map(tokens.__getitem__, positions))
+            block = self._restore_block(block_texts, block_tokens, separator)
+            if block is None:
+                block = [self.restore(text, protected_tokens.split(separator))
+                         for text, protected_tokens in zip(block_texts, block_tokens)]
+            deque(map(restored.__setitem__, positions, block), maxlen=0)
+        return restored
+
+    def _restore_block(self, texts: List[str], tokens: List[str],
+                       separator: str) -> Optional[List[str]]:
+        """Restauration d'un bloc de textes protégés où chacun contient ses
+        placeholders 0..n-1 une fois chacun, dans l'ordre; None sinon.
+
+        Les textes sont joints par un placeholder séparateur: la suite des
+        numéros d'un seul split doit être 0..n-1 puis le séparateur, texte
+        après texte. Chaque numéro est remplacé par son élément et chaque
+        séparateur par une fin de ligne (absente des textes et des éléments,
+        sinon le découpage final ne tombe pas juste).
+        """
+        if self._boundary is None:
+            return None
+        separators = list(map(str.count, tokens, repeat(separator)))
+        while len(self._expected) <= max(separators):
+            count = len(self._expected) + 1
+            self._expected.append((*map(str, range(count)), BOUNDARY_NUMBER))
+        # [texte, numéro, texte, numéro, ..., texte]
+        parts = self._placeholder.split(self._boundary.join(texts) + self._boundary)
+        if parts[1::2] != list(chain.from_iterable(map(self._expected.__getitem__,
+                                                       separators))):
+            return None
+        parts[1::2] = chain.from_iterable(map(str.split, map(operator.add, tokens,
+                                                             repeat(separator + '\n')),
+                                              repeat(separator)))
+        restored = ''.join(parts).split('\n')
+        if len(restored) != len(texts) + 1:
+            return None
+        restored.pop()
+        return restored
+
+
+def create_protector(placeholder_format: Optional[str]) -> PlaceholderProtector:
+    """Crée le protecteur; revient au format par défaut si le format est invalide"""
+    try:
+        return PlaceholderProtector(placeholder_format or DEFAULT_PLACEHOLDER_FORMAT)
+    except ValueError:
+        print(f"DEBUG: Invalid placeholder format {placeholder_format!r}, using default")
+        return PlaceholderProtector(DEFAULT_PLACEHOLDER_FORMAT)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Reconstruction for RenExtract v2
+Recolle les traductions de strings.txt dans les scripts du jeu à partir des
+positions en octets relevées à l'extraction: une fusion séquentielle du
+script original et des traductions, sans ré-analyse ni recherche/remplacement.
+
+Les scripts sont projetés en mémoire (mmap). Les traductions sont restaurées,
+échappées et encodées une fois par chaîne unique; la fusion d'un script se
+fait par colonnes (map, compress sur l'index) et le script reconstruit est
+réuni en un seul join des tranches d'origine et des traductions.
+
+Ordre de grandeur (python -m src.backend.reconstruction_benchmark): un
+script de 50 Mo et 840 000 chaînes, toutes traduites, est reconstruit en
+3,5 à 4,7 s, dont environ 2 s de calcul (lecture, placeholders, encodage,
+fusion) et le reste en écriture (sauvegarde, copie de l'original, fsync).
+Le temps est proportionnel au nombre de chaînes: la seconde n'est pas
+atteinte à cette taille. Le rapport 'phases' donne la répartition.
+
+Un script UTF-16/UTF-32 est fusionné sur sa copie UTF-8 (transcoded/, voir
+extraction) et réencodé à l'écriture.
+
+Chaque script réécrit est d'abord sauvegardé (sauvegarde SECURITY), puis
+remplacé de façon atomique. Une copie du script tel qu'extrait est gardée
+dans 01_Temporary/<jeu>/originals/: la reconstruction peut être relancée
+après avoir corrigé des traductions, sans ré-extraire.
+"""
+import json
+import operator
+import shutil
+import time
+from itertools import chain, compress, repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.backend.backup_manager import BackupManager, BackupType
+from src.backend.extraction import (MANIFEST_FILE, ORIGINALS_DIR, TOKEN_SEPARATOR,
+                                    TRANSCODED_DIR, ExtractionIndex, game_name_for,
+                                    load_strings, original_script, read_manifest,
+                                    text_encoding)
+from src.backend.file_utils import atomic_write_text, atomic_writer, mapped_file
+from src.backend.placeholders import create_protector
+from src.backend.script_encoding import is_wide, write_encoded
+from src.backend.translation_runner import UNESCAPED_QUOTE, escape_renpy
+
+# Nombre maximum de chaînes rejetées détaillées dans le résultat
+MAX_REPORTED_ISSUES = 50
+
+QUOTE = ord('"')
+
+PLACEHOLDER_ERROR = 'Placeholders altérés'
+
+# Étapes chronométrées d'une reconstruction (rapport 'phases')
+PHASES = ('load', 'restore', 'encode', 'merge', 'write')
+
+
+class FileMerge:
+    """Fusion d'un script et de ses traductions: positions des littéraux
+    remplacés et traductions encodées, dans l'ordre du fichier"""
+
+    def __init__(self):
+        self.offsets: List[int] = []
+        self.ends: List[int] = []
+        self.values: List[bytes] = []
+
+    @property
+    def replaced(self) -> int:
+        """Nombre de littéraux remplacés"""
+        return len(self.values)
+
+    def write(self, target: Path, source, encoding: Optional[str] = None):
+        """Écrit le script reconstruit de façon atomique: tranches du script
+        d'origine ('source', bytes ou mmap) et traductions, en alternance,
+        réunies en un seul bloc. Avec 'encoding', 'source' est une copie UTF-8
+        et le résultat est réencodé."""
+        gaps = map(source.__getitem__, map(slice, chain((0,), self.ends),
+                                           chain(self.offsets, (len(source),))))
+        content = b''.join(chain.from_iterable(zip(gaps, chain(self.values, (b'',)))))
+        with atomic_writer(target) as out:
+            if encoding:
+                write_encoded(out, (content,), encoding)
+            else:
+                out.write(content)
+
+
+class EncodedStrings:
+    """Traductions prêtes à recoller: une par chaîne unique de strings.txt,
+    placeholders restaurées, échappées et encodées une seule fois par
+    encodage de script (et non à chaque occurrence)"""
+
+    def __init__(self, texts: List[str], tokens: List[str], placeholder_format: str):
+        self.restored = create_protector(placeholder_format).restore_many(
+            texts, tokens, TOKEN_SEPARATOR)
+        self._encoded: Dict[str, Tuple[List[Optional[bytes]], Dict[int, str]]] = {}
+
+    def encoded(self, encoding: str) -> Tuple[List[Optional[bytes]], Dict[int, str]]:
+        """Traductions encodées (None: rejetée, le littéral d'origine est
+        conservé) et motif du rejet de chaque chaîne rejetée"""
+        if encoding not in self._encoded:
+            self._encoded[encoding] = self._encode(encoding)
+        return self._encoded[encoding]
+
+    def _encode(self, encoding: str) -> Tuple[List[Optional[bytes]], Dict[int, str]]:
+        errors = {string: PLACEHOLDER_ERROR for string in
+                  compress(range(len(self.restored)),
+                           map(operator.is_, self.restored, repeat(None)))}
+        texts = list(self.restored)
+        for string in errors:
+            texts[string] = ''
+        # Aucune fin de ligne dans les textes (lignes de strings.txt et de
+        # tokens.txt): échappement et encodage de tous les textes d'un bloc
+        joined = '\n'.join(texts)
+        if '"' in joined:
+            joined = UNESCAPED_QUOTE.sub('\\\\"', joined)
+        try:
+            values: List[Optional[bytes]] = joined.encode(encoding).split(b'\n')
+        except UnicodeEncodeError:
+            values = []
+        if len(values) != len(texts):
+            # Caractère non représentable (ou encodage où une fin de ligne
+            # n'est pas un octet isolé): chaîne par chaîne
+            values = []
+            for string, text in enumerate(texts):
+                try:
+                    values.append(escape_renpy(text).encode(encoding))
+                except UnicodeEncodeError as e:
+                    values.append(None)
+                    errors[string] = (f"Caractère non représentable en {encoding}: "
+                                      f"{e.object[e.start:e.end]!r}")
+        for string in errors:
+            values[string] = None
+        return values, errors
+
+
+def _merge_file(data, index: ExtractionIndex, entries: range, values: List[Optional[bytes]],
+                errors: Dict[int, str], relative: str,
+                issues: List[Dict]) -> Tuple[FileMerge, int]:
+    """Prépare la fusion d'un script (bytes ou mmap); retourne (fusion,
+    chaînes rejetées).
+
+    Traitement par colonnes (map, compress) plutôt que chaîne par chaîne: un
+    script de plusieurs dizaines de Mo contient des centaines de milliers de
+    chaînes.
+    """
+    first, last = entries.start, entries.stop
+    offsets = index.offsets[first:last]
+    ends = list(map(operator.add, offsets, index.lengths[first:last]))
+    # Le littéral d'origine, guillemets compris, doit être à sa place
+    quotes = b'"' * len(offsets)
+    if (bytes(map(data.__getitem__, map(operator.sub, offsets, repeat(1)))) != quotes
+            or bytes(map(data.__getitem__, ends)) != quotes):
+        entry = next(entry for entry, (offset, end) in enumerate(zip(offsets, ends))
+                     if data[offset - 1] != QUOTE or data[end] != QUOTE)
+        raise ValueError(f"Positions incohérentes ligne {index.lines[first + entry]}: "
+                         "relancez l'extraction")
+
+    strings = index.strings[first:last]
+    file_values = list(map(values.__getitem__, strings))
+    # Remplacé si la traduction diffère du littéral d'origine
+    keep = list(map(operator.ne, file_values,
+                    map(data.__getitem__, map(slice, offsets, ends))))
+    rejected = 0
+    if errors:
+        # Chaîne rejetée: le littéral d'origine est conservé
+        for entry in compress(range(len(strings)), map(errors.__contains__, strings)):
+            keep[entry] = False
+            rejected += 1
+            if len(issues) < MAX_REPORTED_ISSUES:
+                issues.append({'file': relative, 'line': index.lines[first + entry],
+                               'error': errors[strings[entry]]})
+
+    merge = FileMerge()
+    merge.offsets = list(compress(offsets, keep))
+    merge.ends = list(compress(ends, keep))
+    merge.values = list(compress(file_values, keep))
+    return merge, rejected
+
+
+def reconstruct_game(game_path: str, temporary_dir: Path,
+                     backup_manager: BackupManager) -> Dict:
+    """Reconstruit les scripts traduits d'un jeu à partir de son extraction"""
+    result = {'success': False, 'error': None}
+    started = time.perf_counter()
+    try:
+        output_dir = Path(temporary_dir) / game_name_for(Path(game_path))
+        manifest = read_manifest(output_dir)
+        root = Path(manifest['scriptsRoot'])
+        # Un strings.txt incomplet est détecté avant d'écrire le moindre script
+        phases = dict.fromkeys(PHASES, 0.0)
+        index, texts, tokens = load_strings(output_dir, manifest)
+        phases['load'] = time.perf_counter() - started
+        mark = time.perf_counter()
+        strings = EncodedStrings(texts, tokens, manifest['placeholderFormat'])
+        phases['restore'] = time.perf_counter() - mark
+
+        counts = {'rewritten': 0, 'unchanged': 0, 'strings': index.count,
+                  'translated': 0, 'rejected': 0, 'backups': 0}
+        errors: List[Dict] = []
+        issues: List[Dict] = []
+        for file_index, info in enumerate(manifest['files']):
+            entries = index.file_range(file_index)
+            if not entries:
+                continue
+            relative = info['path']
+            path = root / relative
+            original = output_dir / ORIGINALS_DIR / relative
+            # Encodage détecté à l'extraction, sinon celui du jeu
+            encoding = text_encoding(info.get('encoding', manifest['encoding']))
+            # Script UTF-16/UTF-32: positions et traductions en UTF-8
+            wide = encoding if is_wide(encoding) else None
+            transcoded = output_dir / TRANSCODED_DIR / relative
+            try:
+                source = original_script(path, original, info)
+                if source is None:
+                    raise ValueError("Modifié depuis l'extraction: relancez l'extraction")
+                mark = time.perf_counter()
+                values, rejections = strings.encoded('utf-8' if wide else encoding)
+                phases['encode'] += time.perf_counter() - mark
+                mark = time.perf_counter()
+                with mapped_file(transcoded if wide else source) as data:
+                    merge, rejected = _merge_file(data, index, entries, values,
+                                                  rejections, relative, issues)
+                phases['merge'] += time.perf_counter() - mark
+                counts['rejected'] += rejected
+                if not merge.replaced and source == path:
+                    counts['unchanged'] += 1
+                    continue
+
+                mark = time.perf_counter()
+                backup = backup_manager.create_backup(
+                    str(path), BackupType.SECURITY, 'Avant reconstruction')
+                if not backup['success']:
+                    raise OSError(f"Sauvegarde impossible: {backup['error']}")
+                counts['backups'] += 1
+                if source == path:
+                    original.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(path, original)
+
+                # Lecture depuis la copie: le script du jeu n'est pas projeté en
+                # mémoire quand il est remplacé (refusé sous Windows)
+                with mapped_file(transcoded if wide else original) as data:
+                    merge.write(path, data, wide)
+                phases['write'] += time.perf_counter() - mark
+                stat = path.stat()
+                info['reconstructed'] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+                counts['rewritten'] += 1
+                counts['translated'] += merge.replaced
+            except (OSError, ValueError) as e:
+                errors.append({'file': relative, 'error': str(e)})
+                print(f"DEBUG: Reconstruction skipped {relative}: {e}")
+
+        atomic_write_text(output_dir / MANIFEST_FILE,
+                          json.dumps(manifest, ensure_ascii=False, indent=1))
+        elapsed = time.perf_counter() - started
+        result.update({
+            'success': True,
+            'outputDir': str(output_dir),
+            'files': len(manifest['files']),
+            **counts,
+            'issues': issues,
+            'errors': errors,
+            'elapsed': round(elapsed, 3),
+            'phases': {phase: round(seconds, 3) for phase, seconds in phases.items()},
+        })
+        print(f"DEBUG: Reconstruction of {game_path}: {counts['rewritten']} file(s) "
+              f"rewritten, {counts['translated']} string(s) in {elapsed:.2f}s")
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+        print(f"Erreur reconstruction: {e}")
+    return result
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Reconstruction Benchmark for RenExtract v2
+Mesure le temps de reconstruction d'un jeu Ren'Py synthétique (taille de
+script et densité de balises configurables), de bout en bout et par étape:
+lecture de l'extraction, restauration des placeholders, encodage, fusion et
+écriture (sauvegarde SECURITY, copie de l'original et remplacement atomique
+compris).
+
+Usage:
+    python -m src.backend.reconstruction_benchmark
+    python -m src.backend.reconstruction_benchmark --size 50 --runs 3
+    python -m src.backend.reconstruction_benchmark --size 10 --files 20 --tag-density 2
+"""
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from src.backend.backup_manager import BackupManager
+from src.backend.extraction import STRINGS_FILE, extract_game, game_name_for
+from src.backend.reconstruction import PHASES, reconstruct_game
+from src.backend.translation_benchmark import TAGS, WORDS
+
+
+def generate_game(game: Path, size_mb: float, files: int = 1, seed: int = 42,
+                  tag_density: float = 0.5):
+    """Écrit un jeu Ren'Py synthétique d'environ size_mb Mo répartis sur
+    'files' scripts (dialogues, dont quelques répliques répétées)"""
+    rng = random.Random(seed)
+    scripts = game / 'game'
+    scripts.mkdir(parents=True, exist_ok=True)
+    budget = int(size_mb * 1024 * 1024 / files)
+    for file_index in range(files):
+        lines = [f'label chapter_{file_index}:\n']
+        size = 0
+        while size < budget:
+            words = [rng.choice(WORDS) for _ in range(rng.randint(3, 12))]
+            tags = int(tag_density) + (rng.random() < tag_density % 1)
+            for _ in range(tags):
+                position = rng.randrange(len(words))
+                words[position] = rng.choice(TAGS) % words[position]
+            text = ' '.join(words).capitalize()
+            # Réplique unique la plupart du temps, répétée sinon
+            if rng.random() < 0.9:
+                text += f' ({file_index}.{len(lines)})'
+            line = f'    e "{text}"\n'
+            lines.append(line)
+            size += len(line)
+        (scripts / f"script_{file_index:04}.rpy").write_text(''.join(lines), encoding='utf-8')
+
+
+def translate_strings(output_dir: Path):
+    """Traduction factice de toutes les chaînes de strings.txt (placeholders
+    conservés): chaque littéral du jeu est remplacé"""
+    strings = output_dir / STRINGS_FILE
+    lines = strings.read_text(encoding='utf-8').splitlines()
+    strings.write_text(''.join(f"FR {line.replace('the', 'le')}\n" for line in lines),
+                       encoding='utf-8')
+
+
+def run_benchmark(size_mb: float, files: int, runs: int, tag_density: float) -> Dict:
+    """Reconstruit plusieurs fois le même jeu, chaque run repartant du jeu
+    et de l'extraction d'origine"""
+    workdir = Path(tempfile.mkdtemp(prefix='renextract_rebuild_bench_'))
+    try:
+        pristine_game = workdir / 'pristine' / 'Jeu'
+        pristine_temporary = workdir / 'pristine' / '01_Temporary'
+        generate_game(pristine_game, size_mb, files, tag_density=tag_density)
+        size = sum(path.stat().st_size for path in (pristine_game / 'game').glob('*.rpy'))
+
+        game = workdir / 'Jeu'
+        temporary_dir = workdir / '01_Temporary'
+        shutil.copytree(pristine_game, game)
+        extraction = extract_game(str(game), temporary_dir)
+        if not extraction['success']:
+            raise ValueError(extraction['error'])
+        translate_strings(temporary_dir / game_name_for(game))
+        # Le manifeste désigne le jeu par son chemin: jeu et extraction de
+        # référence remis en place avant chaque run
+        shutil.copytree(temporary_dir, pristine_temporary)
+
+        results = []
+        for _ in range(runs):
+            for target, pristine in ((game, pristine_game), (temporary_dir, pristine_temporary)):
+                shutil.rmtree(target)
+                shutil.copytree(pristine, target)
+            backups = workdir / 'backups'
+            shutil.rmtree(backups, ignore_errors=True)
+            report = reconstruct_game(str(game), temporary_dir, BackupManager(str(backups)))
+            if not report['success']:
+                raise ValueError(report['error'])
+            results.append({key: report[key] for key in
+                            ('elapsed', 'phases', 'rewritten', 'translated', 'rejected')})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'sizeMB': round(size / 1024 / 1024, 1),
+        'files': files,
+        'tagDensity': tag_density,
+        'strings': extraction['strings'],
+        'runs': results,
+        'medianElapsed': round(statistics.median(run['elapsed'] for run in results), 3),
+        'medianPhases': {phase: round(statistics.median(run['phases'][phase]
+                                                         for run in results), 3)
+                         for phase in PHASES},
+    }
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description='Benchmark de la reconstruction')
+    parser.add_argument('--size', type=float, default=50, help='Taille du jeu en Mo')
+    parser.add_argument('--files', type=int, default=1, help='Nombre de scripts')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--tag-density', type=float, default=0.5,
+                        help='Éléments Ren\'Py protégés par réplique, en moyenne')
+    parser.add_argument('--json', help='Écrit les résultats dans ce fichier JSON')
+    args = parser.parse_args(argv)
+
+    summary = run_benchmark(args.size, args.files, max(1, args.runs), args.tag_density)
+
+    print(f"{summary['sizeMB']:g} Mo, {summary['files']} script(s), "
+          f"{summary['strings']} chaîne(s)")
+    print(f"{'run':>3} {'temps (s)':>9} " + ' '.join(f"{phase:>8}" for phase in PHASES))
+    for number, run in enumerate(summary['runs'], 1):
+        print(f"{number:>3} {run['elapsed']:>9.3f} "
+              + ' '.join(f"{run['phases'][phase]:>8.3f}" for phase in PHASES))
+    print(f"{'med':>3} {summary['medianElapsed']:>9.3f} "
+          + ' '.join(f"{summary['medianPhases'][phase]:>8.3f}" for phase in PHASES))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
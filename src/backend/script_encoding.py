@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script Encoding for RenExtract v2
+Détection de l'encodage de chaque script et transcodage en flux.
+
+L'encodage est déduit d'un échantillon du début du fichier: BOM, puis
+texte UTF-16 sans BOM (un octet nul sur deux), puis validité UTF-8 (décodeur
+incrémental: une séquence coupée en fin d'échantillon n'est pas une
+erreur), sinon un encodage 8 bits d'Europe occidentale. Les anciens jeux
+mélangent ainsi UTF-8, cp1252 et UTF-16 sans réglage par fichier. Un
+script supposé UTF-8 dont la suite ne l'est pas est réextrait en 8 bits
+(voir extraction._extract_file).
+
+Les scripts UTF-16/UTF-32 ne peuvent pas être analysés sur leurs octets:
+ils sont transcodés en UTF-8 par blocs (décodeur/encodeur incrémentaux),
+analysés sur cette copie, puis réencodés à la reconstruction. Le BOM
+d'origine est conservé (caractère U+FEFF dans la copie).
+"""
+import codecs
+from pathlib import Path
+from typing import Iterable, Union
+
+from src.backend.file_utils import atomic_writer
+
+# Taille de l'échantillon lu pour la détection
+SAMPLE_SIZE = 64 * 1024
+
+# Taille des blocs transcodés
+TRANSCODE_CHUNK = 1024 * 1024
+
+# BOM et encodage correspondant (UTF-32 avant UTF-16: même début en LE).
+# L'ordre des octets est explicite: le BOM reste dans le texte et est
+# réécrit tel quel à la reconstruction.
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Encodages à transcoder (non compatibles ASCII octet par octet)
+WIDE_ENCODINGS = frozenset({'utf-16-le', 'utf-16-be', 'utf-32-le', 'utf-32-be'})
+
+# Suppositions pour un texte 8 bits: l'encodage configuré, s'il n'est pas
+# UTF-8, est plus sûr qu'une supposition
+LEGACY_ENCODINGS = frozenset({'cp1252', 'latin-1'})
+
+# Octets sans caractère en cp1252 (présents en latin-1 comme contrôles C1)
+CP1252_UNDEFINED = bytes((0x81, 0x8D, 0x8F, 0x90, 0x9D))
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """Encodage probable d'un script d'après le début de son contenu"""
+    for bom, name in BOMS:
+        if sample.startswith(bom):
+            return name
+    # UTF-16 sans BOM: texte surtout ASCII, un octet nul sur deux
+    half = len(sample) // 2
+    if half:
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        if odd > half // 3 and even * 10 < odd:
+            return 'utf-16-le'
+        if even > half // 3 and odd * 10 < even:
+            return 'utf-16-be'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    return legacy_encoding(sample)
+
+
+def legacy_encoding(data) -> str:
+    """Encodage 8 bits d'un texte qui n'est pas de l'UTF-8 (bytes ou mmap)"""
+    if any(data.find(bytes((byte,))) >= 0 for byte in CP1252_UNDEFINED):
+        return 'latin-1'
+    return 'cp1252'
+
+
+def detect_file_encoding(path: Union[str, Path]) -> str:
+    """Encodage probable d'un script (seul l'échantillon est lu)"""
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(SAMPLE_SIZE))
+
+
+def resolve_encoding(detected: str, configured: str) -> str:
+    """Encodage retenu pour un script: celui détecté, sauf supposition 8 bits
+    quand un encodage non UTF-8 est configuré (extraction.encoding)"""
+    if detected in LEGACY_ENCODINGS and configured != 'utf-8':
+        return configured
+    return detected
+
+
+def is_wide(encoding: str) -> bool:
+    """Le script doit-il être transcodé pour être analysé?"""
+    return encoding in WIDE_ENCODINGS
+
+
+def transcode_to_utf8(source: Union[str, Path], target: Union[str, Path], encoding: str):
+    """Copie UTF-8 d'un script, décodé par blocs (UnicodeDecodeError si
+    le script n'est pas valide dans 'encoding': la cible est alors intacte)"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with atomic_writer(target) as out, open(source, 'rb') as f:
+        while True:
+            block = f.read(TRANSCODE_CHUNK)
+            if not block:
+                break
+            out.write(decoder.decode(block).encode('utf-8'))
+        out.write(decoder.decode(b'', final=True).encode('utf-8'))
+
+
+def write_encoded(out, pieces: Iterable, encoding: str):
+    """Écrit des morceaux de texte UTF-8 (bytes ou vues) réencodés en
+    'encoding', par morceau (décodeur/encodeur incrémentaux)"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    encoder = codecs.getincrementalencoder(encoding)()
+    for piece in pieces:
+        out.write(encoder.encode(decoder.decode(piece)))
+    out.write(encoder.encode(decoder.decode(b'', final=True), final=True))
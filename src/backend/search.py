@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Search for RenExtract v2
+Index plein texte des chaînes extraites d'un jeu (texte d'origine et
+traduction), dans 01_Temporary/<jeu>/search.db: une table SQLite FTS5 avec
+le tokenizer 'trigram', qui trouve n'importe quelle sous-chaîne (nom de
+personnage, fragment de réplique) sans parcourir les scripts.
+
+L'index est construit après l'extraction. Quand seul strings.txt a changé
+(traduction, correction), seules les traductions modifiées sont mises à
+jour; une nouvelle extraction (index.bin) reconstruit l'index complet.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.backend.extraction import (INDEX_FILE, ORIGINALS_DIR, STRINGS_FILE,
+                                    TOKEN_SEPARATOR, TRANSCODED_DIR, ExtractionIndex,
+                                    game_name_for, load_strings, original_script,
+                                    read_manifest, text_encoding)
+from src.backend.file_utils import mapped_file
+from src.backend.placeholders import create_protector
+from src.backend.script_encoding import is_wide
+
+SEARCH_DB = 'search.db'
+
+# Version du schéma de l'index (reconstruit s'il change)
+SEARCH_FORMAT_VERSION = 1
+
+# Le tokenizer trigram ne sait chercher que des motifs de 3 caractères ou plus
+MIN_MATCH_LENGTH = 3
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SEARCH_FIELDS = ('all', 'source', 'translation')
+
+# Une seule construction d'index à la fois
+_build_lock = threading.Lock()
+
+
+def _stat_key(path: Path) -> str:
+    """Empreinte (taille, date) d'un fichier de l'extraction"""
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _connect_read_only(db_path: Path) -> sqlite3.Connection:
+    """Connexion en lecture seule: URI file: construite par pathlib, pour
+    qu'un '#', '?' ou '%' du dossier du jeu ne soit pas interprété"""
+    return sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+
+
+def _read_meta(db_path: Path) -> Dict[str, str]:
+    """Métadonnées d'un index existant ({} si absent ou illisible)"""
+    if not db_path.is_file():
+        return {}
+    try:
+        connection = _connect_read_only(db_path)
+        try:
+            return dict(connection.execute('SELECT key, value FROM meta'))
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return {}
+
+
+def _translations(output_dir: Path, manifest: Dict) -> Tuple[ExtractionIndex, List[str]]:
+    """Index et traduction de chaque occurrence: textes de strings.txt avec
+    leurs éléments protégés restaurés, une fois par chaîne unique (un texte
+    aux placeholders altérés est gardé tel quel)"""
+    index, texts, tokens = load_strings(output_dir, manifest)
+    restore = create_protector(manifest['placeholderFormat']).restore
+    restored = [restore(text, protected.split(TOKEN_SEPARATOR)) if protected else text
+                for text, protected in zip(texts, tokens)]
+    unique = [text if value is None else value for text, value in zip(texts, restored)]
+    return index, [unique[string] for string in index.strings]
+
+
+def _sources(output_dir: Path, manifest: Dict, index: ExtractionIndex) -> List[Optional[str]]:
+    """Littéraux d'origine relus dans les scripts (None pour un script
+    modifié depuis l'extraction)"""
+    root = Path(manifest['scriptsRoot'])
+    sources: List[Optional[str]] = [None] * index.count
+    for file_index, info in enumerate(manifest['files']):
+        entries = index.file_range(file_index)
+        if not entries:
+            continue
+        relative = info['path']
+        source = original_script(root / relative, output_dir / ORIGINALS_DIR / relative, info)
+        if source is None:
+            print(f"DEBUG: Search index without source text for {relative}")
+            continue
+        encoding = text_encoding(info.get('encoding', manifest['encoding']))
+        if is_wide(encoding):
+            # Positions relevées sur la copie UTF-8
+            source, encoding = output_dir / TRANSCODED_DIR / relative, 'utf-8'
+        try:
+            with mapped_file(source) as data:
+                sources[entries.start:entries.stop] = [
+                    data[offset:offset + length].decode(encoding, errors='replace')
+                    for offset, length in zip(index.offsets[entries.start:entries.stop],
+                                              index.lengths[entries.start:entries.stop])]
+        except OSError as e:
+            print(f"DEBUG: Search index without source text for {relative}: {e}")
+    return sources
+
+
+def _build(output_dir: Path, db_path: Path, keys: Dict[str, str]) -> int:
+    """Construit l'index complet à côté, puis le met en place"""
+    manifest = read_manifest(output_dir)
+    index, translations = _translations(output_dir, manifest)
+    sources = _sources(output_dir, manifest, index)
+    paths = [info['path'] for info in manifest['files']]
+
+    temporary = db_path.with_name(f".{db_path.name}.tmp")
+    if temporary.exists():
+        temporary.unlink()
+    connection = sqlite3.connect(temporary)
+    try:
+        # Fichier temporaire reconstructible: ni journal ni synchronisation
+        connection.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE VIRTUAL TABLE strings USING fts5(
+                source, translation, file UNINDEXED, line UNINDEXED,
+                tokenize = 'trigram');
+        """)
+        # Une traduction identique au texte d'origine n'est pas indexée deux fois
+        connection.executemany(
+            'INSERT INTO strings (rowid, source, translation, file, line) '
+            'VALUES (?, ?, ?, ?, ?)',
+            ((position + 1, source, None if translation == source else translation,
+              paths[file_index], line)
+             for position, (source, translation, file_index, line)
+             in enumerate(zip(sources, translations, index.files, index.lines))))
+        connection.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', keys.items())
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(temporary, db_path)
+    return index.count
+
+
+def _update_translations(output_dir: Path, db_path: Path, keys: Dict[str, str]) -> int:
+    """Met à jour les traductions modifiées dans strings.txt (même extraction)"""
+    manifest = read_manifest(output_dir)
+    _, translations = _translations(output_dir, manifest)
+    connection = sqlite3.connect(db_path)
+    try:
+        changed: List[Tuple[Optional[str], int]] = []
+        for rowid, source, previous in connection.execute(
+                'SELECT rowid, source, translation FROM strings'):
+            translation = translations[rowid - 1]
+            if translation == source:
+                translation = None
+            if translation != previous:
+                changed.append((translation, rowid))
+        with connection:
+            connection.executemany('UPDATE strings SET translation = ? WHERE rowid = ?',
+                                   changed)
+            connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                   keys.items())
+    finally:
+        connection.close()
+    return len(changed)
+
+
+def update_search_index(output_dir: Path) -> Dict:
+    """Met l'index de recherche d'une extraction à jour (construction
+    complète, ou seulement les traductions modifiées)"""
+    result = {'success': False, 'error': None}
+    started = time.perf_counter()
+    output_dir = Path(output_dir)
+    db_path = output_dir / SEARCH_DB
+    try:
+        if not (output_dir / INDEX_FILE).is_file():
+            raise ValueError("Aucune extraction pour ce jeu: lancez d'abord l'extraction")
+        with _build_lock:
+            keys = {'version': str(SEARCH_FORMAT_VERSION),
+                    'index': _stat_key(output_dir / INDEX_FILE),
+                    'strings': _stat_key(output_dir / STRINGS_FILE)}
+            meta = _read_meta(db_path)
+            if meta == keys:
+                rebuilt, updated = False, 0
+            elif all(meta.get(key) == keys[key] for key in ('version', 'index')):
+                rebuilt, updated = False, _update_translations(output_dir, db_path, keys)
+            else:
+                rebuilt, updated = True, _build(output_dir, db_path, keys)
+        elapsed = time.perf_counter() - started
+        result.update({'success': True, 'rebuilt': rebuilt, 'updated': updated,
+                       'elapsed': round(elapsed, 3)})
+        if rebuilt or updated:
+            print(f"DEBUG: Search index of {output_dir.name}: {updated} string(s) "
+                  f"{'indexed' if rebuilt else 'updated'} in {elapsed:.2f}s")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        result['error'] = str(e)
+        print(f"Erreur index de recherche: {e}")
+    return result
+
+
+def _match_clause(query: str, field: str) -> Tuple[str, List[str]]:
+    """Condition SQL d'une recherche de sous-chaîne (insensible à la casse)"""
+    columns = ['source', 'translation'] if field == 'all' else [field]
+    if len(query) >= MIN_MATCH_LENGTH:
+        phrase = '"' + query.replace('"', '""') + '"'
+        if field != 'all':
+            phrase = f"{field} : {phrase}"
+        return 'strings MATCH ?', [phrase]
+    # Motif trop court pour les trigrammes: parcours de la table
+    pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    return (' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in columns),
+            [pattern] * len(columns))
+
+
+def search_game(temporary_dir: Path, game: str, query: str, page: int = 1,
+                page_size: int = DEFAULT_PAGE_SIZE, field: str = 'all') -> Dict:
+    """Cherche une sous-chaîne dans les chaînes extraites d'un jeu.
+
+    Args:
+        game: Dossier du jeu, ou nom de son dossier dans 01_Temporary
+        field: 'all', 'source' (texte d'origine) ou 'translation'
+    """
+    result = {'success': False, 'error': None}
+    started = time.perf_counter()
+    try:
+        if not game:
+            raise ValueError('Jeu manquant')
+        name = game_name_for(Path(game)) if os.path.isdir(game) else game
+        if name in ('.', '..') or '/' in name or '\\' in name:
+            raise ValueError(f"Jeu invalide: {game}")
+        if not query:
+            raise ValueError('Recherche vide')
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Champ de recherche invalide: {field}")
+        page = max(1, int(page))
+        page_size = min(max(1, int(page_size)), MAX_PAGE_SIZE)
+
+        output_dir = Path(temporary_dir) / name
+        update = update_search_index(output_dir)
+        if not update['success']:
+            raise ValueError(update['error'])
+
+        where, parameters = _match_clause(query, field)
+        connection = _connect_read_only(output_dir / SEARCH_DB)
+        try:
+            total = connection.execute(
+                f"SELECT count(*) FROM strings WHERE {where}", parameters).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT file, line, source, translation FROM strings WHERE {where} "
+                "ORDER BY rowid LIMIT ? OFFSET ?",
+                [*parameters, page_size, (page - 1) * page_size]).fetchall()
+        finally:
+            connection.close()
+        elapsed = time.perf_counter() - started
+        result.update({
+            'success': True,
+            'game': name,
+            'query': query,
+            'total': total,
+            'page': page,
+            'pageSize': page_size,
+            'pages': (total + page_size - 1) // page_size,
+            'hits': [{'file': file, 'line': line, 'source': source,
+                      'translation': translation}
+                     for file, line, source, translation in rows],
+            'elapsed': round(elapsed, 3),
+        })
+    except (OSError, ValueError, sqlite3.Error) as e:
+        result['error'] = str(e)
+        print(f"Erreur recherche: {e}")
+    return result
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Settings Schema for RenExtract v2
+Schéma déclaratif des paramètres, compilé une seule fois en validateur,
+avec migrations entre versions et génération des types TypeScript.
+
+Usage (génération des types frontend):
+    python -m src.backend.settings_schema src/lib/settingsSchema.ts
+"""
+import copy
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Version courante du schéma (stockée dans le fichier sous 'schemaVersion').
+# Les fichiers écrits avant l'introduction du schéma sont en version 1.
+SCHEMA_VERSION = 2
+
+HEX_COLOR = r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$'
+
+SETTINGS_SCHEMA: Dict[str, Dict[str, Any]] = {
+    'language': {'type': 'string', 'default': 'fr', 'strip': True, 'min_length': 1},
+    'theme': {'type': 'string', 'enum': ['light', 'dark', 'auto'], 'default': 'dark'},
+    # false=Level 3, true=Level 4
+    'debugActive': {'type': 'boolean', 'default': False},
+    'translatorFeature': {'type': 'boolean', 'default': False},
+    'autoOpenings': {
+        'type': 'object',
+        'properties': {
+            'files': {'type': 'boolean', 'default': True},
+            'folders': {'type': 'boolean', 'default': True},
+            'reports': {'type': 'boolean', 'default': False},
+            'outputField': {'type': 'boolean', 'default': False},
+        },
+    },
+    'externalTools': {
+        'type': 'object',
+        'properties': {
+            'textEditor': {'type': 'string', 'default': 'VS Code'},
+            'translator': {'type': 'string', 'default': ''},
+        },
+    },
+    'paths': {
+        'type': 'object',
+        'properties': {
+            'renpySdk': {'type': 'string', 'default': ''},
+            'editor': {'type': 'string', 'default': ''},
+        },
+    },
+    'folders': {
+        'type': 'object',
+        'properties': {
+            'temporary': {'type': 'string', 'default': '01_Temporary/'},
+            'reports': {'type': 'string', 'default': '02_Reports/'},
+            'backups': {'type': 'string', 'default': '03_Backups/'},
+            'configs': {'type': 'string', 'default': '04_Configs/'},
+        },
+    },
+    'extraction': {
+        'type': 'object',
+        'properties': {
+            'placeholderFormat': {'type': 'string', 'default': 'PLACEHOLDER_{n}'},
+            'encoding': {'type': 'string', 'default': 'UTF-8'},
+        },
+    },
+    'colors': {
+        'type': 'object',
+        'properties': {
+            'extractButton': {'type': 'string', 'pattern': HEX_COLOR, 'default': '#3B82F6'},
+            'reconstructButton': {'type': 'string', 'pattern': HEX_COLOR, 'default': '#10B981'},
+            'verifyButton': {'type': 'string', 'pattern': HEX_COLOR, 'default': '#F59E0B'},
+            'accents': {'type': 'string', 'pattern': HEX_COLOR, 'default': '#6366F1'},
+        },
+    },
+}
+
+
+# Migrations: version N -> N+1
+def _migrate_v1_to_v2(data: Dict) -> Dict:
+    """v1 -> v2: les anciens chemins d'éditeurs (vscode, sublime, notepad,
+    atom) sont regroupés dans paths.editor."""
+    paths = data.get('paths')
+    if isinstance(paths, dict):
+        if not paths.get('editor'):
+            for legacy_key in ('vscode', 'sublime', 'notepad', 'atom'):
+                legacy = paths.get(legacy_key)
+                if isinstance(legacy, str) and legacy:
+                    paths['editor'] = legacy
+                    break
+        for legacy_key in ('vscode', 'sublime', 'notepad', 'atom'):
+            paths.pop(legacy_key, None)
+    return data
+
+
+MIGRATIONS: Dict[int, Callable[[Dict], Dict]] = {
+    1: _migrate_v1_to_v2,
+}
+
+
+class SchemaError(ValueError):
+    """Erreur de définition du schéma (détectée à la compilation)"""
+
+
+# Compilation
+Checker = Callable[[Any, str, List[str]], Tuple[bool, Any]]
+
+_PY_TYPES = {
+    'string': str,
+    'boolean': bool,
+    'integer': int,
+    'number': (int, float),
+}
+
+
+def _compile_scalar(spec: Dict[str, Any]) -> Checker:
+    """Compile un champ scalaire en fonction de vérification"""
+    field_type = spec['type']
+    py_type = _PY_TYPES[field_type]
+    enum = frozenset(spec['enum']) if 'enum' in spec else None
+    pattern = re.compile(spec['pattern']) if 'pattern' in spec else None
+    strip = bool(spec.get('strip'))
+    min_length = spec.get('min_length')
+    minimum = spec.get('minimum')
+    maximum = spec.get('maximum')
+    # bool est une sous-classe de int: l'exclure explicitement des nombres
+    reject_bool = field_type in ('integer', 'number')
+
+    def check(value, path, errors):
+        if not isinstance(value, py_type) or (reject_bool and isinstance(value, bool)):
+            errors.append(f"{path}: type {field_type} attendu")
+            return False, None
+        if strip:
+            value = value.strip()
+        if min_length is not None and len(value) < min_length:
+            errors.append(f"{path}: valeur trop courte")
+            return False, None
+        if enum is not None and value not in enum:
+            errors.append(f"{path}: valeur non autorisée")
+            return False, None
+        if pattern is not None and not pattern.match(value):
+            errors.append(f"{path}: format invalide")
+            return False, None
+        if minimum is not None and value < minimum:
+            errors.append(f"{path}: inférieur à {minimum}")
+            return False, None
+        if maximum is not None and value > maximum:
+            errors.append(f"{path}: supérieur à {maximum}")
+            return False, None
+        return True, value
+
+    return check
+
+
+def _compile_object(properties: Dict[str, Dict[str, Any]]) -> Checker:
+    """Compile un objet: table de vérificateurs indexée par clé.
+
+    Le coût dépend du nombre de clés du payload, pas de la taille du schéma.
+    """
+    checkers = {key: _compile_field(spec) for key, spec in properties.items()}
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(f"{path or '<racine>'}: objet attendu")
+            return False, None
+        picked = {}
+        for key, sub_value in value.items():
+            sub_path = f"{path}.{key}" if path else key
+            checker = checkers.get(key)
+            if checker is None:
+                errors.append(f"{sub_path}: clé inconnue")
+                continue
+            ok, clean = checker(sub_value, sub_path, errors)
+            if ok:
+                picked[key] = clean
+        return bool(picked), picked
+
+    return check
+
+
+def _compile_field(spec: Dict[str, Any]) -> Checker:
+    """Compile un champ selon son type"""
+    field_type = spec.get('type')
+    if field_type == 'object':
+        if not isinstance(spec.get('properties'), dict):
+            raise SchemaError("Un champ 'object' doit définir 'properties'")
+        return _compile_object(spec['properties'])
+    if field_type not in _PY_TYPES:
+        raise SchemaError(f"Type de champ inconnu: {field_type}")
+    if 'default' not in spec:
+        raise SchemaError("Chaque champ scalaire doit définir 'default'")
+    return _compile_scalar(spec)
+
+
+def _build_defaults(properties: Dict[str, Dict[str, Any]]) -> Dict:
+    """Construit l'arbre des valeurs par défaut"""
+    result = {}
+    for key, spec in properties.items():
+        if spec['type'] == 'object':
+            result[key] = _build_defaults(spec['properties'])
+        else:
+            result[key] = copy.deepcopy(spec['default'])
+    return result
+
+
+class CompiledSchema:
+    """Schéma compilé: validation, valeurs par défaut et migrations"""
+
+    def __init__(self, schema: Dict[str, Dict[str, Any]], version: int,
+                 migrations: Dict[int, Callable[[Dict], Dict]]):
+        self.schema = schema
+        self.version = version
+        self.migrations = migrations
+        self._check = _compile_object(schema)
+        self._defaults = _build_defaults(schema)
+
+    def defaults(self) -> Dict:
+        """Retourne une copie des valeurs par défaut"""
+        return copy.deepcopy(self._defaults)
+
+    def validate(self, payload: Any) -> Tuple[Dict, List[str]]:
+        """Retourne les clés valides du payload et la liste des rejets"""
+        errors: List[str] = []
+        _, clean = self._check(payload, '', errors)
+        return clean or {}, errors
+
+    def sanitize(self, payload: Any) -> Dict:
+        """Ne retourne que les clés valides du payload"""
+        return self.validate(payload)[0]
+
+    def migrate(self, data: Dict) -> Dict:
+        """Applique les migrations jusqu'à la version courante du schéma"""
+        version = data.pop('schemaVersion', 1)
+        if not isinstance(version, int) or isinstance(version, bool):
+            version = 1
+        while version < self.version:
+            migration = self.migrations.get(version)
+            if migration is not None:
+                data = migration(data)
+            version += 1
+        return data
+
+    def to_typescript(self, interface_name: str = 'AppSettings') -> str:
+        """Génère les types TypeScript correspondant au schéma"""
+        lines = [
+            '// Fichier généré par src/backend/settings_schema.py - ne pas modifier.',
+            '// python -m src.backend.settings_schema src/lib/settingsSchema.ts',
+            '',
+            f'export const SETTINGS_SCHEMA_VERSION = {self.version};',
+            '',
+            f'export interface {interface_name} {{',
+        ]
+        lines.extend(_ts_properties(self.schema, 1))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+
+def _ts_type(spec: Dict[str, Any], depth: int) -> List[str]:
+    """Retourne le type TypeScript d'un champ (éventuellement multi-lignes)"""
+    field_type = spec['type']
+    if field_type == 'object':
+        indent = '  ' * depth
+        return ['{', *_ts_properties(spec['properties'], depth + 1), f'{indent}}}']
+    if 'enum' in spec:
+        return [' | '.join(f"'{value}'" for value in spec['enum'])]
+    return [{'string': 'string', 'boolean': 'boolean',
+             'integer': 'number', 'number': 'number'}[field_type]]
+
+
+def _ts_properties(properties: Dict[str, Dict[str, Any]], depth: int) -> List[str]:
+    indent = '  ' * depth
+    lines = []
+    for key, spec in properties.items():
+        ts_lines = _ts_type(spec, depth)
+        lines.append(f'{indent}{key}: {ts_lines[0]}' +
+                     (';' if len(ts_lines) == 1 else ''))
+        if len(ts_lines) > 1:
+            lines.extend(ts_lines[1:-1])
+            lines.append(ts_lines[-1] + ';')
+    return lines
+
+
+# Instance compilée une seule fois au chargement du module
+settings_schema = CompiledSchema(SETTINGS_SCHEMA, SCHEMA_VERSION, MIGRATIONS)
+
+
+def main():
+    """Écrit les types TypeScript générés (ou les affiche)"""
+    output = settings_schema.to_typescript()
+    if len(sys.argv) > 1:
+        Path(sys.argv[1]).write_text(output, encoding='utf-8')
+        print(f"OK: Types TypeScript générés dans {sys.argv[1]}")
+    else:
+        print(output, end='')
+
+
+if __name__ == '__main__':
+    main()
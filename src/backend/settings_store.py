@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Settings Store for RenExtract v2
+Persistance différée (debounce) et atomique des paramètres de l'application
+"""
+import atexit
+import copy
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.backend.file_utils import atomic_write_text
+
+
+class SettingsStore:
+    """Magasin de paramètres en mémoire avec écriture disque différée.
+
+    - Les mises à jour rapprochées sont regroupées dans une fenêtre de debounce
+      et écrites par un thread en arrière-plan.
+    - L'écriture est atomique (fichier temporaire + os.replace).
+    - Un numéro de version est incrémenté à chaque changement effectif, ce qui
+      permet de répondre 304 via un ETag sur GET /api/settings.
+    """
+
+    def __init__(self, file_path: Path, defaults: Dict,
+                 validator: Optional[Callable[[Dict], Tuple[Dict, List[str]]]] = None,
+                 migrator: Optional[Callable[[Dict], Dict]] = None,
+                 schema_version: Optional[int] = None,
+                 debounce_seconds: float = 0.5, max_delay_seconds: float = 3.0):
+        """Initialise le magasin de paramètres
+
+        Args:
+            file_path: Fichier JSON de persistance
+            defaults: Valeurs par défaut (copiées, jamais modifiées)
+            validator: Retourne (données valides, clés rejetées) pour un payload
+            migrator: Migration appliquée aux données lues sur le disque
+            schema_version: Version du schéma écrite dans le fichier
+            debounce_seconds: Fenêtre de regroupement des écritures
+            max_delay_seconds: Délai maximum avant écriture forcée
+        """
+        self.file_path = Path(file_path)
+        self.data = copy.deepcopy(defaults)
+        self.validator = validator or (lambda payload: (payload, []))
+        self.migrator = migrator or (lambda data: data)
+        self.schema_version = schema_version
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+        self.version = 0
+        self._written_version = 0
+        # Identifiant de session pour que les ETags d'un lancement précédent
+        # ne soient jamais considérés comme valides
+        self._session = format(int(time.time() * 1000), 'x')
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._first_pending: Optional[float] = None
+
+        atexit.register(self.flush)
+
+    # Lecture
+    def snapshot(self) -> Tuple[Dict, int]:
+        """Retourne une copie des paramètres et la version correspondante"""
+        with self._lock:
+            return copy.deepcopy(self.data), self.version
+
+    def etag(self, version: Optional[int] = None) -> str:
+        """Retourne l'ETag (non quoté) pour une version donnée"""
+        if version is None:
+            version = self.version
+        return f"settings-{self._session}-{version}"
+
+    # Chargement / mise à jour
+    def load(self):
+        """Charge les paramètres depuis le disque si disponible."""
+        try:
+            if self.file_path.exists():
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    file_version = data.get('schemaVersion')
+                    clean, rejected = self.validator(self.migrator(data))
+                    if rejected:
+                        print(f"DEBUG: Ignored settings keys: {rejected}")
+                    with self._lock:
+                        self._merge(clean)
+                        if file_version == self.schema_version:
+                            self._written_version = self.version
+                        else:
+                            # Réécrire le fichier migré vers la version courante
+                            self._written_version = -1
+                            self._schedule_save()
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"DEBUG: Failed to load settings: {e}")
+
+    def update(self, payload: Dict) -> Tuple[Dict, int, List[str]]:
+        """Valide et fusionne un payload, puis planifie l'écriture.
+
+        Seules les clés réellement modifiées incrémentent la version et
+        déclenchent une écriture. Retourne aussi les clés rejetées.
+        """
+        clean, rejected = self.validator(payload)
+        with self._lock:
+            if self._merge(clean):
+                self._schedule_save()
+            return copy.deepcopy(self.data), self.version, rejected
+
+    def _merge(self, clean: Dict) -> bool:
+        """Fusionne des données propres; retourne True si quelque chose a changé"""
+        changed = False
+        for key, value in clean.items():
+            if key not in self.data:
+                continue
+            current = self.data[key]
+            if isinstance(current, dict) and isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if current.get(sub_key) != sub_value:
+                        current[sub_key] = sub_value
+                        changed = True
+            elif current != value:
+                self.data[key] = value
+                changed = True
+
+        if changed:
+            self.version += 1
+        return changed
+
+    # Écriture
+    def _schedule_save(self):
+        """(Re)planifie l'écriture différée dans la fenêtre de debounce"""
+        now = time.monotonic()
+        if self._first_pending is None:
+            self._first_pending = now
+
+        delay = self.debounce_seconds
+        # Ne pas repousser indéfiniment l'écriture lors d'éditions continues
+        if now - self._first_pending >= self.max_delay_seconds:
+            delay = 0
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Écrit immédiatement les paramètres si des changements sont en attente"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._first_pending = None
+                if self._written_version == self.version:
+                    return
+                version = self.version
+                # Écrire un JSON trié pour une diff plus lisible
+                payload = dict(self.data)
+                if self.schema_version is not None:
+                    payload['schemaVersion'] = self.schema_version
+                try:
+                    content = json.dumps(payload, ensure_ascii=False,
+                                         indent=2, sort_keys=True)
+                except (TypeError, ValueError) as e:
+                    print(f"DEBUG: Failed to serialize settings: {e}")
+                    return
+
+            if self._write_atomic(content):
+                with self._lock:
+                    self._written_version = max(
+                        self._written_version, version)
+
+    def _write_atomic(self, content: str) -> bool:
+        """Écrit le contenu dans un fichier temporaire puis le remplace"""
+        try:
+            atomic_write_text(self.file_path, content)
+            return True
+        except OSError as e:
+            print(f"DEBUG: Failed to save settings: {e}")
+            return False
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Translation Backends for RenExtract v2
+Moteurs d'inférence du worker de traduction:
+    - fp32: PyTorch pleine précision (référence)
+    - int8: PyTorch avec quantification dynamique int8 des couches linéaires
+    - onnx: modèle exporté pour ONNX Runtime (conversion préalable)
+    - auto: le plus rapide disponible (onnx > int8 > fp32)
+
+Usage:
+    python -m src.backend.translation_backends list <modèle>
+    python -m src.backend.translation_backends convert <modèle>
+
+Le modèle converti est écrit dans optimized_model_dir(), là où le worker le
+cherche.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Préfixe des modèles factices (tests, benchmarks): 'stub:echo', 'stub:upper',
+# 'stub:cpu' (simule le coût CPU d'une inférence)
+STUB_PREFIX = 'stub:'
+
+# Travail simulé par caractère pour 'stub:cpu'
+STUB_CPU_ROUNDS = 500
+
+# Backends par ordre de rapidité sur CPU
+BACKENDS = ('onnx', 'int8', 'fp32')
+AUTO_BACKEND = 'auto'
+
+
+class BackendError(RuntimeError):
+    """Backend demandé indisponible pour ce modèle"""
+
+
+def huggingface_cache_dir() -> Path:
+    """Dossier du cache Hugging Face Hub (mêmes règles que huggingface_hub)"""
+    if os.getenv('HF_HUB_CACHE'):
+        return Path(os.environ['HF_HUB_CACHE'])
+    hf_home = os.getenv('HF_HOME') or os.path.join(
+        os.getenv('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache'), 'huggingface')
+    return Path(hf_home) / 'hub'
+
+
+def optimized_model_dir(model_path: str) -> Path:
+    """Dossier du modèle ONNX, à côté de l'original (dossier local ou cache HF)"""
+    local = Path(model_path).expanduser()
+    if local.is_dir():
+        return local.with_name(f"{local.name}-onnx")
+    return huggingface_cache_dir() / f"renextract--{model_path.replace('/', '--')}--onnx"
+
+
+def _has_modules(*names: str) -> bool:
+    return all(importlib.util.find_spec(name) is not None for name in names)
+
+
+def available_backends(model_path: str) -> List[str]:
+    """Backends utilisables pour ce modèle, du plus rapide au plus lent"""
+    available = []
+    onnx_dir = optimized_model_dir(model_path)
+    if (_has_modules('onnxruntime', 'optimum') and onnx_dir.is_dir()
+            and any(onnx_dir.glob('*.onnx'))):
+        available.append('onnx')
+    if _has_modules('torch', 'transformers'):
+        available.extend(['int8', 'fp32'])
+    return available
+
+
+def resolve_backend(model_path: str, requested: Optional[str]) -> str:
+    """Backend effectif: 'auto' choisit le plus rapide disponible"""
+    if model_path.startswith(STUB_PREFIX):
+        return 'stub'
+    requested = requested or AUTO_BACKEND
+    if requested != AUTO_BACKEND and requested not in BACKENDS:
+        raise BackendError(f"Backend inconnu: {requested}")
+    available = available_backends(model_path)
+    if requested == AUTO_BACKEND:
+        if not available:
+            raise BackendError("Aucun backend disponible (installez torch et transformers)")
+        return available[0]
+    if requested not in available:
+        if requested == 'onnx':
+            raise BackendError(
+                "Modèle ONNX absent: lancez 'python -m src.backend.translation_backends "
+                f"convert {model_path}' (nécessite optimum[onnxruntime])")
+        raise BackendError(f"Backend {requested} indisponible (torch/transformers manquants)")
+    return requested
+
+
+def _thread_count() -> int:
+    """Threads de calcul attribués au worker (0 = défaut de la bibliothèque)"""
+    try:
+        return int(os.environ.get('OMP_NUM_THREADS', '0'))
+    except ValueError:
+        return 0
+
+
+class StubBackend:
+    """Backend factice sans dépendance (tests et benchmarks)"""
+
+    name = 'stub'
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.mode = model_path[len(STUB_PREFIX):] or 'echo'
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        if self.mode == 'cpu':
+            for text in texts:
+                value = 0
+                for _ in range(len(text) * STUB_CPU_ROUNDS):
+                    value = (value * 31 + 7) % 1000003
+            return [text.upper() for text in texts]
+        if self.mode == 'upper':
+            return [text.upper() for text in texts]
+        return list(texts)
+
+
+class TransformersBackend:
+    """Backend NLLB via PyTorch, en fp32 ou quantifié dynamiquement en int8"""
+
+    def __init__(self, model_path: str, quantize: bool = False):
+        # Import tardif: dépendances lourdes et optionnelles
+        import torch  # pylint: disable=import-outside-toplevel
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer  # pylint: disable=import-outside-toplevel
+
+        self.model_path = model_path
+        self.name = 'int8' if quantize else 'fp32'
+        if _thread_count():
+            torch.set_num_threads(_thread_count())
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+        model.eval()
+        if quantize:
+            # Poids des couches linéaires en int8, activations quantifiées à la volée
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        import torch  # pylint: disable=import-outside-toplevel
+
+        self.tokenizer.src_lang = source
+        inputs = self.tokenizer(texts, return_tensors='pt', padding=True,
+                                truncation=True, max_length=512)
+        with torch.inference_mode():
+            generated = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(target),
+                max_new_tokens=512,
+            )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+
+class OnnxBackend:
+    """Backend ONNX Runtime (modèle exporté par la commande 'convert').
+
+    Les sessions ONNX Runtime sont créées une fois au chargement et
+    réutilisées par le worker pour tous les runs suivants.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_path: str):
+        import onnxruntime  # pylint: disable=import-outside-toplevel
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM  # pylint: disable=import-outside-toplevel
+        from transformers import AutoTokenizer  # pylint: disable=import-outside-toplevel
+
+        self.model_path = model_path
+        onnx_dir = optimized_model_dir(model_path)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if _thread_count():
+            options.intra_op_num_threads = _thread_count()
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+        self.model = ORTModelForSeq2SeqLM.from_pretrained(
+            onnx_dir, session_options=options, provider='CPUExecutionProvider')
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        self.tokenizer.src_lang = source
+        inputs = self.tokenizer(texts, return_tensors='pt', padding=True,
+                                truncation=True, max_length=512)
+        generated = self.model.generate(
+            **inputs,
+            forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(target),
+            max_new_tokens=512,
+        )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+
+def load_backend(model_path: str, backend: str):
+    """Instancie le backend (déjà résolu) pour le modèle demandé"""
+    if model_path.startswith(STUB_PREFIX):
+        return StubBackend(model_path)
+    if backend == 'onnx':
+        return OnnxBackend(model_path)
+    return TransformersBackend(model_path, quantize=backend == 'int8')
+
+
+def convert_model(model_path: str) -> Path:
+    """Exporte le modèle au format ONNX (conversion unique, hors ligne) dans
+    optimized_model_dir(), où OnnxBackend et available_backends le trouvent"""
+    if not _has_modules('optimum', 'onnxruntime'):
+        raise BackendError("La conversion nécessite: pip install optimum[onnxruntime]")
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM  # pylint: disable=import-outside-toplevel
+    from transformers import AutoTokenizer  # pylint: disable=import-outside-toplevel
+
+    output = optimized_model_dir(model_path)
+    output.mkdir(parents=True, exist_ok=True)
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True)
+    model.save_pretrained(output)
+    AutoTokenizer.from_pretrained(model_path).save_pretrained(output)
+    return output
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description='Backends du traducteur')
+    commands = parser.add_subparsers(dest='command', required=True)
+    list_parser = commands.add_parser('list', help='Backends disponibles pour un modèle')
+    list_parser.add_argument('model')
+    convert_parser = commands.add_parser('convert', help='Exporte un modèle au format ONNX')
+    convert_parser.add_argument('model')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'list':
+            available = available_backends(args.model)
+            print(f"Disponibles: {', '.join(available) or 'aucun'}")
+            print(f"auto -> {resolve_backend(args.model, AUTO_BACKEND)}")
+        else:
+            print(f"Modèle ONNX écrit dans {convert_model(args.model)}")
+    except BackendError as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
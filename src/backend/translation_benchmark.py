@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Translation Benchmark for RenExtract v2
+Mesure le débit de traduction (lignes/s) selon le nombre de processus
+worker et le backend d'inférence, sur un corpus Ren'Py synthétique.
+
+Usage:
+    python -m src.backend.translation_benchmark --processes 1,2,4,8
+    python -m src.backend.translation_benchmark --model chemin/du/modele --files 200
+    python -m src.backend.translation_benchmark --model chemin/du/modele \
+        --backends fp32,int8,onnx --processes 1
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.backend.translation_backends import AUTO_BACKEND
+from src.backend.translation_runner import TranslationRunner
+from src.backend.translation_worker import TranslationWorkerPool, WorkerError
+
+WORDS = ('the', 'night', 'is', 'young', 'and', 'so', 'are', 'we', 'did', 'you',
+         'really', 'think', 'I', 'would', 'forget', 'about', 'this', 'place',
+         'tomorrow', 'school', 'festival', 'starts', 'early', 'come', 'with', 'me')
+
+
+# Éléments Ren'Py protégés par des placeholders pendant la traduction
+TAGS = ('{b}%s{/b}', '{i}%s{/i}', '{color=#ff0000}%s{/color}', '[player_name] %s',
+        '%s {w=0.5}', '%%(count)s %s', '%s\\n')
+
+
+def generate_corpus(folder: Path, files: int, lines: int, seed: int = 42,
+                    tag_density: float = 0.0):
+    """Écrit un corpus tl Ren'Py synthétique (tailles de fichiers variées).
+
+    tag_density: nombre moyen d'éléments Ren'Py (balises, interpolations,
+    échappements) insérés par ligne.
+    """
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+    for file_index in range(files):
+        # Tailles inégales pour que l'équilibrage des shards compte
+        count = max(1, int(lines * rng.uniform(0.2, 2.0)))
+        blocks = []
+        for line_index in range(count):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(3, 18))]
+            tags = int(tag_density) + (rng.random() < tag_density % 1)
+            for _ in range(tags):
+                position = rng.randrange(len(words))
+                words[position] = rng.choice(TAGS) % words[position]
+            text = f"{' '.join(words).capitalize()} ({file_index}.{line_index})"
+            blocks.append(f'translate french s_{file_index}_{line_index}:\n\n'
+                          f'    # e "{text}"\n    e "{text}"\n')
+        (folder / f"script_{file_index:04}.rpy").write_text(
+            '\n'.join(blocks), encoding='utf-8')
+
+
+def run_benchmark(model: str, files: int, lines: int, processes: List[int],
+                  batch_size: int, threads_per_worker: int = 0,
+                  token_budget: int = 0, backends: Optional[List[str]] = None) -> Dict:
+    """Traduit le même corpus avec chaque combinaison backend x processus"""
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix='renextract_bench_'))
+    pool = TranslationWorkerPool(max_workers=max(processes),
+                                 threads_per_worker=threads_per_worker or None,
+                                 idle_timeout=0)
+    pool.on_stderr = lambda line: None
+    try:
+        for backend in backends or [AUTO_BACKEND]:
+            for count in processes:
+                corpus = workdir / f"{backend}_p{count}"
+                generate_corpus(corpus, files, lines)
+                # Chargement du modèle hors mesure: seul le débit en régime établi compte
+                try:
+                    for worker in pool.acquire(count):
+                        worker.translate(['warmup'], model, 'auto', 'fra_Latn', backend)
+                except WorkerError as e:
+                    print(f"Backend {backend} ignoré: {e}", file=sys.stderr)
+                    shutil.rmtree(corpus, ignore_errors=True)
+                    break
+                runner = TranslationRunner(pool, batch_size=batch_size,
+                                           log=lambda line: None, processes=count,
+                                           token_budget=token_budget, backend=backend)
+                report = runner.run(str(corpus), True, model, 'auto', 'fra_Latn')
+                results.append({
+                    'backend': report['resolvedBackend'] or backend,
+                    'processes': count,
+                    'threadsPerProcess': pool.threads_for(count),
+                    'lines': report['lines'],
+                    'elapsed': report['elapsed'],
+                    'linesPerSecond': report['linesPerSecond'],
+                    'batches': report['batches'],
+                })
+                shutil.rmtree(corpus, ignore_errors=True)
+    finally:
+        pool.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = (results[0]['linesPerSecond'] if results else 0) or 1.0
+    for result in results:
+        result['speedup'] = round(result['linesPerSecond'] / baseline, 2)
+    return {'model': model, 'files': files, 'linesPerFile': lines,
+            'batchSize': batch_size, 'tokenBudget': token_budget, 'results': results}
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description='Benchmark de la traduction parallèle')
+    parser.add_argument('--model', default='stub:cpu',
+                        help="Modèle à utiliser (défaut: stub:cpu, sans dépendance)")
+    parser.add_argument('--files', type=int, default=64)
+    parser.add_argument('--lines', type=int, default=40, help='Lignes moyennes par fichier')
+    parser.add_argument('--processes', default='1,2,4',
+                        help='Nombres de processus à comparer (ex: 1,2,4,8)')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--token-budget', type=int, default=0,
+                        help='Budget de tokens par paquet, padding compris (0 = taille fixe)')
+    parser.add_argument('--threads', type=int, default=0,
+                        help='Threads par processus (0 = cœurs / processus)')
+    parser.add_argument('--backends', default=AUTO_BACKEND,
+                        help='Backends à comparer (ex: fp32,int8,onnx)')
+    parser.add_argument('--json', help='Écrit les résultats dans ce fichier JSON')
+    args = parser.parse_args(argv)
+
+    processes = [int(value) for value in args.processes.split(',') if value.strip()]
+    backends = [value.strip() for value in args.backends.split(',') if value.strip()]
+    summary = run_benchmark(args.model, args.files, args.lines, processes,
+                            args.batch_size, args.threads, args.token_budget, backends)
+
+    print(f"{'backend':>7} {'processus':>9} {'threads':>7} {'lignes':>7} {'temps (s)':>9} "
+          f"{'lignes/s':>9} {'accélération':>12}")
+    for result in summary['results']:
+        print(f"{result['backend']:>7} {result['processes']:>9} {result['threadsPerProcess']:>7} "
+              f"{result['lines']:>7} {result['elapsed']:>9.2f} "
+              f"{result['linesPerSecond']:>9.1f} {result['speedup']:>11.2f}x")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
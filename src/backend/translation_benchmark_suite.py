@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Translation Benchmark Suite for RenExtract v2
+Campagne de mesures reproductible du traducteur, de bout en bout: génère des
+corpus Ren'Py synthétiques (taille et densité de balises configurables), lance
+chaque scénario via la route /api/translator/run et enregistre les résultats
+en JSON dans 02_Reports pour comparer deux versions.
+
+Mesures par scénario: temps total, lignes/s, pic de mémoire (application et
+workers) et répartition du temps entre lecture, protection des balises,
+inférence et écriture.
+
+Usage:
+    python -m src.backend.translation_benchmark_suite
+    python -m src.backend.translation_benchmark_suite --tag-density 0,1,3 --files 200
+    python -m src.backend.translation_benchmark_suite --baseline 02_Reports/translation_bench_X.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.backend.translation_backends import AUTO_BACKEND
+from src.backend.translation_benchmark import generate_corpus
+from src.backend.translation_jobs import JobStatus
+
+# Intervalle de scrutation de l'état du job
+POLL_INTERVAL = 0.05
+
+# Version du format des résultats (comparaison entre versions). Version 2:
+# pic de mémoire de l'application remis à zéro avant chaque run
+RESULTS_VERSION = 2
+
+
+def peak_rss_bytes(pid: int) -> Optional[int]:
+    """Pic de mémoire résidente d'un processus (None si non mesurable)"""
+    try:
+        with open(f"/proc/{pid}/status", encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if pid != os.getpid():
+        return None
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        # Windows: pas de mesure sans dépendance supplémentaire
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sur macOS, kilo-octets ailleurs
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Remet le pic de mémoire du processus courant à sa mémoire actuelle
+    (Linux: /proc/self/clear_refs); False si impossible"""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def git_commit() -> Optional[str]:
+    """Commit courant de RenExtract (identifie la version mesurée)"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, check=False, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_job(client, payload: Dict, timeout: float) -> Dict:
+    """Lance un run via l'API et attend sa fin; retourne le job terminé"""
+    response = client.post('/api/translator/run', json=payload)
+    data = response.get_json() or {}
+    if response.status_code != 202:
+        raise RuntimeError(data.get('error') or f"HTTP {response.status_code}")
+    job_id = data['jobId']
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/translator/jobs/{job_id}").get_json()['job']
+        if job['status'] in JobStatus.FINISHED:
+            break
+        if time.monotonic() > deadline:
+            client.post(f"/api/translator/jobs/{job_id}/cancel")
+            raise RuntimeError(f"Délai dépassé ({timeout:.0f}s)")
+        time.sleep(POLL_INTERVAL)
+    if job['status'] != JobStatus.SUCCEEDED:
+        raise RuntimeError(job.get('error') or job['status'])
+    return job
+
+
+def run_suite(model: str, files: int, lines: int, densities: List[float],
+              processes: int = 1, batch_size: int = 16, token_budget: int = 0,
+              backend: str = AUTO_BACKEND, repeat: int = 1, seed: int = 42,
+              timeout: float = 600.0) -> Dict:
+    """Exécute un scénario par densité de balises et retourne les résultats"""
+    # Import tardif: l'application crée ses dossiers et ses services au chargement
+    import app as application  # pylint: disable=import-outside-toplevel
+
+    client = application.app.test_client()
+    jobs = application.translation_jobs
+    workdir = Path(tempfile.mkdtemp(prefix='renextract_suite_'))
+    # Mémoire et manifestes de l'utilisateur tenus à l'écart des mesures
+    saved = (jobs.memory, jobs.manifest_dir)
+    jobs.memory, jobs.manifest_dir = None, workdir / 'manifests'
+    payload = {'recursive': True, 'modelPath': model, 'force': True,
+               'processes': processes, 'batchSize': batch_size,
+               'tokenBudget': token_budget, 'backend': backend}
+
+    scenarios = []
+    try:
+        # Un fichier par processus: chaque worker charge le modèle avant la mesure
+        warmup = workdir / 'warmup'
+        generate_corpus(warmup, max(1, processes), 1, seed)
+        for density in densities:
+            corpus = workdir / f"density_{density}"
+            generate_corpus(corpus, files, lines, seed, tag_density=density)
+            runs = []
+            for _ in range(max(1, repeat)):
+                # Workers redémarrés: le pic mémoire est propre à chaque run
+                application.translation_worker.stop()
+                started = time.perf_counter()
+                run_job(client, {**payload, 'inputFolder': str(warmup)}, timeout)
+                warmup_seconds = time.perf_counter() - started
+
+                # Pic de l'application propre au run (il ne fait que croître),
+                # sinon non mesuré plutôt qu'hérité des scénarios précédents
+                app_reset = reset_peak_rss()
+                started = time.perf_counter()
+                job = run_job(client, {**payload, 'inputFolder': str(corpus)}, timeout)
+                wall = time.perf_counter() - started
+                report = job['report']
+                workers = [worker['pid'] for worker in
+                           application.translation_worker.status()['workers']
+                           if worker['running']]
+                runs.append({
+                    'wallSeconds': round(wall, 3),
+                    'warmupSeconds': round(warmup_seconds, 3),
+                    'lines': report['lines'],
+                    'linesPerSecond': round(report['lines'] / wall, 2) if wall > 0 else 0.0,
+                    'phases': report['phases'],
+                    'batches': report['batches'],
+                    'shards': report['shards'],
+                    'placeholderErrors': report['placeholderErrors'],
+                    'resolvedBackend': report['resolvedBackend'],
+                    'peakRssBytes': {
+                        'app': peak_rss_bytes(os.getpid()) if app_reset else None,
+                        'workers': [peak_rss_bytes(pid) for pid in workers],
+                    },
+                })
+            shutil.rmtree(corpus, ignore_errors=True)
+            # Run médian (par débit) retenu comme résultat du scénario
+            median = sorted(runs, key=lambda run: run['linesPerSecond'])[len(runs) // 2]
+            scenarios.append({
+                'name': f"density_{density}",
+                'tagDensity': density,
+                **median,
+                'runs': [run['wallSeconds'] for run in runs],
+                'wallStdev': round(statistics.pstdev(run['wallSeconds'] for run in runs), 3),
+            })
+    finally:
+        jobs.memory, jobs.manifest_dir = saved
+        application.translation_worker.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'appVersion': application.AppConfig.APP_VERSION,
+        'gitCommit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'params': {'model': model, 'files': files, 'linesPerFile': lines,
+                   'processes': processes, 'batchSize': batch_size,
+                   'tokenBudget': token_budget, 'backend': backend,
+                   'repeat': repeat, 'seed': seed},
+        'scenarios': scenarios,
+        'reportsDir': str(jobs.reports_dir),
+    }
+
+
+def compare(results: Dict, baseline: Dict) -> List[str]:
+    """Écarts de débit et de mémoire par rapport à des résultats précédents"""
+    previous = {scenario['name']: scenario for scenario in baseline.get('scenarios', [])}
+    lines = []
+    for scenario in results['scenarios']:
+        before = previous.get(scenario['name'])
+        if before is None or not before.get('linesPerSecond'):
+            lines.append(f"{scenario['name']:>14}: absent de la référence")
+            continue
+        speed = (scenario['linesPerSecond'] / before['linesPerSecond'] - 1) * 100
+        memory = ''
+        rss, rss_before = scenario['peakRssBytes']['app'], before['peakRssBytes']['app']
+        # Avant la version 2, le pic hérité des scénarios précédents
+        if rss and rss_before and baseline.get('version', 1) >= 2:
+            memory = f", mémoire {(rss / rss_before - 1) * 100:+.1f}%"
+        lines.append(f"{scenario['name']:>14}: débit {speed:+.1f}%{memory}")
+    return lines
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description='Campagne de benchmark du traducteur')
+    parser.add_argument('--model', default='stub:cpu',
+                        help="Modèle à utiliser (défaut: stub:cpu, sans dépendance)")
+    parser.add_argument('--files', type=int, default=64)
+    parser.add_argument('--lines', type=int, default=40, help='Lignes moyennes par fichier')
+    parser.add_argument('--tag-density', default='0,1,3',
+                        help='Éléments Ren\'Py moyens par ligne, un scénario par valeur')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--token-budget', type=int, default=0)
+    parser.add_argument('--backend', default=AUTO_BACKEND)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs par scénario (le run médian est retenu)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', help='Résultats précédents (JSON) à comparer')
+    args = parser.parse_args(argv)
+
+    densities = [float(value) for value in args.tag_density.split(',') if value.strip()]
+    try:
+        results = run_suite(args.model, args.files, args.lines, densities,
+                            args.processes, args.batch_size, args.token_budget,
+                            args.backend, args.repeat, args.seed)
+    except RuntimeError as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{'scénario':>14} {'lignes':>7} {'temps (s)':>9} {'lignes/s':>9} "
+          f"{'lecture':>8} {'balises':>8} {'modèle':>8} {'écriture':>8} {'RSS (Mo)':>9}")
+    for scenario in results['scenarios']:
+        phases = scenario['phases']
+        rss = scenario['peakRssBytes']['app']
+        print(f"{scenario['name']:>14} {scenario['lines']:>7} {scenario['wallSeconds']:>9.2f} "
+              f"{scenario['linesPerSecond']:>9.1f} {phases['parse']:>8.3f} "
+              f"{phases['protect']:>8.3f} {phases['inference']:>8.3f} "
+              f"{phases['write']:>8.3f} {(rss or 0) / 1024 / 1024:>9.1f}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        print('\n'.join(compare(results, baseline)))
+
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    output = Path(results['reportsDir']) / f"translation_bench_{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Résultats écrits dans {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
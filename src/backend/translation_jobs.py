@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Translation Jobs for RenExtract v2
+Traductions exécutées en arrière-plan: identifiant de job, logs lus de façon
+incrémentale (mémoire bornée), journal complet dans 02_Reports et annulation.
+"""
+import datetime
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.backend.event_bus import EventBus
+from src.backend.translation_memory import TranslationMemory
+from src.backend.translation_runner import TranslationCancelled, TranslationRunner
+from src.backend.translation_worker import TranslationWorkerPool, WorkerError
+
+# Nombre maximum de lignes gardées en mémoire par job
+LOG_BUFFER_LINES = 2000
+# Longueur maximum d'une ligne gardée en mémoire (le fichier garde tout)
+MAX_LINE_LENGTH = 2000
+# Nombre de jobs terminés conservés dans l'historique
+MAX_FINISHED_JOBS = 20
+
+
+class JobStatus:
+    """Énumération des états d'un job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class LogRingBuffer:
+    """Tampon circulaire de lignes de log, lisible de façon incrémentale"""
+
+    def __init__(self, capacity: int = LOG_BUFFER_LINES):
+        self._lines = deque(maxlen=capacity)
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    def append(self, stream: str, line: str) -> int:
+        """Ajoute une ligne; retourne son numéro de séquence"""
+        if len(line) > MAX_LINE_LENGTH:
+            line = line[:MAX_LINE_LENGTH] + '…'
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._lines.append((seq, stream, line))
+            return seq
+
+    def read(self, since: int = 0, limit: int = 500) -> Dict:
+        """Retourne les lignes de séquence > since (au plus 'limit')"""
+        with self._lock:
+            first_seq = self._lines[0][0] if self._lines else self._next_seq
+            lines = [
+                {'seq': seq, 'stream': stream, 'line': line}
+                for seq, stream, line in self._lines if seq > since
+            ][:limit]
+            cursor = lines[-1]['seq'] if lines else max(since, first_seq - 1)
+            return {
+                'lines': lines,
+                'cursor': cursor,
+                # Des lignes ont été évincées du tampon depuis 'since'
+                'truncated': since + 1 < first_seq,
+                'hasMore': cursor < self._next_seq - 1,
+            }
+
+
+class TranslationJob:
+    """Un run de traduction exécuté en arrière-plan"""
+
+    def __init__(self, params: Dict, reports_dir: Path):
+        self.id = uuid.uuid4().hex[:12]
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.log_path = Path(reports_dir) / f"translation_{timestamp}_{self.id}.log"
+        self.params = params
+        self.status = JobStatus.QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.report: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.logs = LogRingBuffer()
+        self.cancel_event = threading.Event()
+        self._log_file = None
+        self._log_lock = threading.Lock()
+
+    def open_log(self):
+        """Ouvre le journal complet (02_Reports)"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_file = open(self.log_path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    def close_log(self):
+        """Ferme le journal complet"""
+        with self._log_lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def write(self, stream: str, line: str) -> int:
+        """Ajoute une ligne au tampon et au journal complet"""
+        seq = self.logs.append(stream, line)
+        with self._log_lock:
+            if self._log_file is not None:
+                prefix = '[stderr] ' if stream == 'stderr' else ''
+                self._log_file.write(f"{prefix}{line}\n")
+                self._log_file.flush()
+        return seq
+
+    def to_dict(self) -> Dict:
+        """Résumé sérialisable du job"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'report': self.report,
+            'error': self.error,
+            'logPath': str(self.log_path),
+        }
+
+
+class TranslationJobManager:
+    """Lance, suit et annule les jobs de traduction (un seul à la fois:
+    le worker et son modèle sont partagés)."""
+
+    def __init__(self, worker: TranslationWorkerPool, reports_dir: Path,
+                 event_bus: Optional[EventBus] = None,
+                 runner_factory: Optional[Callable[..., TranslationRunner]] = None,
+                 memory: Optional[TranslationMemory] = None,
+                 manifest_dir: Optional[Path] = None):
+        self.worker = worker
+        self.reports_dir = Path(reports_dir)
+        self.event_bus = event_bus
+        self.memory = memory
+        self.manifest_dir = manifest_dir
+        self.runner_factory = runner_factory or TranslationRunner
+        self.jobs: Dict[str, TranslationJob] = {}
+        self.active: Optional[TranslationJob] = None
+        self._lock = threading.Lock()
+        # Les logs du worker (chargement du modèle, avertissements) vont au job courant
+        self.worker.on_stderr = self._on_worker_stderr
+
+    def _publish(self, data: Dict):
+        if self.event_bus is not None:
+            self.event_bus.publish('translator', data)
+
+    def _log(self, job: TranslationJob, stream: str, line: str):
+        seq = job.write(stream, line)
+        self._publish({'type': 'log', 'jobId': job.id, 'seq': seq,
+                       'stream': stream, 'line': line})
+
+    def _on_worker_stderr(self, line: str):
+        job = self.active
+        if job is not None:
+            self._log(job, 'stderr', line)
+        else:
+            print(f"[worker] {line}")
+
+    def start(self, params: Dict) -> TranslationJob:
+        """Crée et démarre un job; lève RuntimeError si un job tourne déjà"""
+        with self._lock:
+            if self.active is not None:
+                raise RuntimeError('Une traduction est déjà en cours')
+            job = TranslationJob(params, self.reports_dir)
+            self.jobs[job.id] = job
+            self.active = job
+            self._prune()
+
+        threading.Thread(target=self._run, args=(job,), daemon=True,
+                         name=f"translation-{job.id}").start()
+        return job
+
+    def _run(self, job: TranslationJob):
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+        status = JobStatus.FAILED
+        self._publish({'type': 'started', 'jobId': job.id,
+                       'inputFolder': job.params.get('inputFolder')})
+        try:
+            job.open_log()
+            runner = self.runner_factory(
+                self.worker,
+                log=lambda line: self._log(job, 'stdout', line),
+                should_cancel=job.cancel_event.is_set,
+                memory=self.memory,
+                manifest_dir=self.manifest_dir,
+                **job.params.get('runnerOptions', {}))
+            job.report = runner.run(
+                job.params['inputFolder'], job.params.get('recursive', True),
+                job.params['modelPath'], job.params.get('sourceLang', 'auto'),
+                job.params.get('targetLang', 'fra_Latn'),
+                force=job.params.get('force', False))
+            status = JobStatus.SUCCEEDED
+        except TranslationCancelled:
+            status = JobStatus.CANCELLED
+            self._log(job, 'stdout', 'Traduction annulée')
+        except (WorkerError, OSError, ValueError, KeyError) as e:
+            status = self._failed(job, e)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Erreur inattendue du runner: le job doit tout de même se terminer
+            print(f"Erreur traduction inattendue: {e!r}")
+            status = self._failed(job, e)
+        finally:
+            job.finished = time.time()
+            job.close_log()
+            # Libère l'emplacement avant d'exposer l'état final: un client qui
+            # voit le job terminé peut immédiatement en relancer un
+            with self._lock:
+                if self.active is job:
+                    self.active = None
+                job.status = status
+            self._publish({'type': 'finished', 'jobId': job.id,
+                           'status': job.status,
+                           'success': job.status == JobStatus.SUCCEEDED,
+                           'report': job.report, 'error': job.error})
+
+    def _failed(self, job: TranslationJob, error: Exception) -> str:
+        """État final d'un job interrompu par une erreur (annulé si l'erreur
+        vient de l'arrêt du worker demandé par l'utilisateur)"""
+        if job.cancel_event.is_set():
+            self._log(job, 'stdout', 'Traduction annulée')
+            return JobStatus.CANCELLED
+        job.error = str(error) or type(error).__name__
+        self._log(job, 'stderr', f"Erreur: {job.error}")
+        return JobStatus.FAILED
+
+    def cancel(self, job_id: str) -> bool:
+        """Annule un job: arrêt coopératif et arrêt du worker (arbre de processus)"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in JobStatus.FINISHED:
+            return False
+        job.cancel_event.set()
+        # Interrompt les inférences en cours; les workers seront relancés au besoin
+        self.worker.kill()
+        return True
+
+    def get(self, job_id: str) -> Optional[TranslationJob]:
+        """Retourne un job par identifiant"""
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict]:
+        """Résumé des jobs, du plus récent au plus ancien"""
+        return [job.to_dict() for job in
+                sorted(self.jobs.values(), key=lambda j: j.created, reverse=True)]
+
+    def _prune(self):
+        """Oublie les plus vieux jobs terminés (les journaux restent sur disque)"""
+        finished = sorted((j for j in self.jobs.values() if j.status in JobStatus.FINISHED),
+                          key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Translation Manifest for RenExtract v2
+État par fichier d'un dossier traduit (taille, date, empreinte du contenu)
+pour ne retraduire que les fichiers modifiés depuis le dernier run.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.backend.file_utils import atomic_write_text
+
+MANIFEST_FORMAT_VERSION = 1
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """Empreinte BLAKE2b du contenu d'un fichier"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path_for(manifest_dir: Path, input_folder: str) -> Path:
+    """Fichier manifeste associé à un dossier source"""
+    folder = os.path.normcase(str(Path(input_folder).resolve()))
+    name = hashlib.sha1(folder.encode('utf-8')).hexdigest()[:16]
+    return Path(manifest_dir) / f"{name}.json"
+
+
+class TranslationManifest:
+    """Manifeste d'un dossier: chemin relatif -> taille, mtime et empreinte.
+
+    La vérification commence par stat() (taille + mtime); le contenu n'est
+    haché que si ces valeurs ont changé, ce qui rend un run sans
+    modification quasi instantané même sur des milliers de fichiers.
+    """
+
+    def __init__(self, file_path: Path, input_folder: str, signature: Dict):
+        """
+        Args:
+            file_path: Fichier JSON du manifeste
+            input_folder: Dossier source traduit
+            signature: Paramètres de traduction (modèle, langues); un
+                changement invalide tout le manifeste
+        """
+        self.file_path = Path(file_path)
+        self.input_folder = str(input_folder)
+        self.signature = signature
+        self.files: Dict[str, Dict] = {}
+        self.hashed = 0
+
+    def load(self):
+        """Charge le manifeste s'il correspond aux paramètres courants"""
+        try:
+            if not self.file_path.exists():
+                return
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if (data.get('version') == MANIFEST_FORMAT_VERSION
+                    and data.get('signature') == self.signature):
+                self.files = data.get('files', {})
+            else:
+                print("DEBUG: Translation manifest outdated, full run")
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            print(f"DEBUG: Translation manifest unreadable: {e}")
+            self.files = {}
+
+    def save(self):
+        """Écrit le manifeste de façon atomique"""
+        payload = {
+            'version': MANIFEST_FORMAT_VERSION,
+            'inputFolder': self.input_folder,
+            'signature': self.signature,
+            'files': self.files,
+        }
+        try:
+            atomic_write_text(self.file_path, json.dumps(payload, ensure_ascii=False))
+        except OSError as e:
+            print(f"DEBUG: Failed to write translation manifest: {e}")
+
+    def is_unchanged(self, path: Path, relative: str) -> bool:
+        """Indique si le fichier est identique à son état après le dernier run"""
+        entry = self.files.get(relative)
+        if entry is None:
+            return False
+        stat = path.stat()
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime']:
+            return True
+        if stat.st_size != entry['size']:
+            return False
+        # Même taille mais date différente (copie, checkout git...): on hache
+        self.hashed += 1
+        if file_digest(path) != entry['hash']:
+            return False
+        entry['mtime'] = stat.st_mtime_ns
+        return True
+
+    def record(self, path: Path, relative: str, digest: Optional[str] = None):
+        """Enregistre l'état du fichier après traduction"""
+        stat = path.stat()
+        self.files[relative] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': digest or file_digest(path),
+        }
+
+    def forget(self, relative: str):
+        """Retire un fichier du manifeste (échec ou run interrompu)"""
+        self.files.pop(relative, None)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Translation Memory for RenExtract v2
+Mémoire de traduction persistante: une ligne déjà traduite avec le même
+modèle, le même moteur d'inférence et les mêmes langues n'est plus renvoyée
+au modèle.
+"""
+import atexit
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.backend.file_utils import atomic_write_text
+from src.backend.translation_worker import DEFAULT_SOURCE_LANG
+
+# Version 2: le moteur d'inférence fait partie de la clé
+MEMORY_FORMAT_VERSION = 2
+
+
+def memory_key(text: str, source: str, target: str, model: str, backend: str) -> str:
+    """Clé de la mémoire: empreinte de (texte, langue source, langue cible,
+    modèle, moteur effectif): une traduction int8 ou ONNX n'est pas servie
+    comme une traduction fp32"""
+    if not source or source == 'auto':
+        # Le worker traduit 'auto' comme la langue source par défaut
+        source = DEFAULT_SOURCE_LANG
+    raw = '\x1f'.join((model, backend, source, target, text))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """Mémoire de traduction à correspondance exacte, bornée en taille (LRU).
+
+    L'index est un dictionnaire ordonné clé -> traduction: la recherche est
+    en O(1) et l'ordre d'insertion sert d'ordre LRU (les entrées utilisées
+    sont remises en fin). Seule l'empreinte du texte source est conservée.
+    """
+
+    def __init__(self, file_path: Path, max_entries: int = 100000):
+        self.file_path = Path(file_path)
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        atexit.register(self.flush)
+
+    def _ensure_loaded(self):
+        """Charge la mémoire au premier usage (pas au démarrage de l'app)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if self.file_path.exists():
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MEMORY_FORMAT_VERSION:
+                    # Entrées enregistrées de la plus ancienne à la plus récente
+                    self._entries = OrderedDict(
+                        (key, value) for key, value in data.get('entries', []))
+                    self._evict()
+                print(f"DEBUG: Translation memory loaded ({len(self._entries)} entries)")
+        except (OSError, json.JSONDecodeError, ValueError, TypeError) as e:
+            print(f"DEBUG: Translation memory unreadable, starting empty: {e}")
+            self._entries = OrderedDict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    def lookup(self, keys: List[str]) -> Dict[str, str]:
+        """Retourne les traductions connues pour les clés demandées"""
+        found = {}
+        with self._lock:
+            self._ensure_loaded()
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+                self.hits += 1
+        return found
+
+    def store(self, items: Dict[str, str]):
+        """Enregistre des traductions (clé -> traduction)"""
+        if not items:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            for key, value in items.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            self._evict()
+            self._dirty = True
+
+    def flush(self):
+        """Écrit la mémoire sur le disque si elle a changé"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {'version': MEMORY_FORMAT_VERSION,
+                       'entries': list(self._entries.items())}
+            self._dirty = False
+        try:
+            atomic_write_text(self.file_path, json.dumps(payload, ensure_ascii=False))
+        except OSError as e:
+            self._dirty = True
+            print(f"DEBUG: Failed to write translation memory: {e}")
+
+    def clear(self):
+        """Vide la mémoire (et le fichier)"""
+        with self._lock:
+            self._loaded = True
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self._dirty = True
+        self.flush()
+
+    def stats(self) -> Dict:
+        """Statistiques de la mémoire"""
+        with self._lock:
+            self._ensure_loaded()
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'file': str(self.file_path),
+            }
+
+
+def open_translation_memory(file_path: Optional[Path], max_entries: int) -> Optional[TranslationMemory]:
+    """Crée la mémoire de traduction, ou None si désactivée (max_entries <= 0)"""
+    if file_path is None or max_entries <= 0:
+        return None
+    return TranslationMemory(file_path, max_entries)
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Translation Runner for RenExtract v2
+Traduit les fichiers de traduction Ren'Py (game/tl/<langue>/*.rpy) d'un
+dossier en s'appuyant sur le worker de traduction persistant.
+"""
+import heapq
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.backend.file_utils import atomic_write_text
+from src.backend.placeholders import create_protector
+from src.backend.translation_backends import AUTO_BACKEND, BackendError, resolve_backend
+from src.backend.translation_manifest import TranslationManifest, manifest_path_for
+from src.backend.translation_memory import TranslationMemory, memory_key
+from src.backend.translation_worker import (TranslationWorkerClient,
+                                            TranslationWorkerPool)
+
+# Chaîne Ren'Py entre guillemets (avec séquences d'échappement)
+STRING_LITERAL = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+# En-tête de bloc: "translate french start_1a2b3c4d:" / "translate french strings:"
+TRANSLATE_BLOCK = re.compile(r'^translate\s+\w+\s+(\w+)\s*:')
+
+# Commentaire de position généré par Ren'Py: "# game/script.rpy:12"
+LOCATION_COMMENT = re.compile(r'^#\s*\S+\.rpy:\d+\s*$')
+
+UNESCAPED_QUOTE = re.compile(r'(?<!\\)"')
+
+# Nombre maximum de lignes rejetées (placeholders altérés) détaillées dans le log
+MAX_LOGGED_PLACEHOLDER_ERRORS = 20
+
+# Étapes chronométrées d'un run (rapport 'phases')
+PHASES = ('parse', 'protect', 'inference', 'write')
+
+
+class TranslationCancelled(Exception):
+    """Le run a été annulé par l'utilisateur"""
+
+
+class TranslationUnit:
+    """Chaîne à traduire: ligne du fichier et position du littéral"""
+
+    __slots__ = ('line_index', 'start', 'end', 'text')
+
+    def __init__(self, line_index: int, start: int, end: int, text: str):
+        self.line_index = line_index
+        self.start = start
+        self.end = end
+        self.text = text
+
+
+def unescape_renpy(text: str) -> str:
+    """Contenu d'un littéral Ren'Py -> texte envoyé au modèle"""
+    return text.replace('\\"', '"')
+
+
+def escape_renpy(text: str) -> str:
+    """Texte traduit -> contenu de littéral Ren'Py valide"""
+    return UNESCAPED_QUOTE.sub('\\\\"', text).replace('\n', '\\n')
+
+
+def parse_translation_units(lines: List[str]) -> List[TranslationUnit]:
+    """Repère les chaînes encore non traduites d'un fichier tl Ren'Py.
+
+    - Blocs de dialogue: la ligne qui suit le commentaire "# e \"Hello\"" et
+      dont le texte est encore identique à l'original.
+    - Blocs strings: les lignes "new" encore vides ou identiques à "old".
+    """
+    units = []
+    block_kind = None
+    pending: Optional[str] = None
+
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        header = TRANSLATE_BLOCK.match(line)
+        if header:
+            block_kind = 'strings' if header.group(1) == 'strings' else 'dialogue'
+            pending = None
+            continue
+
+        if block_kind == 'dialogue':
+            if stripped.startswith('#'):
+                if LOCATION_COMMENT.match(stripped):
+                    continue
+                literal = STRING_LITERAL.search(stripped)
+                pending = literal.group(1) if literal else None
+                continue
+            if pending is not None:
+                literal = STRING_LITERAL.search(line)
+                if literal and literal.group(1) == pending and pending:
+                    units.append(TranslationUnit(index, literal.start(1),
+                                                 literal.end(1), pending))
+                pending = None
+
+        elif block_kind == 'strings':
+            if stripped.startswith('old '):
+                literal = STRING_LITERAL.search(line)
+                pending = literal.group(1) if literal else None
+            elif stripped.startswith('new ') and pending:
+                literal = STRING_LITERAL.search(line)
+                if literal and literal.group(1) in ('', pending):
+                    units.append(TranslationUnit(index, literal.start(1),
+                                                 literal.end(1), pending))
+                pending = None
+
+    return units
+
+
+def apply_translations(lines: List[str], units: List[TranslationUnit],
+                       translations: List[str]) -> int:
+    """Remplace les littéraux par leurs traductions; retourne le nombre appliqué"""
+    applied = 0
+    for unit, translated in zip(units, translations):
+        if translated is None:
+            continue
+        line = lines[unit.line_index]
+        lines[unit.line_index] = line[:unit.start] + escape_renpy(translated) + line[unit.end:]
+        applied += 1
+    return applied
+
+
+def collect_rpy_files(folder: Path, recursive: bool) -> List[Path]:
+    """Liste triée des fichiers .rpy d'un dossier"""
+    pattern = '**/*.rpy' if recursive else '*.rpy'
+    return sorted(p for p in Path(folder).glob(pattern) if p.is_file())
+
+
+class ParsedFile:
+    """Fichier lu et analysé, en attente de traduction"""
+
+    __slots__ = ('path', 'relative', 'lines', 'units')
+
+    def __init__(self, path: Path, relative: str, lines: List[str],
+                 units: List[TranslationUnit]):
+        self.path = path
+        self.relative = relative
+        self.lines = lines
+        self.units = units
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation du nombre de tokens d'un texte (~4 caractères par token
+    pour les tokenizers SentencePiece), sans charger le tokenizer"""
+    return len(text) // 4 + 1
+
+
+def plan_batches(items: List[Tuple[str, str]], batch_size: int,
+                 token_budget: int = 0) -> List[List[Tuple[str, str]]]:
+    """Regroupe des (clé, texte) en paquets de longueurs proches.
+
+    Les textes sont triés par longueur estimée pour limiter le padding. Un
+    paquet est fermé quand il atteint batch_size textes, ou, si token_budget
+    est défini, quand son coût avec padding (nombre de textes x plus long
+    texte) dépasserait ce budget.
+    """
+    ordered = sorted(items, key=lambda item: estimate_tokens(item[1]))
+    batches: List[List[Tuple[str, str]]] = []
+    batch: List[Tuple[str, str]] = []
+    for item in ordered:
+        tokens = estimate_tokens(item[1])
+        # Les textes sont triés: le dernier ajouté est le plus long du paquet
+        too_costly = token_budget > 0 and batch and (len(batch) + 1) * tokens > token_budget
+        if batch and (len(batch) >= max(1, batch_size) or too_costly):
+            batches.append(batch)
+            batch = []
+        batch.append(item)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def count_lines(path: Path) -> int:
+    """Nombre de lignes d'un fichier (poids utilisé pour répartir les shards)"""
+    with open(path, 'rb') as f:
+        return f.read().count(b'\n') + 1
+
+
+def shard_by_lines(items: List[Tuple[Path, str]], count: int) -> List[List[Tuple[Path, str]]]:
+    """Répartit les fichiers en 'count' shards de nombre de lignes équilibré.
+
+    Algorithme glouton (plus gros fichiers d'abord, vers le shard le moins
+    chargé); l'ordre des fichiers est conservé à l'intérieur d'un shard.
+    """
+    weighted = sorted(((count_lines(item[0]), position, item)
+                       for position, item in enumerate(items)), reverse=True)
+    loads = [(0, index) for index in range(max(1, count))]
+    heapq.heapify(loads)
+    shards: List[List[Tuple[int, Tuple[Path, str]]]] = [[] for _ in loads]
+    for weight, position, item in weighted:
+        load, index = heapq.heappop(loads)
+        shards[index].append((position, item))
+        heapq.heappush(loads, (load + weight, index))
+    return [[item for _, item in sorted(shard)] for shard in shards if shard]
+
+
+class TranslationRunner:
+    """Traduit un dossier Ren'Py via le(s) worker(s) persistant(s).
+
+    Avec une pool et processes > 1, les fichiers sont répartis en shards
+    traduits en parallèle, chacun par son propre processus worker.
+    """
+
+    def __init__(self, worker: Union[TranslationWorkerClient, TranslationWorkerPool],
+                 batch_size: int = 16,
+                 log: Optional[Callable[[str], None]] = None,
+                 should_cancel: Optional[Callable[[], bool]] = None,
+                 memory: Optional[TranslationMemory] = None,
+                 manifest_dir: Optional[Path] = None,
+                 processes: int = 1,
+                 token_budget: int = 0,
+                 window_lines: int = 1024,
+                 placeholder_format: Optional[str] = None,
+                 backend: str = AUTO_BACKEND):
+        """
+        Args:
+            worker: Worker (ou pool de workers) de traduction
+            batch_size: Nombre maximum de textes par appel au modèle
+            log: Callback pour chaque ligne de log
+            should_cancel: Retourne True quand l'annulation est demandée
+            memory: Mémoire de traduction consultée avant le modèle
+            manifest_dir: Dossier des manifestes (runs incrémentaux)
+            processes: Nombre de processus worker (shards en parallèle)
+            token_budget: Budget de tokens par paquet, padding compris (0 = aucun)
+            window_lines: Chaînes accumulées entre fichiers avant traduction
+            placeholder_format: Format des placeholders protégeant les balises
+                Ren'Py (paramètre extraction.placeholderFormat)
+            backend: Moteur d'inférence (fp32, int8, onnx ou auto)
+        """
+        self.worker = worker
+        self.batch_size = max(1, batch_size)
+        self.token_budget = max(0, token_budget)
+        self.window_lines = max(1, window_lines)
+        self.protector = create_protector(placeholder_format)
+        self.backend = backend or AUTO_BACKEND
+        self._resolved_backends: Dict[str, str] = {}
+        self.placeholder_errors = 0
+        self.batches = 0
+        self.model_seconds = 0.0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.log = log or print
+        self.should_cancel = should_cancel or (lambda: False)
+        self.memory = memory
+        self.memory_hits = 0
+        self.manifest_dir = manifest_dir
+        self.processes = max(1, processes)
+        self._stats_lock = threading.Lock()
+
+    def _add_phase(self, phase: str, started: float):
+        """Ajoute le temps écoulé depuis 'started' à une étape du run"""
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.phase_seconds[phase] += elapsed
+
+    def resolved_backend(self, model: str) -> str:
+        """Moteur effectif pour ce modèle ('auto' résolu comme dans le worker,
+        qui partage l'environnement Python de l'application)"""
+        if model not in self._resolved_backends:
+            try:
+                self._resolved_backends[model] = resolve_backend(model, self.backend)
+            except BackendError:
+                # Le worker signalera l'erreur; aucune traduction n'est mémorisée
+                return self.backend
+        return self._resolved_backends[model]
+
+    def check_cancelled(self):
+        """Lève TranslationCancelled si l'annulation a été demandée"""
+        if self.should_cancel():
+            raise TranslationCancelled()
+
+    def translate_texts(self, texts: List[str], model: str, source: str,
+                        target: str, worker=None) -> List[str]:
+        """Traduit des textes en consultant d'abord la mémoire de traduction.
+
+        Chaque texte distinct n'est envoyé qu'une fois; les textes restants
+        sont regroupés en paquets de longueurs proches (voir plan_batches) et
+        les résultats sont remis dans l'ordre d'origine.
+        """
+        worker = worker or self.worker
+        texts = [unescape_renpy(text) for text in texts]
+        backend = self.resolved_backend(model)
+        keys = [memory_key(text, source, target, model, backend) for text in texts]
+        known = self.memory.lookup(list(dict.fromkeys(keys))) if self.memory else {}
+        with self._stats_lock:
+            self.memory_hits += sum(1 for key in keys if key in known)
+
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in known:
+                pending.setdefault(key, text)
+
+        # Balises, interpolations et échappements remplacés par des placeholders
+        started = time.perf_counter()
+        protected: Dict[str, Tuple[str, List[str]]] = {
+            key: self.protector.protect(text) for key, text in pending.items()}
+        self._add_phase('protect', started)
+
+        translated: Dict[str, str] = {}
+        batches = plan_batches([(key, value[0]) for key, value in protected.items()],
+                               self.batch_size, self.token_budget)
+        for batch in batches:
+            self.check_cancelled()
+            started = time.perf_counter()
+            results = worker.translate([text for _, text in batch],
+                                       model, source, target, self.backend)
+            with self._stats_lock:
+                self.batches += 1
+                self.model_seconds += time.perf_counter() - started
+            self._add_phase('inference', started)
+            started = time.perf_counter()
+            for (key, _), result in zip(batch, results):
+                restored = self.protector.restore(result, protected[key][1])
+                if restored is None:
+                    # Placeholder perdu ou inventé: la ligne reste non traduite
+                    self._placeholder_error(pending[key], result)
+                    continue
+                translated[key] = restored
+            self._add_phase('protect', started)
+
+        if self.memory is not None:
+            self.memory.store(translated)
+        known.update(translated)
+        return [known.get(key) for key in keys]
+
+    def _placeholder_error(self, source_text: str, result: str):
+        with self._stats_lock:
+            self.placeholder_errors += 1
+            errors = self.placeholder_errors
+        if errors <= MAX_LOGGED_PLACEHOLDER_ERRORS:
+            self.log(f"Placeholders altérés, ligne ignorée: {source_text!r} -> {result!r}")
+
+    def _translate_window(self, window: List[ParsedFile], worker, context: Dict):
+        """Traduit ensemble les chaînes de plusieurs fichiers, puis les écrit"""
+        texts = [unit.text for parsed in window for unit in parsed.units]
+        translations = self.translate_texts(texts, context['model'], context['source'],
+                                            context['target'], worker)
+        offset = 0
+        for parsed in window:
+            started = time.perf_counter()
+            count = len(parsed.units)
+            applied = apply_translations(parsed.lines, parsed.units,
+                                         translations[offset:offset + count])
+            offset += count
+            atomic_write_text(parsed.path, ''.join(parsed.lines))
+            self._add_phase('write', started)
+            self._file_done(parsed.path, parsed.relative, applied, context,
+                            missed=count - applied)
+
+    def _file_done(self, path: Path, relative: str, count: int, context: Dict,
+                   missed: int = 0):
+        """Comptabilise un fichier terminé et l'enregistre dans le manifeste.
+
+        Un fichier dont des lignes restent non traduites ('missed': placeholders
+        altérés, pas de résultat) est retiré du manifeste pour être repris au
+        prochain run.
+        """
+        with self._stats_lock:
+            context['done'] += 1
+            if count:
+                context['files'] += 1
+                context['lines'] += count
+            if context['manifest'] is not None:
+                if missed:
+                    context['manifest'].forget(relative)
+                else:
+                    context['manifest'].record(path, relative)
+            done = context['done']
+        message = f"[{done}/{context['total']}] {path.name}: {count} ligne(s) traduite(s)"
+        if missed:
+            message += f", {missed} non traduite(s) (reprises au prochain run)"
+        self.log(message)
+
+    def _translate_shard(self, shard: List[Tuple[Path, str]], worker, context: Dict):
+        """Traduit une liste de fichiers avec un worker donné.
+
+        Les chaînes de plusieurs fichiers consécutifs sont accumulées dans
+        une fenêtre (window_lines) pour former des paquets pleins; les
+        fichiers sont écrits à la fin de chaque fenêtre.
+        """
+        window: List[ParsedFile] = []
+        window_size = 0
+        try:
+            for path, relative in shard:
+                self.check_cancelled()
+                if context['abort'].is_set():
+                    # Un autre shard a échoué: inutile de continuer
+                    return
+                started = time.perf_counter()
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    lines = f.readlines()
+                units = parse_translation_units(lines)
+                self._add_phase('parse', started)
+                if not units:
+                    self._file_done(path, relative, 0, context)
+                    continue
+                window.append(ParsedFile(path, relative, lines, units))
+                window_size += len(units)
+                if window_size >= self.window_lines:
+                    self._translate_window(window, worker, context)
+                    window, window_size = [], 0
+            if window:
+                self.check_cancelled()
+                self._translate_window(window, worker, context)
+        except BaseException:
+            context['abort'].set()
+            raise
+
+    def _translate_sharded(self, pending: List[Tuple[Path, str]], context: Dict) -> int:
+        """Répartit les fichiers entre plusieurs workers; retourne le nombre de shards"""
+        shards = shard_by_lines(pending, min(self.processes, len(pending)))
+        workers = self.worker.acquire(len(shards))
+        context['workers'] = workers
+        self.log(f"{len(shards)} shard(s) en parallèle, "
+                 f"{workers[0].threads} thread(s) par processus")
+        with ThreadPoolExecutor(max_workers=len(shards),
+                                thread_name_prefix='translation-shard') as executor:
+            futures = [executor.submit(self._translate_shard, shard, worker, context)
+                       for shard, worker in zip(shards, workers)]
+            errors = [future.exception() for future in futures]
+        # Une annulation se propage comme telle plutôt que comme l'erreur du
+        # worker tué qui en résulte
+        for error in errors:
+            if isinstance(error, TranslationCancelled):
+                raise error
+        for error in errors:
+            if error is not None:
+                raise error
+        return len(shards)
+
+    def run(self, input_folder: str, recursive: bool, model: str,
+            source: str, target: str, force: bool = False) -> Dict:
+        """Traduit les fichiers .rpy du dossier modifiés depuis le dernier run
+        (tous si force=True ou sans manifeste)"""
+        started = time.perf_counter()
+        folder = Path(input_folder)
+        files = collect_rpy_files(folder, recursive)
+        self.log(f"{len(files)} fichier(s) .rpy trouvé(s) dans {input_folder}")
+
+        manifest = None
+        if self.manifest_dir is not None:
+            manifest = TranslationManifest(
+                manifest_path_for(self.manifest_dir, input_folder), input_folder,
+                {'model': model, 'source': source, 'target': target})
+            if not force:
+                manifest.load()
+
+        pending = []
+        for path in files:
+            relative = path.relative_to(folder).as_posix()
+            if manifest is not None and not force and manifest.is_unchanged(path, relative):
+                continue
+            pending.append((path, relative))
+        skipped = len(files) - len(pending)
+        if skipped:
+            self.log(f"{skipped} fichier(s) inchangé(s) depuis le dernier run ignoré(s)")
+
+        self.memory_hits = 0
+        self.batches = 0
+        self.model_seconds = 0.0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.placeholder_errors = 0
+        context = {'model': model, 'source': source, 'target': target,
+                   'manifest': manifest, 'total': len(pending),
+                   'done': 0, 'files': 0, 'lines': 0, 'abort': threading.Event(),
+                   'workers': []}
+        shards = 1
+        try:
+            if (self.processes > 1 and len(pending) > 1
+                    and isinstance(self.worker, TranslationWorkerPool)):
+                shards = self._translate_sharded(pending, context)
+            else:
+                worker = self.worker
+                if isinstance(worker, TranslationWorkerPool):
+                    worker = worker.acquire(1)[0]
+                context['workers'] = [worker]
+                self._translate_shard(pending, worker, context)
+        finally:
+            # Les traductions obtenues restent acquises, même en cas d'annulation
+            if self.memory is not None:
+                self.memory.flush()
+            if manifest is not None:
+                present = {path.relative_to(folder).as_posix() for path in files}
+                for relative in list(manifest.files):
+                    if relative not in present:
+                        manifest.forget(relative)
+                manifest.save()
+
+        translated_lines = context['lines']
+        translated_files = context['files']
+        elapsed = time.perf_counter() - started
+        self.log(f"Terminé: {translated_lines} ligne(s) dans {translated_files} "
+                 f"fichier(s) en {elapsed:.1f}s "
+                 f"({self.memory_hits} depuis la mémoire de traduction)")
+        return {
+            'files': len(files),
+            'filesSkipped': skipped,
+            'filesTranslated': translated_files,
+            'lines': translated_lines,
+            'elapsed': round(elapsed, 3),
+            'linesPerSecond': round(translated_lines / elapsed, 2) if elapsed > 0 else 0.0,
+            'memoryHits': self.memory_hits,
+            'modelLines': translated_lines - self.memory_hits,
+            'backend': self.backend,
+            # Backend effectivement utilisé par les workers ('auto' résolu)
+            'resolvedBackend': next((worker.backend for worker in context['workers']
+                                     if worker.backend), None),
+            'batches': self.batches,
+            'placeholderErrors': self.placeholder_errors,
+            'batchSize': self.batch_size,
+            'tokenBudget': self.token_budget,
+            # Débit du modèle seul, par processus worker (hors lecture/écriture
+            # et mémoire de traduction)
+            'modelLinesPerSecond': round((translated_lines - self.memory_hits)
+                                         / self.model_seconds, 2)
+                                   if self.model_seconds > 0 else 0.0,
+            'hashedFiles': manifest.hashed if manifest is not None else 0,
+            'shards': shards,
+            # Temps par étape, cumulé sur tous les shards (peut dépasser
+            # 'elapsed' quand plusieurs processus travaillent en parallèle)
+            'phases': {phase: round(seconds, 3)
+                       for phase, seconds in self.phase_seconds.items()},
+        }
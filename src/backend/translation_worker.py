@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Translation Worker for RenExtract v2
+Processus de traduction persistant: le modèle est chargé une seule fois et
+reste en mémoire entre les exécutions.
+
+Protocole (JSON, une ligne par message, sur stdin/stdout du worker):
+    -> {"id": 1, "op": "translate", "texts": [...], "model": "...",
+        "source": "eng_Latn", "target": "fra_Latn", "backend": "auto"}
+    <- {"id": 1, "ok": true, "translations": [...], "backend": "int8"}
+    -> {"id": 2, "op": "ping"} / {"op": "unload"} / {"op": "shutdown"}
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.backend.translation_backends import (AUTO_BACKEND, BackendError,
+                                              load_backend, resolve_backend)
+
+# Modèle de traduction proposé par défaut
+DEFAULT_MODEL = 'virusf/nllb-renpy-rory-v4'
+
+# Langue source utilisée quand l'utilisateur choisit 'auto' (NLLB exige un code)
+DEFAULT_SOURCE_LANG = 'eng_Latn'
+
+# Variables lues par les bibliothèques de calcul (OpenMP, MKL, OpenBLAS...)
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS')
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class WorkerError(RuntimeError):
+    """Erreur remontée par le worker de traduction"""
+
+
+# Côté worker
+class WorkerState:
+    """État du processus worker: modèle chargé et statistiques"""
+
+    def __init__(self):
+        self.backend = None
+        self.model_path: Optional[str] = None
+        self.backend_name: Optional[str] = None
+        self.load_seconds = 0.0
+        self.loads = 0
+
+    def get_backend(self, model_path: str, requested: str = AUTO_BACKEND):
+        """Retourne le backend du modèle, en le chargeant si nécessaire.
+
+        Le modèle (ou la session ONNX Runtime) reste en cache tant que le
+        couple (modèle, backend) ne change pas.
+        """
+        backend_name = resolve_backend(model_path, requested)
+        if (self.backend is None or self.model_path != model_path
+                or self.backend_name != backend_name):
+            self.unload()
+            started = time.perf_counter()
+            print(f"Chargement du modèle {model_path} ({backend_name})...",
+                  file=sys.stderr, flush=True)
+            self.backend = load_backend(model_path, backend_name)
+            self.model_path = model_path
+            self.backend_name = backend_name
+            self.load_seconds = time.perf_counter() - started
+            self.loads += 1
+            print(f"Modèle chargé en {self.load_seconds:.1f}s", file=sys.stderr, flush=True)
+        return self.backend
+
+    def unload(self):
+        """Libère le modèle courant"""
+        self.backend = None
+        self.model_path = None
+        self.backend_name = None
+
+    def handle(self, message: Dict) -> Dict:
+        """Traite un message du protocole"""
+        op = message.get('op')
+        if op == 'ping':
+            return {'ok': True, 'model': self.model_path, 'backend': self.backend_name,
+                    'loads': self.loads, 'pid': os.getpid()}
+        if op == 'unload':
+            self.unload()
+            return {'ok': True}
+        if op == 'translate':
+            texts = message.get('texts') or []
+            source = message.get('source') or DEFAULT_SOURCE_LANG
+            if source == 'auto':
+                source = DEFAULT_SOURCE_LANG
+            try:
+                backend = self.get_backend(message['model'], message.get('backend') or AUTO_BACKEND)
+            except BackendError as e:
+                return {'ok': False, 'error': str(e)}
+            translations = backend.translate(texts, source, message['target']) if texts else []
+            return {'ok': True, 'translations': translations, 'backend': self.backend_name}
+        return {'ok': False, 'error': f"Opération inconnue: {op}"}
+
+
+def worker_main():
+    """Boucle principale du processus worker"""
+    # Le protocole utilise stdout: tout affichage parasite part sur stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    state = WorkerState()
+
+    for raw in sys.stdin:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            message = json.loads(raw)
+        except json.JSONDecodeError as e:
+            response = {'ok': False, 'error': f"JSON invalide: {e}"}
+        else:
+            if message.get('op') == 'shutdown':
+                break
+            try:
+                response = state.handle(message)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            response['id'] = message.get('id')
+        protocol_out.write(json.dumps(response, ensure_ascii=False) + '\n')
+        protocol_out.flush()
+
+
+# Côté application
+class TranslationWorkerClient:
+    """Pilote le processus worker: démarrage à la demande, requêtes
+    sérialisées et arrêt automatique après une période d'inactivité."""
+
+    def __init__(self, idle_timeout: float = 600.0,
+                 on_stderr: Optional[Callable[[str], None]] = None,
+                 threads: Optional[int] = None):
+        """
+        Args:
+            idle_timeout: Secondes d'inactivité avant l'arrêt du worker (0 = jamais)
+            on_stderr: Callback pour chaque ligne de log du worker
+            threads: Nombre de threads de calcul du worker (None = défaut des
+                bibliothèques, qui prennent tous les cœurs)
+        """
+        self.idle_timeout = idle_timeout
+        self.on_stderr = on_stderr
+        self.threads = threads
+        self.process: Optional[subprocess.Popen] = None
+        self.model_path: Optional[str] = None
+        self.backend: Optional[str] = None
+        self.last_used = 0.0
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._monitor: Optional[threading.Thread] = None
+
+    def _command(self) -> List[str]:
+        if getattr(sys, 'frozen', False):
+            # Exécutable PyInstaller: app.py redirige vers worker_main()
+            return [sys.executable, '--translation-worker']
+        return [sys.executable, '-m', 'src.backend.translation_worker']
+
+    def is_running(self) -> bool:
+        """Indique si le processus worker est vivant"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Démarre le worker s'il ne tourne pas déjà"""
+        with self._lock:
+            if self.is_running():
+                return
+            env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+            if self.threads:
+                # Évite la sursouscription quand plusieurs workers partagent les cœurs
+                env.update({name: str(self.threads) for name in THREAD_ENV_VARS})
+            popen_kwargs = {}
+            if os.name == 'nt':
+                popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                popen_kwargs['start_new_session'] = True
+            self.process = subprocess.Popen(
+                self._command(),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, encoding='utf-8', bufsize=1,
+                cwd=str(PROJECT_ROOT), env=env, **popen_kwargs)
+            self.model_path = None
+            self.last_used = time.monotonic()
+            print(f"DEBUG: Translation worker started (pid {self.process.pid})")
+
+            threading.Thread(target=self._pump_stderr, args=(self.process,),
+                             daemon=True).start()
+            if self.idle_timeout and (self._monitor is None or not self._monitor.is_alive()):
+                self._monitor = threading.Thread(target=self._idle_monitor, daemon=True)
+                self._monitor.start()
+
+    def _pump_stderr(self, process: subprocess.Popen):
+        for line in process.stderr:
+            line = line.rstrip('\n')
+            if self.on_stderr:
+                self.on_stderr(line)
+            else:
+                print(f"[worker] {line}")
+
+    def _idle_monitor(self):
+        """Arrête le worker (et libère le modèle) après inactivité"""
+        while True:
+            time.sleep(min(30.0, max(1.0, self.idle_timeout / 4)))
+            with self._lock:
+                if not self.is_running():
+                    return
+                if time.monotonic() - self.last_used >= self.idle_timeout:
+                    print("DEBUG: Translation worker idle, unloading model")
+                    self.stop()
+                    return
+
+    def request(self, op: str, **payload) -> Dict:
+        """Envoie un message au worker et attend sa réponse.
+
+        Le processus est relu une seule fois: kill() (sans verrou) peut le
+        retirer pendant l'attente, la requête échoue alors en WorkerError.
+        """
+        with self._lock:
+            self.start()
+            process = self.process
+            self._next_id += 1
+            message = {'id': self._next_id, 'op': op, **payload}
+            try:
+                if process is None:
+                    raise WorkerError("Le worker de traduction a été arrêté")
+                process.stdin.write(json.dumps(message, ensure_ascii=False) + '\n')
+                process.stdin.flush()
+                response = self._read_response(process)
+            except (OSError, ValueError) as e:
+                self.stop()
+                raise WorkerError(f"Worker de traduction indisponible: {e}") from e
+            finally:
+                self.last_used = time.monotonic()
+            if not response.get('ok'):
+                raise WorkerError(response.get('error') or 'Erreur inconnue du worker')
+            return response
+
+    def _read_response(self, process: subprocess.Popen) -> Dict:
+        """Prochaine réponse du worker; une ligne hors protocole (affichage
+        parasite sur stdout) est ignorée"""
+        while True:
+            raw = process.stdout.readline()
+            if process is not self.process:
+                # Tué par kill() pendant la lecture: la requête est annulée
+                raise WorkerError("Le worker de traduction a été arrêté")
+            if not raw:
+                self.stop()
+                raise WorkerError("Le worker de traduction s'est arrêté")
+            try:
+                response = json.loads(raw)
+            except json.JSONDecodeError:
+                response = None
+            if isinstance(response, dict):
+                return response
+            print(f"DEBUG: Translation worker output ignored: {raw.rstrip()}")
+
+    def translate(self, texts: List[str], model: str, source: str, target: str,
+                  backend: str = AUTO_BACKEND) -> List[str]:
+        """Traduit une liste de textes (le modèle reste chaud entre les appels)"""
+        response = self.request('translate', texts=texts, model=model,
+                                source=source, target=target, backend=backend)
+        self.model_path = model
+        self.backend = response.get('backend')
+        return response['translations']
+
+    def status(self) -> Dict:
+        """État courant du worker"""
+        running = self.is_running()
+        return {
+            'running': running,
+            'pid': self.process.pid if running else None,
+            'model': self.model_path if running else None,
+            'backend': self.backend if running else None,
+            'idleSeconds': round(time.monotonic() - self.last_used, 1) if running else None,
+            'idleTimeout': self.idle_timeout,
+            'threads': self.threads,
+        }
+
+    def stop(self):
+        """Arrête le worker (ainsi que ses éventuels processus enfants)"""
+        with self._lock:
+            process = self.process
+            self.process = None
+            self.model_path = None
+            if process is None or process.poll() is not None:
+                return
+            try:
+                process.stdin.write(json.dumps({'op': 'shutdown'}) + '\n')
+                process.stdin.flush()
+                process.wait(timeout=5)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                kill_process_tree(process)
+
+    def kill(self):
+        """Tue immédiatement le worker et ses enfants (annulation).
+
+        Volontairement sans verrou: une requête en cours le détient en
+        attendant la réponse du worker.
+        """
+        process = self.process
+        self.process = None
+        self.model_path = None
+        if process is not None and process.poll() is None:
+            kill_process_tree(process)
+
+
+class TranslationWorkerPool:
+    """Ensemble de workers pour traduire plusieurs lots de fichiers en
+    parallèle, chaque processus étant limité à sa part des cœurs CPU."""
+
+    def __init__(self, max_workers: int = 1, threads_per_worker: Optional[int] = None,
+                 idle_timeout: float = 600.0):
+        """
+        Args:
+            max_workers: Nombre maximum de processus worker
+            threads_per_worker: Threads de calcul par worker (None = cœurs / workers)
+            idle_timeout: Secondes d'inactivité avant l'arrêt d'un worker
+        """
+        self.max_workers = max(1, max_workers)
+        self.threads_per_worker = threads_per_worker
+        self.idle_timeout = idle_timeout
+        self.clients: List[TranslationWorkerClient] = []
+        self._on_stderr: Optional[Callable[[str], None]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def on_stderr(self) -> Optional[Callable[[str], None]]:
+        """Callback pour les logs de tous les workers"""
+        return self._on_stderr
+
+    @on_stderr.setter
+    def on_stderr(self, callback: Optional[Callable[[str], None]]):
+        self._on_stderr = callback
+        for client in self.clients:
+            client.on_stderr = callback
+
+    def threads_for(self, count: int) -> int:
+        """Threads de calcul attribués à chaque worker quand 'count' tournent"""
+        if self.threads_per_worker:
+            return self.threads_per_worker
+        return max(1, (os.cpu_count() or 1) // count)
+
+    def acquire(self, count: int) -> List[TranslationWorkerClient]:
+        """Retourne 'count' workers configurés pour se partager les cœurs.
+
+        Un worker dont la limite de threads change est redémarré; les
+        workers en surplus sont arrêtés pour libérer la mémoire du modèle.
+        """
+        count = max(1, min(count, self.max_workers))
+        threads = self.threads_for(count)
+        with self._lock:
+            while len(self.clients) < count:
+                self.clients.append(TranslationWorkerClient(
+                    idle_timeout=self.idle_timeout, on_stderr=self._on_stderr,
+                    threads=threads))
+            for client in self.clients[:count]:
+                if client.threads != threads:
+                    client.stop()
+                    client.threads = threads
+            for client in self.clients[count:]:
+                client.stop()
+            return self.clients[:count]
+
+    def translate(self, texts: List[str], model: str, source: str, target: str,
+                  backend: str = AUTO_BACKEND) -> List[str]:
+        """Traduit via le premier worker (runs non parallélisés)"""
+        return self.acquire(1)[0].translate(texts, model, source, target, backend)
+
+    def status(self) -> Dict:
+        """État de la pool et de ses workers"""
+        workers = [client.status() for client in self.clients]
+        return {
+            'running': any(worker['running'] for worker in workers),
+            'maxWorkers': self.max_workers,
+            'workers': workers,
+        }
+
+    def stop(self):
+        """Arrête tous les workers"""
+        for client in list(self.clients):
+            client.stop()
+
+    def kill(self):
+        """Tue immédiatement tous les workers et leurs enfants (annulation)"""
+        for client in list(self.clients):
+            client.kill()
+
+
+def kill_process_tree(process: subprocess.Popen):
+    """Tue un processus et tout son groupe de processus"""
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                           capture_output=True, check=False)
+        else:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        try:
+            process.kill()
+        except OSError:
+            pass
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+if __name__ == '__main__':
+    worker_main()
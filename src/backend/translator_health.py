@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Translator Health for RenExtract v2
+État du traducteur mis en cache: commit de TranslationToolsIA, présence et
+taille du modèle en local, worker déjà chaud ou démarrage à froid.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.backend.translation_backends import (STUB_PREFIX, available_backends,
+                                              huggingface_cache_dir,
+                                              optimized_model_dir)
+from src.backend.translation_worker import TranslationWorkerPool
+
+# Clé d'invalidation: (chemin, mtime_ns, taille) des fichiers surveillés
+StatKey = Tuple[Tuple[str, int, int], ...]
+
+
+def stat_key(*paths: Path) -> StatKey:
+    """Empreinte stat() de fichiers ou dossiers (absents compris)"""
+    key = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            key.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            key.append((str(path), 0, -1))
+    return tuple(key)
+
+
+def directory_size(path: Path) -> int:
+    """Taille totale des fichiers d'un dossier (liens symboliques ignorés)"""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+
+class TranslatorHealth:
+    """Instantané de santé du traducteur, recalculé seulement quand les
+    fichiers surveillés changent (.git/HEAD, référence courante, modèle)."""
+
+    def __init__(self, repo_path: Path, workers: TranslationWorkerPool):
+        self.repo_path = Path(repo_path)
+        self.workers = workers
+        self._git_key: Optional[StatKey] = None
+        self._git_head: Optional[str] = None
+        self._ref_file: Optional[Path] = None
+        self._models: Dict[str, Tuple[StatKey, Dict]] = {}
+        self._lock = threading.Lock()
+
+    # Dépôt TranslationToolsIA
+    def _read_head(self) -> Tuple[Optional[str], Path]:
+        """Lit le commit courant sans lancer git; retourne (hash, fichier de ref)"""
+        git_dir = self.repo_path / '.git'
+        head_file = git_dir / 'HEAD'
+        content = head_file.read_text(encoding='utf-8').strip()
+        if not content.startswith('ref:'):
+            # HEAD détachée: le hash est directement dans HEAD
+            return content or None, head_file
+        ref = content[4:].strip()
+        ref_file = git_dir / ref
+        if ref_file.exists():
+            return ref_file.read_text(encoding='utf-8').strip() or None, ref_file
+        # Référence compactée (git gc)
+        packed = git_dir / 'packed-refs'
+        if packed.exists():
+            for line in packed.read_text(encoding='utf-8').splitlines():
+                parts = line.split(' ', 1)
+                if len(parts) == 2 and parts[1].strip() == ref:
+                    return parts[0], packed
+        return None, packed
+
+    def _git_key_for(self, ref_file: Optional[Path]) -> StatKey:
+        git_dir = self.repo_path / '.git'
+        return stat_key(git_dir / 'HEAD', git_dir / 'packed-refs',
+                        ref_file or git_dir / 'HEAD')
+
+    def git_state(self) -> Dict:
+        """Présence du dépôt et commit courant.
+
+        Le résultat est gardé tant que .git/HEAD, packed-refs et le fichier
+        de la branche courante n'ont pas changé (quelques stat(), pas de git).
+        """
+        with self._lock:
+            if self._git_key is None or self._git_key_for(self._ref_file) != self._git_key:
+                head, self._ref_file = None, None
+                try:
+                    head, self._ref_file = self._read_head()
+                except OSError:
+                    pass
+                self._git_head = head[:7] if head else None
+                self._git_key = self._git_key_for(self._ref_file)
+            return {'exists': self.repo_path.exists(), 'gitHead': self._git_head}
+
+    # Modèle
+    def _model_location(self, model: str) -> Optional[Path]:
+        """Dossier local du modèle: chemin direct ou cache Hugging Face"""
+        direct = Path(model).expanduser()
+        if direct.is_dir():
+            return direct
+        if '/' in model and not direct.is_absolute():
+            return huggingface_cache_dir() / f"models--{model.replace('/', '--')}"
+        return None
+
+    def model_state(self, model: str) -> Dict:
+        """Présence et taille du modèle en local (cache invalidé par stat)"""
+        if model.startswith(STUB_PREFIX):
+            return {'id': model, 'cached': True, 'path': None, 'sizeBytes': 0,
+                    'backends': ['stub']}
+        location = self._model_location(model)
+        if location is None:
+            return {'id': model, 'cached': False, 'path': None, 'sizeBytes': 0,
+                    'backends': available_backends(model)}
+
+        # Le dossier ONNX (commande 'convert') change les backends disponibles
+        key = stat_key(location, location / 'snapshots', location / 'blobs',
+                       optimized_model_dir(model))
+        with self._lock:
+            cached = self._models.get(model)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        exists = location.is_dir()
+        state = {
+            'id': model,
+            'cached': exists,
+            'path': str(location) if exists else None,
+            'sizeBytes': directory_size(location) if exists else 0,
+            # Backends utilisables, du plus rapide au plus lent ('auto' prend le premier)
+            'backends': available_backends(model),
+        }
+        with self._lock:
+            self._models[model] = (key, state)
+        return state
+
+    def snapshot(self, model: str) -> Dict:
+        """Instantané complet: dépôt, modèle et état des workers"""
+        workers = self.workers.status()
+        warm = any(worker['running'] and worker['model'] == model
+                   for worker in workers['workers'])
+        return {
+            **self.git_state(),
+            'model': self.model_state(model),
+            'workers': workers,
+            'warm': warm,
+            # Le prochain run devra démarrer un worker et charger le modèle
+            'coldStart': not warm,
+        }
@@ -15,11 +15,14 @@ from pathlib import Path
 from typing import Dict, Optional
 import requests
 
+from src.backend.event_bus import EventBus, ProgressThrottle
+
 
 class UpdateManager:
     """Gestionnaire de mise à jour automatique"""
 
-    def __init__(self, repo_owner: str, repo_name: str, current_version: str):
+    def __init__(self, repo_owner: str, repo_name: str, current_version: str,
+                 event_bus: Optional[EventBus] = None):
         """
         Initialise le gestionnaire de mise à jour
 
@@ -27,7 +30,9 @@ class UpdateManager:
             repo_owner: Propriétaire du dépôt GitHub (ex: "votre-username")
             repo_name: Nom du dépôt GitHub (ex: "renextract-v2")
             current_version: Version actuelle de l'application
+            event_bus: Bus d'événements pour publier la progression (optionnel)
         """
+        self.event_bus = event_bus
         self.repo_owner = repo_owner
         self.repo_name = repo_name
         self.current_version = current_version
@@ -50,6 +55,11 @@ class UpdateManager:
         # Charger la configuration depuis le disque
         self._load_config()
 
+    def _publish(self, data: Dict):
+        """Publie un événement 'updates' si un bus est configuré"""
+        if self.event_bus is not None:
+            self.event_bus.publish('updates', data)
+
     def _get_current_os(self) -> str:
         """Détermine l'OS actuel pour télécharger le bon exécutable"""
         system = platform.system().lower()
@@ -222,35 +232,45 @@ class UpdateManager:
         """
         try:
             print(f"DEBUG: Downloading update from {download_url}")
+            self._publish({'type': 'download_started', 'url': download_url})
 
             # Créer un dossier temporaire
             temp_dir = tempfile.mkdtemp(prefix="update_")
             download_path = os.path.join(temp_dir, "update.zip")
 
             # Télécharger avec une barre de progression
+            publish_progress = ProgressThrottle(self.event_bus, 'updates')
+
             def download_progress(block_num, block_size, total_size):
-                if progress_callback and total_size > 0:
-                    downloaded = block_num * block_size
+                if total_size > 0:
+                    downloaded = min(block_num * block_size, total_size)
                     progress = min(100, (downloaded / total_size) * 100)
-                    progress_callback(progress, downloaded, total_size)
+                    publish_progress(progress, downloaded=downloaded,
+                                     total=total_size)
+                    if progress_callback:
+                        progress_callback(progress, downloaded, total_size)
 
             urllib.request.urlretrieve(
                 download_url, download_path, download_progress)
 
             # Vérifier que le fichier a été téléchargé
             if not os.path.exists(download_path):
+                self._publish({'type': 'download_failed'})
                 return {
                     'success': False,
                     'error': 'Le fichier de mise à jour n\'a pas été téléchargé'
                 }
 
             # Extraire l'archive
+            self._publish({'type': 'extracting'})
             extract_path = os.path.join(temp_dir, "extracted")
             os.makedirs(extract_path, exist_ok=True)
 
             with zipfile.ZipFile(download_path, 'r') as zip_ref:
                 zip_ref.extractall(extract_path)
 
+            self._publish({'type': 'download_finished',
+                           'extract_path': extract_path})
             return {
                 'success': True,
                 'temp_dir': temp_dir,
@@ -260,6 +280,7 @@ class UpdateManager:
 
         except (OSError, urllib.error.URLError, zipfile.BadZipFile) as e:
             print(f"DEBUG: Failed to download update: {e}")
+            self._publish({'type': 'download_failed', 'error': str(e)})
             return {
                 'success': False,
                 'error': f'Erreur de téléchargement: {str(e)}'
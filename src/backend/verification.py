@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Verification for RenExtract v2
+Revérifie les scripts reconstruits en les comparant ligne à ligne à leur copie
+d'origine (01_Temporary/<jeu>/originals/): placeholders non restaurés ou
+variables modifiées, balises Ren'Py cassées, guillemets déséquilibrés,
+nombre de lignes ou indentation qui ont changé.
+
+Les fichiers sont répartis sur un pool de processus (un fichier par tâche,
+les plus gros d'abord), quand ses processus enfants ne réexécutent pas
+l'initialisation de l'application (voir _pool_context), et tous les problèmes sont réunis dans un rapport
+JSON et HTML dans 02_Reports, avec une ancre fichier:ligne par problème.
+"""
+import datetime
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.backend.extraction import (ORIGINALS_DIR, SCAN_CHUNK, count_lines,
+                                    game_name_for, read_manifest)
+from src.backend.file_utils import atomic_write_text, mapped_file
+from src.backend.placeholders import RENPY_TOKEN, create_protector
+from src.backend.script_encoding import is_wide
+
+# Catégories de problèmes
+ISSUE_KINDS = ('placeholder', 'tag', 'quote', 'lineCount', 'indent', 'encoding')
+
+# Problèmes détaillés au plus par fichier (les suivants sont seulement comptés)
+MAX_FILE_ISSUES = 200
+
+# Problèmes détaillés dans la réponse de l'API (le rapport les contient tous)
+MAX_REPORTED_ISSUES = 50
+
+# En dessous de ce volume, le démarrage du pool coûte plus qu'il ne rapporte
+POOL_MIN_BYTES = 2 * 1024 * 1024
+
+# Extrait de ligne conservé dans le rapport
+SNIPPET_LENGTH = 160
+
+# Littéral Ren'Py entre guillemets doubles (échappements compris)
+STRING_LITERAL = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+INDENT = re.compile(r'[ \t]*')
+
+
+def _snippet(line: str) -> str:
+    line = line.strip()
+    return line if len(line) <= SNIPPET_LENGTH else line[:SNIPPET_LENGTH - 1] + '…'
+
+
+def _renpy_elements(line: str) -> List[str]:
+    """Éléments Ren'Py d'une ligne, triés; les échappements sont ignorés car
+    la reconstruction en ajoute légitimement"""
+    return sorted(token for token in RENPY_TOKEN.findall(line) if token[0] != '\\')
+
+
+def _difference(label: str, before: List[str], after: List[str]) -> str:
+    missing, extra = Counter(before), Counter(after)
+    missing, extra = missing - extra, extra - missing
+    return label + ', '.join([f"-{e}" for e in sorted(missing.elements())]
+                             + [f"+{e}" for e in sorted(extra.elements())])
+
+
+def _stray_braces(line: str) -> int:
+    """Accolades hors balise (balise non fermée ou mal formée)"""
+    text = line.replace('{{', '').replace('}}', '')
+    text = re.sub(r'\{[^{}]*\}', '', text)
+    return text.count('{') + text.count('}')
+
+
+def _skeleton(line: str) -> str:
+    """La ligne sans le contenu de ses chaînes (le code qui doit rester intact)"""
+    return STRING_LITERAL.sub('""', line).rstrip()
+
+
+def _compare_line(original: str, current: str, has_placeholder) -> List[Tuple[str, str]]:
+    """Problèmes d'une ligne modifiée par la reconstruction: [(catégorie, message)]"""
+    found = []
+    skeleton, new_skeleton = _skeleton(original), _skeleton(current)
+    if skeleton != new_skeleton:
+        if INDENT.match(original).group(0) != INDENT.match(current).group(0):
+            found.append(('indent', 'Indentation modifiée'))
+        # Un guillemet non échappé ferme la chaîne: le code qui suit est décalé
+        if skeleton.lstrip() != new_skeleton.lstrip():
+            found.append(('quote', 'Guillemets déséquilibrés ou code modifié hors des chaînes'))
+    if has_placeholder(current) and not has_placeholder(original):
+        found.append(('placeholder', 'Placeholder non restauré'))
+    elements, new_elements = _renpy_elements(original), _renpy_elements(current)
+    if elements != new_elements:
+        tags = [e for e in elements if e[0] == '{']
+        new_tags = [e for e in new_elements if e[0] == '{']
+        if tags != new_tags:
+            found.append(('tag', _difference('Balises modifiées: ', tags, new_tags)))
+        variables = [e for e in elements if e[0] != '{']
+        new_variables = [e for e in new_elements if e[0] != '{']
+        if variables != new_variables:
+            found.append(('placeholder', _difference('Variables modifiées: ',
+                                                     variables, new_variables)))
+    elif ((current.count('{'), current.count('}')) != (original.count('{'), original.count('}'))
+          and _stray_braces(current) > _stray_braces(original)):
+        found.append(('tag', 'Balise non fermée ou mal formée'))
+    return found
+
+
+def _iter_lines(data, start: int = 1) -> Iterator[bytes]:
+    """Lignes d'un script projeté en mémoire (sans fin de ligne), à partir de
+    la ligne 'start'; découpées par blocs d'environ SCAN_CHUNK octets"""
+    size, position = len(data), 0
+    while position < size:
+        end = data.find(b'\n', position + SCAN_CHUNK)
+        end = size if end < 0 else end + 1
+        lines = data[position:end].split(b'\n')
+        if lines[-1] == b'':
+            lines.pop()
+        if start > len(lines):
+            start -= len(lines)
+        else:
+            yield from lines[start - 1:]
+            start = 1
+        position = end
+
+
+def verify_file(task: Tuple[str, str, str, str, str]) -> Dict:
+    """Vérifie un script reconstruit (exécuté dans un processus du pool).
+
+    Les deux scripts sont projetés en mémoire et comparés ligne à ligne sur
+    leurs octets: seules les lignes modifiées sont décodées.
+
+    Args:
+        task: (chemin relatif, copie d'origine, script du jeu, encodage,
+            format des placeholders)
+    """
+    relative, original_path, current_path, encoding, placeholder_format = task
+    result = {'file': relative, 'lines': 0, 'issues': [], 'total': 0,
+              'kinds': dict.fromkeys(ISSUE_KINDS, 0)}
+
+    def add(kind: str, line: Optional[int], message: str, original='', current=''):
+        result['total'] += 1
+        result['kinds'][kind] += 1
+        if len(result['issues']) < MAX_FILE_ISSUES:
+            result['issues'].append({'file': relative, 'line': line, 'kind': kind,
+                                     'message': message, 'original': _snippet(original),
+                                     'text': _snippet(current)})
+
+    def decode(line: bytes, errors: str = 'strict') -> str:
+        return line.rstrip(b'\r').decode(encoding, errors)
+
+    try:
+        with mapped_file(original_path) as original, mapped_file(current_path) as current:
+            if is_wide(encoding):
+                # Script UTF-16/UTF-32: comparé sur ses lignes transcodées en UTF-8
+                try:
+                    original = original[:].decode(encoding).encode('utf-8')
+                    current = current[:].decode(encoding).encode('utf-8')
+                except UnicodeDecodeError as e:
+                    add('encoding', None, f"Illisible en {encoding}: {e.reason}")
+                    return result
+                encoding = 'utf-8'
+            expected, result['lines'] = count_lines(original), count_lines(current)
+            pairs = enumerate(zip(_iter_lines(original), _iter_lines(current)), 1)
+            if expected != result['lines']:
+                # Premier écart de structure: au-delà, toutes les lignes seraient décalées
+                first, old, new = min(expected, result['lines']) + 1, b'', b''
+                for number, (old_line, new_line) in pairs:
+                    if (old_line != new_line and _skeleton(decode(old_line, 'replace'))
+                            != _skeleton(decode(new_line, 'replace'))):
+                        first, old, new = number, old_line, new_line
+                        break
+                else:
+                    # Lignes en plus ou en moins à la fin du fichier
+                    longer = current if result['lines'] > expected else original
+                    extra = next(_iter_lines(longer, first), b'')
+                    old, new = (b'', extra) if longer is current else (extra, b'')
+                add('lineCount', first,
+                    f"{result['lines']} ligne(s) au lieu de {expected} "
+                    f"(premier écart ligne {first})",
+                    decode(old, 'replace'), decode(new, 'replace'))
+                return result
+
+            has_placeholder = create_protector(placeholder_format).has_placeholder
+            for number, (old_line, new_line) in pairs:
+                if old_line == new_line:
+                    continue
+                try:
+                    old, new = decode(old_line), decode(new_line)
+                except UnicodeDecodeError as e:
+                    add('encoding', number, f"Illisible en {encoding}: {e.reason}",
+                        decode(old_line, 'replace'), decode(new_line, 'replace'))
+                    continue
+                for kind, message in _compare_line(old, new, has_placeholder):
+                    add(kind, number, message, old, new)
+    except OSError as e:
+        add('encoding', None, f"Lecture impossible: {e}")
+    return result
+
+
+def _tasks(output_dir: Path, manifest: Dict) -> Tuple[List[Tuple], List[Dict]]:
+    """Scripts reconstruits à vérifier (les plus gros d'abord) et scripts ignorés"""
+    root = Path(manifest['scriptsRoot'])
+    tasks, skipped = [], []
+    for info in manifest['files']:
+        relative = info['path']
+        original = output_dir / ORIGINALS_DIR / relative
+        current = root / relative
+        if not info.get('reconstructed') or not original.is_file():
+            skipped.append({'file': relative, 'reason': 'Non reconstruit'})
+        elif not current.is_file():
+            skipped.append({'file': relative, 'reason': 'Introuvable dans le jeu'})
+        else:
+            tasks.append((relative, str(original), str(current),
+                          info.get('encoding', manifest['encoding']),
+                          manifest['placeholderFormat'], current.stat().st_size))
+    tasks.sort(key=lambda task: task[-1], reverse=True)
+    return tasks, skipped
+
+
+def _write_html(path: Path, report: Dict):
+    """Rapport HTML autonome: résumé par fichier puis un tableau par fichier"""
+    esc = html.escape
+    rows = []
+    summary = []
+    for entry in report['results']:
+        if not entry['total']:
+            continue
+        anchor = esc(entry['file'], quote=True)
+        summary.append(f'<li><a href="#{anchor}">{esc(entry["file"])}</a>: '
+                       f'{entry["total"]} problème(s)</li>')
+        rows.append(f'<h2 id="{anchor}">{esc(entry["file"])}</h2><table>'
+                    '<tr><th>Ligne</th><th>Type</th><th>Problème</th>'
+                    '<th>Original</th><th>Reconstruit</th></tr>')
+        for issue in entry['issues']:
+            location = f"{entry['file']}:{issue['line'] or ''}"
+            rows.append(
+                f'<tr id="{esc(location, quote=True)}">'
+                f'<td><a href="#{esc(location, quote=True)}">{esc(location)}</a></td>'
+                f'<td>{esc(issue["kind"])}</td><td>{esc(issue["message"])}</td>'
+                f'<td><code>{esc(issue["original"])}</code></td>'
+                f'<td><code>{esc(issue["text"])}</code></td></tr>')
+        if entry['total'] > len(entry['issues']):
+            rows.append(f'<tr><td colspan="5">… {entry["total"] - len(entry["issues"])} '
+                        'autre(s) problème(s) non détaillé(s)</td></tr>')
+        rows.append('</table>')
+
+    counts = ', '.join(f"{kind}: {count}" for kind, count in report['kinds'].items() if count)
+    document = f'''<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8">
+<title>Vérification {esc(report['game'])}</title>
+<style>
+body{{font-family:sans-serif;margin:1.5em;background:#1e293b;color:#e2e8f0}}
+a{{color:#fdba74}} table{{border-collapse:collapse;width:100%;margin-bottom:1.5em}}
+td,th{{border:1px solid #475569;padding:.3em .5em;text-align:left;vertical-align:top}}
+code{{white-space:pre-wrap;word-break:break-all}} tr:target{{background:#7c2d12}}
+</style></head><body>
+<h1>Vérification de {esc(report['game'])}</h1>
+<p>{report['verified']} fichier(s) vérifié(s), {report['issues']} problème(s)
+{f"({esc(counts)})" if counts else ''} · {esc(report['created'])}</p>
+<ul>{''.join(summary)}</ul>
+{''.join(rows)}
+</body></html>
+'''
+    atomic_write_text(path, document)
+
+
+def _pool_context() -> Optional[BaseContext]:
+    """Méthode de démarrage des processus du pool, ou None (vérification
+    dans le processus courant).
+
+    Avec 'spawn' (Windows, macOS) ou 'forkserver', chaque enfant réimporte
+    le module principal: lancé depuis les sources, c'est app.py et toute
+    son initialisation (Flask, pywebview, paramètres). Seuls l'exécutable,
+    dont les enfants sont interceptés par freeze_support(), et 'fork', où
+    les enfants héritent des modules déjà importés, évitent ce coût.
+    """
+    if getattr(sys, 'frozen', False):
+        return multiprocessing.get_context()
+    if sys.platform.startswith('linux'):
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def verify_game(game_path: str, temporary_dir: Path, reports_dir: Path,
+                max_workers: Optional[int] = None) -> Dict:
+    """Vérifie les scripts reconstruits d'un jeu et écrit le rapport"""
+    result = {'success': False, 'error': None}
+    started = time.perf_counter()
+    try:
+        game = game_name_for(Path(game_path))
+        output_dir = Path(temporary_dir) / game
+        manifest = read_manifest(output_dir)
+        tasks, skipped = _tasks(output_dir, manifest)
+
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if workers > 1 and sum(task[-1] for task in tasks) < POOL_MIN_BYTES:
+            workers = 1
+        context = _pool_context() if workers > 1 else None
+        if context is None:
+            workers = 1
+        work = [task[:-1] for task in tasks]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                results = list(executor.map(verify_file, work))
+        else:
+            results = [verify_file(task) for task in work]
+        results.sort(key=lambda entry: entry['file'])
+
+        kinds = dict.fromkeys(ISSUE_KINDS, 0)
+        for entry in results:
+            for kind, count in entry['kinds'].items():
+                kinds[kind] += count
+        total = sum(entry['total'] for entry in results)
+        elapsed = time.perf_counter() - started
+        created = datetime.datetime.now()
+        report = {
+            'game': game,
+            'gamePath': str(game_path),
+            'created': created.isoformat(timespec='seconds'),
+            'verified': len(results),
+            'lines': sum(entry['lines'] for entry in results),
+            'issues': total,
+            'kinds': kinds,
+            'skipped': skipped,
+            'processes': workers,
+            'elapsed': round(elapsed, 3),
+            'results': results,
+        }
+
+        stem = f"verification_{game}_{created.strftime('%Y%m%d_%H%M%S')}"
+        json_path = Path(reports_dir) / f"{stem}.json"
+        html_path = Path(reports_dir) / f"{stem}.html"
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(json_path, json.dumps(report, ensure_ascii=False, indent=1))
+        _write_html(html_path, report)
+
+        result.update({
+            'success': True,
+            **{key: report[key] for key in ('verified', 'lines', 'issues', 'kinds',
+                                            'skipped', 'processes', 'elapsed')},
+            'details': [issue for entry in results
+                        for issue in entry['issues']][:MAX_REPORTED_ISSUES],
+            'reportJson': str(json_path),
+            'reportHtml': str(html_path),
+        })
+        print(f"DEBUG: Verification of {game_path}: {len(results)} file(s), "
+              f"{total} issue(s), {workers} process(es) in {elapsed:.2f}s")
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+        print(f"Erreur vérification: {e}")
+    return result
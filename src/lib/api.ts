@@ -20,6 +20,8 @@ export interface HealthResponse {
 export interface SettingsUpdateResponse {
   success: boolean;
   message: string;
+  version?: number;
+  rejected?: string[];
 }
 
 export interface BackupListResponse {
@@ -28,6 +30,18 @@ export interface BackupListResponse {
   error?: string;
 }
 
+export interface UpdateConfigResponse {
+  success: boolean;
+  config?: Record<string, unknown>;
+  error?: string;
+}
+
+export interface UpdateAutoCheckResponse {
+  success: boolean;
+  should_check?: boolean;
+  error?: string;
+}
+
 export interface BackupActionResponse {
   success: boolean;
   message?: string;
@@ -36,8 +50,79 @@ export interface BackupActionResponse {
 
 export type SettingsData = Record<string, unknown>;
 
+export interface BatchRequest {
+  id: string;
+  method?: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+  path: string;
+  body?: unknown;
+}
+
+export interface BatchResult {
+  id: string;
+  status: number;
+  body: unknown;
+  etag?: string;
+}
+
+// Appels du démarrage regroupés en un seul aller-retour (/api/batch)
+const STARTUP_REQUESTS: BatchRequest[] = [
+  { id: 'health', path: '/api/health' },
+  { id: 'settings', path: '/api/settings' },
+  { id: 'updatesAutoCheck', path: '/api/updates/auto-check' },
+  { id: 'updatesConfig', path: '/api/updates/config' },
+  { id: 'backups', path: '/api/backups' },
+];
+
+// Au-delà de ce délai, les résultats préchargés sont considérés périmés
+const STARTUP_RESULT_TTL_MS = 5000;
+
+let startupBatch: Promise<Map<string, BatchResult>> | null = null;
+let startupBatchStartedAt = 0;
+const consumedStartupResults = new Set<string>();
+
+/**
+ * Retourne (une seule fois) le résultat préchargé d'un appel du démarrage.
+ * Le premier appel lance le lot complet; les suivants le partagent. Ensuite,
+ * on repasse par le réseau pour obtenir des données fraîches.
+ */
+async function fromStartupBatch<T>(id: string): Promise<T | undefined> {
+  if (consumedStartupResults.has(id)) return undefined;
+  consumedStartupResults.add(id);
+  if (!startupBatch) {
+    void apiService.prefetchStartup().catch(() => undefined);
+  }
+  if (!startupBatch || Date.now() - startupBatchStartedAt > STARTUP_RESULT_TTL_MS) {
+    return undefined;
+  }
+  try {
+    const result = (await startupBatch).get(id);
+    if (result && result.status >= 200 && result.status < 300) {
+      return result.body as T;
+    }
+  } catch {
+    // Lot indisponible: repli sur l'appel individuel
+  }
+  return undefined;
+}
+
 // Service API
 export const apiService = {
+  async batch(requests: BatchRequest[], parallel = true): Promise<BatchResult[]> {
+    const response = await api.post('/batch', { requests, parallel });
+    return (response.data.responses || []) as BatchResult[];
+  },
+
+  /** Lance le préchargement groupé des données de démarrage (idempotent). */
+  prefetchStartup(): Promise<Map<string, BatchResult>> {
+    if (!startupBatch) {
+      startupBatchStartedAt = Date.now();
+      startupBatch = apiService
+        .batch(STARTUP_REQUESTS)
+        .then(results => new Map(results.map(result => [result.id, result])));
+    }
+    return startupBatch;
+  },
+
   async openDialog(
     params: {
       path?: string;
@@ -93,6 +178,8 @@ export const apiService = {
     }
   },
   async healthCheck(): Promise<HealthResponse> {
+    const prefetched = await fromStartupBatch<HealthResponse>('health');
+    if (prefetched) return prefetched;
     const response = await api.get('/health');
     return response.data as HealthResponse;
   },
@@ -103,6 +190,8 @@ export const apiService = {
   },
 
   async getSettings(): Promise<SettingsData> {
+    const prefetched = await fromStartupBatch<SettingsData>('settings');
+    if (prefetched) return prefetched;
     const response = await api.get('/settings');
     return response.data as SettingsData;
   },
@@ -161,6 +250,11 @@ export const apiService = {
 
   async getBackups(gameFilter?: string, typeFilter?: string): Promise<BackupListResponse> {
     try {
+      if (!gameFilter && !typeFilter) {
+        const prefetched = await fromStartupBatch<BackupListResponse>('backups');
+        if (prefetched) return prefetched;
+      }
+
       const params = new window.URLSearchParams();
       if (gameFilter) params.append('game', gameFilter);
       if (typeFilter) params.append('type', typeFilter);
@@ -177,6 +271,20 @@ export const apiService = {
     }
   },
 
+  async getUpdateConfig(): Promise<UpdateConfigResponse> {
+    const prefetched = await fromStartupBatch<UpdateConfigResponse>('updatesConfig');
+    if (prefetched) return prefetched;
+    const response = await api.get('/updates/config');
+    return response.data as UpdateConfigResponse;
+  },
+
+  async shouldAutoCheckUpdates(): Promise<UpdateAutoCheckResponse> {
+    const prefetched = await fromStartupBatch<UpdateAutoCheckResponse>('updatesAutoCheck');
+    if (prefetched) return prefetched;
+    const response = await api.get('/updates/auto-check');
+    return response.data as UpdateAutoCheckResponse;
+  },
+
   async restoreBackup(backupId: string): Promise<BackupActionResponse> {
     try {
       const response = await api.post(`/backups/${backupId}/restore`);
@@ -0,0 +1,34 @@
+/* eslint-env browser */
+
+// Événement publié par le backend sur /api/events (Server-Sent Events)
+export interface BackendEvent {
+  type: string;
+  [key: string]: unknown;
+}
+
+export type BackendEventHandler = (event: BackendEvent, topic: string) => void;
+
+/**
+ * S'abonne aux topics du backend (updates, translator, backups...).
+ * Retourne une fonction de désabonnement à appeler au démontage.
+ */
+export function subscribeEvents(
+  topics: string[],
+  handler: BackendEventHandler
+): () => void {
+  const params = new window.URLSearchParams({ topics: topics.join(',') });
+  const source = new window.EventSource(`/api/events?${params.toString()}`);
+
+  for (const topic of topics) {
+    source.addEventListener(topic, message => {
+      try {
+        const data = JSON.parse((message as MessageEvent<string>).data);
+        handler(data as BackendEvent, topic);
+      } catch {
+        // Ignorer les messages mal formés
+      }
+    });
+  }
+
+  return () => source.close();
+}
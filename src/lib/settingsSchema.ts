@@ -0,0 +1,41 @@
+// Fichier généré par src/backend/settings_schema.py - ne pas modifier.
+// python -m src.backend.settings_schema src/lib/settingsSchema.ts
+
+export const SETTINGS_SCHEMA_VERSION = 2;
+
+export interface AppSettings {
+  language: string;
+  theme: 'light' | 'dark' | 'auto';
+  debugActive: boolean;
+  translatorFeature: boolean;
+  autoOpenings: {
+    files: boolean;
+    folders: boolean;
+    reports: boolean;
+    outputField: boolean;
+  };
+  externalTools: {
+    textEditor: string;
+    translator: string;
+  };
+  paths: {
+    renpySdk: string;
+    editor: string;
+  };
+  folders: {
+    temporary: string;
+    reports: string;
+    backups: string;
+    configs: string;
+  };
+  extraction: {
+    placeholderFormat: string;
+    encoding: string;
+  };
+  colors: {
+    extractButton: string;
+    reconstructButton: string;
+    verifyButton: string;
+    accents: string;
+  };
+}
@@ -1,4 +1,5 @@
 import { apiService } from '$lib/api';
+import type { AppSettings } from '$lib/settingsSchema';
 import { get, writable } from 'svelte/store';
 
 interface AppState {
@@ -23,37 +24,6 @@ const appActions = {
   },
 };
 
-interface AppSettings {
-  language: string;
-  theme: 'light' | 'dark' | 'auto';
-  debugActive: boolean; // Single debug mode (false=Level 3, true=Level 4)
-  translatorFeature: boolean;
-  autoOpenings: {
-    files: boolean;
-    folders: boolean;
-    reports: boolean;
-    outputField: boolean;
-  };
-  externalTools: {
-    textEditor: string;
-    translator: string;
-  };
-  paths: {
-    editor: string;
-    renpySdk: string;
-  };
-  folders: {
-    temporary: string;
-    reports: string;
-    backups: string;
-    configs: string;
-  };
-  extraction: {
-    placeholderFormat: string;
-    encoding: string;
-  };
-}
-
 const initialSettings: AppSettings = {
   language: 'fr',
   theme: 'auto',
@@ -83,6 +53,12 @@ const initialSettings: AppSettings = {
     placeholderFormat: 'PLACEHOLDER_{n}',
     encoding: 'UTF-8',
   },
+  colors: {
+    extractButton: '#3B82F6',
+    reconstructButton: '#10B981',
+    verifyButton: '#F59E0B',
+    accents: '#6366F1',
+  },
 };
 
 const appSettings = writable<AppSettings>(initialSettings);
@@ -90,26 +66,57 @@ const appSettings = writable<AppSettings>(initialSettings);
 const appSettingsActions = {
   _settingsLoaded: false as boolean,
   _syncTimer: null as ReturnType<typeof setTimeout> | null,
+  // Dernier état envoyé au backend, par clé de premier niveau (JSON)
+  _lastSynced: {} as Record<string, string>,
+  _rememberSynced(settings: AppSettings) {
+    const next: Record<string, string> = {};
+    for (const [key, value] of Object.entries(settings)) {
+      next[key] = JSON.stringify(value);
+    }
+    appSettingsActions._lastSynced = next;
+  },
   async _syncNow() {
-    if (!this._settingsLoaded) return;
+    if (!appSettingsActions._settingsLoaded) return;
+    if (appSettingsActions._syncTimer) {
+      clearTimeout(appSettingsActions._syncTimer);
+      appSettingsActions._syncTimer = null;
+    }
     try {
+      // N'envoyer que les clés modifiées depuis la dernière synchronisation
       const current = get(appSettings) as unknown as Record<string, unknown>;
-      await apiService.updateSettings(current);
+      const changed: Record<string, unknown> = {};
+      const serialized: Record<string, string> = {};
+      for (const [key, value] of Object.entries(current)) {
+        serialized[key] = JSON.stringify(value);
+        if (serialized[key] !== appSettingsActions._lastSynced[key]) {
+          changed[key] = value;
+        }
+      }
+      if (Object.keys(changed).length === 0) return;
+      await apiService.updateSettings(changed);
+      appSettingsActions._lastSynced = {
+        ...appSettingsActions._lastSynced,
+        ...Object.fromEntries(
+          Object.keys(changed).map(key => [key, serialized[key]])
+        ),
+      };
     } catch {
       // Ignorer silencieusement
     }
   },
   _scheduleSync() {
-    if (!this._settingsLoaded) return;
-    if (this._syncTimer) clearTimeout(this._syncTimer);
-    this._syncTimer = setTimeout(async () => {
+    if (!appSettingsActions._settingsLoaded) return;
+    if (appSettingsActions._syncTimer) {
+      clearTimeout(appSettingsActions._syncTimer);
+    }
+    appSettingsActions._syncTimer = setTimeout(async () => {
       await appSettingsActions._syncNow();
     }, 500);
   },
   setSetting: <K extends keyof AppSettings>(key: K, value: AppSettings[K]) => {
     appSettings.update(setting => ({ ...setting, [key]: value }));
-    // Sauvegarde immédiate pour éviter la perte en cas de refresh rapide
-    void appSettingsActions._syncNow();
+    // Les éditions rapides sont regroupées (debounce) avant envoi
+    appSettingsActions._scheduleSync();
   },
 
   resetSettings: () => {
@@ -139,6 +146,7 @@ const appSettingsActions = {
         ...initialSettings,
         ...fetched,
       } as AppSettings;
+      appSettingsActions._rememberSynced(nextSettings);
       appSettings.set(nextSettings);
       appSettingsActions._settingsLoaded = true;
     }
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests de l'extraction (src/backend/extraction.py): index.bin et
+ré-extraction incrémentale (ExtractionCache)
+"""
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+
+from src.backend.extraction import (INDEX_FILE, INDEX_TYPECODE, KIND_DIALOGUE, KIND_MENU,
+                                    STRINGS_FILE, ExtractionIndex, extract_game,
+                                    load_strings, read_manifest)
+
+SCRIPTS = {
+    'script.rpy': ('label start:\n    e "Hello {b}you{/b}."\n    "Same"\n'
+                   '    menu:\n        "Left":\n            pass\n'),
+    'chapter.rpy': 'label chapter:\n    e "Héllo [name]!"\n    "Same"\n',
+}
+
+
+class ExtractionTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.temporary_dir = base / '01_Temporary'
+        self.game = base / 'Jeu'
+        self.scripts = self.game / 'game'
+        self.scripts.mkdir(parents=True)
+        for name, text in SCRIPTS.items():
+            (self.scripts / name).write_text(text, encoding='utf-8')
+        self.output_dir = self.temporary_dir / 'Jeu'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def extract(self, **options):
+        result = extract_game(str(self.game), self.temporary_dir, **options)
+        self.assertTrue(result['success'], result['error'])
+        return result
+
+    def strings(self):
+        return (self.output_dir / STRINGS_FILE).read_text(encoding='utf-8').splitlines()
+
+    def translate(self):
+        path = self.output_dir / STRINGS_FILE
+        path.write_text(''.join(f"FR {line}\n" for line in self.strings()), encoding='utf-8')
+
+    def test_index_round_trip(self):
+        result = self.extract()
+        self.assertEqual((result['strings'], result['unique'], result['menu']), (5, 4, 1))
+
+        manifest = read_manifest(self.output_dir)
+        index, texts, tokens = load_strings(self.output_dir, manifest)
+        self.assertEqual((index.count, index.unique_count, len(texts)), (5, 4, 4))
+        for file_index, info in enumerate(manifest['files']):
+            data = (self.scripts / info['path']).read_bytes()
+            lines = data.split(b'\n')
+            for entry in index.file_range(file_index):
+                self.assertEqual(index.files[entry], file_index)
+                # Littéral entre guillemets, à la position et dans la colonne relevées
+                offset, end = index.offsets[entry], index.offsets[entry] + index.lengths[entry]
+                self.assertEqual((data[offset - 1:offset], data[end:end + 1]), (b'"', b'"'))
+                line = lines[index.lines[entry] - 1].decode('utf-8')
+                self.assertEqual(line[index.starts[entry]:index.ends[entry]],
+                                 data[offset:end].decode('utf-8'))
+
+        # Doublon: une seule ligne de strings.txt pour les deux occurrences
+        same = [entry for entry in range(index.count) if texts[index.strings[entry]] == 'Same']
+        self.assertEqual(len(same), 2)
+        self.assertEqual(len({index.strings[entry] for entry in same}), 1)
+        self.assertEqual(sorted(index.kinds), [KIND_DIALOGUE] * 4 + [KIND_MENU])
+        self.assertEqual(tokens[texts.index('Hello PLACEHOLDER_0youPLACEHOLDER_1.')],
+                         '{b}\x1f{/b}')
+
+    def test_index_without_string_column(self):
+        # Format 2: pas de colonne 'string', une ligne de strings.txt par occurrence
+        raw = array(INDEX_TYPECODE, [0, 2, 4, 11, 20, 5, 0, 0, 3, 4, 10, 40, 4, 0])
+        index = ExtractionIndex(raw, width=7)
+        self.assertEqual((index.count, list(index.strings), index.unique_count), (2, [0, 1], 2))
+        self.assertEqual(list(index.lines), [2, 3])
+
+    def test_load_reads_written_index(self):
+        self.extract()
+        index = ExtractionIndex.load(self.output_dir / INDEX_FILE)
+        self.assertEqual(index.count, 5)
+        self.assertEqual(list(index.file_range(1)), [2, 3, 4])
+        self.assertEqual(list(index.file_range(5)), [])
+
+    def test_unchanged_scripts_reused(self):
+        self.extract()
+        self.translate()
+        second = self.extract()
+        self.assertEqual((second['reused'], second['parsed']), (2, 0))
+        self.assertTrue(all(line.startswith('FR ') for line in self.strings()))
+
+    def test_translations_carried_into_modified_script(self):
+        self.extract()
+        self.translate()
+        script = self.scripts / 'script.rpy'
+        script.write_text(script.read_text(encoding='utf-8') + '    "New line"\n',
+                          encoding='utf-8')
+        result = self.extract()
+        # 'Same' vient déjà de chapter.rpy, recopié tel quel
+        self.assertEqual((result['reused'], result['parsed'], result['carried']), (1, 1, 2))
+        strings = self.strings()
+        self.assertIn('New line', strings)
+        self.assertIn('FR Hello PLACEHOLDER_0youPLACEHOLDER_1.', strings)
+
+    def test_string_moved_between_files(self):
+        self.extract()
+        self.translate()
+        (self.scripts / 'chapter.rpy').write_text(
+            'label chapter:\n    "Same"\n    "Left"\n', encoding='utf-8')
+        result = self.extract()
+        self.assertEqual(result['carried'], 2)
+        self.assertIn('FR Left', self.strings())
+
+    def test_placeholder_format_change_invalidates_cache(self):
+        self.extract()
+        result = self.extract(placeholder_format='<{n}>')
+        self.assertEqual(result['reused'], 0)
+        self.assertIn('Hello <0>you<1>.', self.strings())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests de l'édition des scripts par plages de lignes (src/backend/file_content.py)
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.backend import file_content
+from src.backend.backup_manager import BackupManager
+from src.backend.file_content import FileContentStore
+
+SCRIPT = 'label start:\n    e "Hello."\n    "Bye."\n'
+
+
+class FileContentStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.scripts = base / 'Jeu' / 'game'
+        self.scripts.mkdir(parents=True)
+        self.script = self.scripts / 'script.rpy'
+        self.script.write_text(SCRIPT, encoding='utf-8')
+        self.store = FileContentStore(BackupManager(str(base)), lambda: [self.scripts])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read(self, start: int = 1, end=None):
+        result = self.store.read_lines(self.script, start, end)
+        self.assertTrue(result['success'], result['error'])
+        return result
+
+    def replace(self, start: int, end: int, lines, version=None):
+        return self.store.replace_lines(self.script, start, end, lines, version=version)
+
+    def test_read_range(self):
+        result = self.read(2, 3)
+        self.assertEqual((result['lines'], result['totalLines']),
+                         (['    e "Hello."', '    "Bye."'], 3))
+        self.assertEqual(self.read(3, 99)['lines'], ['    "Bye."'])
+
+    def test_read_bounded(self):
+        self.script.write_text(''.join(f'    "{n}"\n' for n in range(20)), encoding='utf-8')
+        with mock.patch.object(file_content, 'MAX_RANGE_LINES', 5):
+            result = self.read(4)
+        self.assertEqual((result['start'], result['end'], len(result['lines'])), (4, 8, 5))
+
+    def test_replace_keeps_other_bytes(self):
+        version = self.read()['version']
+        result = self.replace(2, 2, ['    e "Bonjour."', '    e "Ça va ?"'], version)
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(result['totalLines'], 4)
+        self.assertNotEqual(result['version'], version)
+        self.assertEqual(self.script.read_text(encoding='utf-8'),
+                         'label start:\n    e "Bonjour."\n    e "Ça va ?"\n    "Bye."\n')
+        self.assertIsNotNone(result['backupId'])
+
+    def test_crlf_kept(self):
+        self.script.write_bytes(SCRIPT.replace('\n', '\r\n').encode('utf-8'))
+        self.assertTrue(self.replace(3, 3, ['    "Salut."'])['success'])
+        self.assertEqual(self.script.read_bytes(),
+                         b'label start:\r\n    e "Hello."\r\n    "Salut."\r\n')
+
+    def test_delete(self):
+        self.assertTrue(self.replace(2, 2, [])['success'])
+        self.assertEqual(self.script.read_text(encoding='utf-8'),
+                         'label start:\n    "Bye."\n')
+        # Dernière ligne: la fin de ligne qui la précède part avec elle, la
+        # fin de ligne finale du fichier reste
+        self.assertTrue(self.replace(2, 2, [])['success'])
+        self.assertEqual(self.script.read_text(encoding='utf-8'), 'label start:\n')
+
+    def test_delete_all_then_insert(self):
+        self.assertTrue(self.replace(1, 3, [])['success'])
+        self.assertEqual(self.script.read_bytes(), b'')
+        self.assertEqual(self.read()['totalLines'], 0)
+        self.assertTrue(self.replace(1, 0, ['label start:'])['success'])
+        self.assertEqual(self.script.read_text(encoding='utf-8'), 'label start:')
+
+    def test_version_conflict(self):
+        version = self.read()['version']
+        self.assertTrue(self.replace(1, 1, ['label debut_jeu:'])['success'])
+        result = self.replace(1, 1, ['label start:'], version)
+        self.assertFalse(result['success'])
+        self.assertTrue(result['conflict'])
+        self.assertIn('label debut_jeu:', self.script.read_text(encoding='utf-8'))
+
+    def test_invalid_range(self):
+        result = self.replace(3, 4, ['x'])
+        self.assertFalse(result['success'])
+        self.assertFalse(result['conflict'])
+        self.assertEqual(self.script.read_text(encoding='utf-8'), SCRIPT)
+
+    def test_path_restricted(self):
+        outside = Path(self._tmp.name) / 'outside.rpy'
+        outside.write_text(SCRIPT, encoding='utf-8')
+        notes = self.scripts / 'notes.txt'
+        notes.write_text('x', encoding='utf-8')
+        for path in (outside, notes, self.scripts / '..' / '..' / 'outside.rpy'):
+            with self.subTest(path=str(path)):
+                self.assertFalse(self.store.read_lines(path)['success'])
+                self.assertFalse(self.store.replace_lines(path, 1, 1, ['x'])['success'])
+        self.assertEqual(outside.read_text(encoding='utf-8'), SCRIPT)
+
+
+if __name__ == '__main__':
+    unittest.main()
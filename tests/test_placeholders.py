@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests de la protection des éléments Ren'Py (src/backend/placeholders.py)
+"""
+import unittest
+from unittest import mock
+
+from src.backend import placeholders
+from src.backend.placeholders import PlaceholderProtector
+
+SEPARATOR = '\x1f'
+
+
+class PlaceholderProtectorTest(unittest.TestCase):
+    """Protection puis restauration sans traduction: le texte doit revenir intact"""
+
+    def setUp(self):
+        self.protector = PlaceholderProtector()
+
+    def round_trip(self, text: str) -> str:
+        protected, tokens = self.protector.protect(text)
+        return self.protector.restore(protected, tokens)
+
+    def test_digit_after_interpolation(self):
+        self.assertEqual(self.round_trip('[day]0 days'), '[day]0 days')
+
+    def test_digit_after_tag(self):
+        self.assertEqual(self.round_trip('Day {b}1{/b}'), 'Day {b}1{/b}')
+
+    def test_tags_protected(self):
+        protected, tokens = self.protector.protect('{b}Hi{/b} [name]!')
+        self.assertEqual(protected, 'PLACEHOLDER_0HiPLACEHOLDER_1 PLACEHOLDER_2!')
+        self.assertEqual(tokens, ['{b}', '{/b}', '[name]'])
+
+    def test_suffix_keeps_protection(self):
+        protector = PlaceholderProtector('<{n}>')
+        protected, tokens = protector.protect('[day]0 days')
+        self.assertEqual((protected, tokens), ('<0>0 days', ['[day]']))
+        self.assertEqual(protector.restore(protected, tokens), '[day]0 days')
+
+    def test_merged_digit_rejected(self):
+        # Placeholder et chiffre collés (extraction précédente): rejet, pas de perte
+        self.assertIsNone(self.protector.restore('PLACEHOLDER_00 days', ['[day]']))
+
+
+
+class RestoreManyTest(unittest.TestCase):
+    """restore_many() rend exactement ce que rend restore() texte par texte"""
+
+    SOURCES = ('{b}Hi{/b} [name]!', 'Plain text.', '[a] and [b] and [c]', '{i}x{/i}',
+               'Day {b}1{/b}', 'Nothing here')
+
+    def check(self, placeholder_format: str, edit):
+        protector = PlaceholderProtector(placeholder_format)
+        texts, tokens = [], []
+        # Seul le 4e texte est modifié: son bloc est repris texte par texte
+        for position, source in enumerate(self.SOURCES * 3):
+            protected, protected_tokens = protector.protect(source)
+            texts.append(edit(protected, protector) if position == 3 else protected)
+            tokens.append(SEPARATOR.join(protected_tokens))
+        expected = [protector.restore(text, token.split(SEPARATOR) if token else [])
+                    for text, token in zip(texts, tokens)]
+        # Blocs de 4 textes protégés
+        with mock.patch.object(placeholders, 'RESTORE_BLOCK', 4):
+            self.assertEqual(protector.restore_many(texts, tokens, SEPARATOR), expected)
+        return expected
+
+    def test_intact(self):
+        for placeholder_format in ('PLACEHOLDER_{n}', '<{n}>', '__{n}__'):
+            with self.subTest(placeholder_format=placeholder_format):
+                restored = self.check(placeholder_format, lambda text, protector: text)
+                self.assertEqual(restored, list(self.SOURCES * 3))
+
+    def test_altered(self):
+        edits = {
+            'lowercase': lambda text, p: text.replace(p.placeholder(0), p.placeholder(0).lower()),
+            'invented': lambda text, p: text + p.placeholder(5),
+            'boundary': lambda text, p: text + p.placeholder('00'),
+            'lost': lambda text, p: text.replace(p.placeholder(1), ''),
+            'duplicated': lambda text, p: text + p.placeholder(0),
+            'swapped': lambda text, p: text.replace(p.placeholder(0), '#').replace(
+                p.placeholder(1), p.placeholder(0)).replace('#', p.placeholder(1)),
+            'newline': lambda text, p: text.replace(p.placeholder(1), '\n' + p.placeholder(1)),
+        }
+        for name, edit in edits.items():
+            for placeholder_format in ('PLACEHOLDER_{n}', '<{n}>'):
+                with self.subTest(edit=name, placeholder_format=placeholder_format):
+                    restored = self.check(placeholder_format, edit)
+                    # Le modèle peut changer la casse ou l'ordre des placeholders
+                    self.assertEqual(restored[3] is None,
+                                     name not in ('lowercase', 'swapped', 'newline'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests de la reconstruction des scripts traduits (src/backend/reconstruction.py)
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.backend.backup_manager import BackupManager
+from src.backend.extraction import STRINGS_FILE, extract_game
+from src.backend.reconstruction import PHASES, reconstruct_game
+
+UTF8_SCRIPT = ('label a:\n    e "Hello {b}you{/b}."\n    e "Same"\n    "Say \\"hi\\" [name]"\n'
+               '    "Hello {b}you{/b}."\n    e "Keep [x] {i}me{/i}"\n    "€uro"\n')
+CP1252_SCRIPT = 'label b:\n    "Caf\xe9 [n]"\n    "Na\xefve"\n    "Same"\n'
+UTF16_SCRIPT = 'label c:\n    "Wide [w] text"\n    "Same"\n'
+
+
+def translate(line: str) -> str:
+    """Traduction factice d'une ligne de strings.txt"""
+    if 'Keep' in line:
+        return line.replace('PLACEHOLDER_1', '')       # placeholder perdu
+    if 'Caf' in line:
+        return line.replace('Caf', 'Ca\u0159')          # non représentable en cp1252
+    if 'Na' in line:
+        return 'Naïf "cité"'
+    if 'Say' in line:
+        return line.replace('Say', 'Dis')
+    if line == 'Same':
+        return line
+    return line.upper()
+
+
+class ReconstructGameTest(unittest.TestCase):
+    """Extraction, traduction de strings.txt puis reconstruction"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.temporary_dir = self.base / '01_Temporary'
+        self.game = self.base / 'Jeu'
+        self.scripts = self.game / 'game'
+        self.scripts.mkdir(parents=True)
+        (self.scripts / 'a.rpy').write_text(UTF8_SCRIPT, encoding='utf-8')
+        (self.scripts / 'b.rpy').write_bytes(CP1252_SCRIPT.encode('cp1252'))
+        (self.scripts / 'c.rpy').write_text(UTF16_SCRIPT, encoding='utf-16')
+        result = extract_game(str(self.game), self.temporary_dir)
+        self.assertTrue(result['success'], result['error'])
+        self.strings = self.temporary_dir / 'Jeu' / STRINGS_FILE
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def translate(self, function=translate):
+        lines = self.strings.read_text(encoding='utf-8').split('\n')
+        self.strings.write_text('\n'.join(map(function, lines)), encoding='utf-8')
+
+    def reconstruct(self):
+        return reconstruct_game(str(self.game), self.temporary_dir,
+                                BackupManager(str(self.base)))
+
+    def test_round_trip(self):
+        self.translate()
+        result = self.reconstruct()
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual((result['rewritten'], result['translated'], result['rejected']),
+                         (3, 6, 2))
+        self.assertEqual(set(result['phases']), set(PHASES))
+
+        # Doublons remplacés partout, guillemets échappés, placeholders restaurés
+        self.assertEqual(
+            (self.scripts / 'a.rpy').read_text(encoding='utf-8'),
+            'label a:\n    e "HELLO {b}YOU{/b}."\n    e "Same"\n    "Dis \\"hi\\" [name]"\n'
+            '    "HELLO {b}YOU{/b}."\n    e "Keep [x] {i}me{/i}"\n    "€URO"\n')
+        self.assertEqual((self.scripts / 'b.rpy').read_bytes().decode('cp1252'),
+                         'label b:\n    "Caf\xe9 [n]"\n    "Na\xeff \\"cit\xe9\\""\n    "Same"\n')
+        self.assertEqual((self.scripts / 'c.rpy').read_text(encoding='utf-16'),
+                         'label c:\n    "WIDE [w] TEXT"\n    "Same"\n')
+
+        # Chaînes rejetées: littéral d'origine conservé et motif rapporté
+        issues = {(issue['file'], issue['line']): issue['error'] for issue in result['issues']}
+        self.assertEqual(issues[('a.rpy', 6)], 'Placeholders altérés')
+        self.assertIn('non représentable en cp1252', issues[('b.rpy', 2)])
+
+    def test_rerun_after_correction(self):
+        self.translate()
+        self.assertTrue(self.reconstruct()['success'])
+        # Correction de la traduction rejetée, sans ré-extraire
+        self.translate(lambda line: 'Garde PLACEHOLDER_0 PLACEHOLDER_1moiPLACEHOLDER_2'
+                       if line.startswith('Keep') else line)
+        result = self.reconstruct()
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(result['errors'], [])
+        self.assertIn('e "Garde [x] {i}moi{/i}"', (self.scripts / 'a.rpy').read_text(
+            encoding='utf-8'))
+        self.assertEqual(result['rejected'], 1)
+
+    def test_incomplete_strings_rejected(self):
+        lines = self.strings.read_text(encoding='utf-8').split('\n')
+        self.strings.write_text('\n'.join(lines[1:]), encoding='utf-8')
+        result = self.reconstruct()
+        self.assertFalse(result['success'])
+        self.assertIn(STRINGS_FILE, result['error'])
+        self.assertEqual((self.scripts / 'a.rpy').read_text(encoding='utf-8'), UTF8_SCRIPT)
+
+
+if __name__ == '__main__':
+    unittest.main()
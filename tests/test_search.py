@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index de recherche (src/backend/search.py)
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.backend.extraction import extract_game
+from src.backend.search import search_game, update_search_index
+
+SCRIPT = '''label start:
+    e "Bonjour, je m'appelle Eileen."
+    "Il fait beau aujourd'hui."
+'''
+
+
+class SearchGameTest(unittest.TestCase):
+    """Recherche dans l'extraction d'un jeu dont le dossier a un nom quelconque"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.temporary_dir = self.base / '01_Temporary'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def extract(self, name: str) -> Path:
+        game = self.base / name / 'game'
+        game.mkdir(parents=True)
+        (game / 'script.rpy').write_text(SCRIPT, encoding='utf-8')
+        result = extract_game(str(game.parent), self.temporary_dir)
+        self.assertTrue(result['success'], result['error'])
+        return self.temporary_dir / name
+
+    def test_special_characters_in_game_folder(self):
+        for name in ('Game #2', 'Quoi ?', 'Cent %25'):
+            with self.subTest(name=name):
+                output_dir = self.extract(name)
+                result = search_game(self.temporary_dir, name, 'Eileen')
+                self.assertTrue(result['success'], result['error'])
+                self.assertEqual(result['total'], 1)
+                self.assertEqual(result['hits'][0]['line'], 2)
+                # Index relu, pas reconstruit à chaque recherche
+                self.assertFalse(update_search_index(output_dir)['rebuilt'])
+
+    def test_short_query(self):
+        self.extract('Jeu')
+        result = search_game(self.temporary_dir, 'Jeu', 'fa')
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(result['total'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
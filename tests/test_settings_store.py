@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests du magasin de paramètres (src/backend/settings_store.py): version,
+ETag et réponse 304 de GET /api/settings
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from flask import Flask, jsonify, request
+
+from src.backend.settings_schema import settings_schema
+from src.backend.settings_store import SettingsStore
+
+
+class SettingsStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.file_path = Path(self._tmp.name) / 'app_settings.json'
+        self.store = self.create_store()
+
+    def tearDown(self):
+        self.store.flush()
+        self._tmp.cleanup()
+
+    def create_store(self) -> SettingsStore:
+        # Écriture déclenchée par flush() uniquement
+        return SettingsStore(self.file_path, settings_schema.defaults(),
+                             validator=settings_schema.validate,
+                             migrator=settings_schema.migrate,
+                             schema_version=settings_schema.version,
+                             debounce_seconds=60, max_delay_seconds=60)
+
+    def test_only_effective_changes_bump_version(self):
+        etag = self.store.etag()
+        data, version, rejected = self.store.update({'theme': 'light', 'bogus': 1})
+        self.assertEqual((data['theme'], version), ('light', 1))
+        self.assertEqual(rejected, ['bogus: clé inconnue'])
+        self.assertNotEqual(self.store.etag(), etag)
+
+        # Même valeur: ni nouvelle version ni nouvel ETag
+        etag = self.store.etag()
+        self.assertEqual(self.store.update({'theme': 'light'})[1], 1)
+        self.assertEqual(self.store.etag(), etag)
+
+    def test_nested_update_keeps_siblings(self):
+        data, _, _ = self.store.update({'extraction': {'encoding': 'cp1252'}})
+        self.assertEqual(data['extraction'], {'placeholderFormat': 'PLACEHOLDER_{n}',
+                                              'encoding': 'cp1252'})
+
+    def test_flush_and_reload(self):
+        self.store.update({'theme': 'light'})
+        self.store.flush()
+        saved = json.loads(self.file_path.read_text(encoding='utf-8'))
+        self.assertEqual((saved['theme'], saved['schemaVersion']),
+                         ('light', settings_schema.version))
+
+        reloaded = self.create_store()
+        reloaded.load()
+        self.assertEqual(reloaded.snapshot()[0]['theme'], 'light')
+
+    def test_etag_changes_between_launches(self):
+        # Un ETag d'un lancement précédent n'est jamais repris
+        with mock.patch('src.backend.settings_store.time.time', return_value=1000.0):
+            first = self.create_store()
+        with mock.patch('src.backend.settings_store.time.time', return_value=2000.0):
+            second = self.create_store()
+        self.assertEqual((first.version, second.version), (0, 0))
+        self.assertNotEqual(first.etag(), second.etag())
+
+
+class ConditionalGetTest(unittest.TestCase):
+    """Réponse conditionnelle telle que construite par GET /api/settings"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = SettingsStore(Path(self._tmp.name) / 'app_settings.json',
+                                   settings_schema.defaults(), debounce_seconds=60)
+        app = Flask(__name__)
+
+        @app.route('/api/settings')
+        def get_settings():
+            data, version = self.store.snapshot()
+            response = jsonify({'success': True, 'data': data, 'version': version})
+            response.set_etag(self.store.etag(version))
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.store.flush()
+        self._tmp.cleanup()
+
+    def test_not_modified_until_update(self):
+        first = self.client.get('/api/settings')
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+
+        cached = self.client.get('/api/settings', headers={'If-None-Match': etag})
+        self.assertEqual((cached.status_code, cached.data), (304, b''))
+
+        self.store.update({'theme': 'light'})
+        changed = self.client.get('/api/settings', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.get_json()['data']['theme'], 'light')
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+
+if __name__ == '__main__':
+    unittest.main()
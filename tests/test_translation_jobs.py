@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests des jobs de traduction en arrière-plan (src/backend/translation_jobs.py)
+"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from src.backend.translation_jobs import JobStatus, TranslationJobManager
+from src.backend.translation_runner import TranslationCancelled
+from src.backend.translation_worker import WorkerError
+
+PARAMS = {'inputFolder': 'tl', 'modelPath': 'stub:'}
+
+
+class FakePool:
+    """Pool de workers réduite à ce qu'utilise le gestionnaire de jobs"""
+
+    on_stderr = None
+
+    def __init__(self):
+        self.killed = threading.Event()
+
+    def kill(self):
+        self.killed.set()
+
+
+def runner_raising(error: BaseException):
+    class Runner:
+        def __init__(self, worker, **options):
+            self.log = options['log']
+
+        def run(self, *args, **kwargs):
+            self.log('Démarrage')
+            raise error
+    return Runner
+
+
+class TranslationJobManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.pool = FakePool()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def manager(self, runner_factory) -> TranslationJobManager:
+        return TranslationJobManager(self.pool, Path(self._tmp.name), None,
+                                     runner_factory=runner_factory)
+
+    def wait(self, job, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while job.status not in JobStatus.FINISHED and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn(job.status, JobStatus.FINISHED)
+
+    def test_success(self):
+        class Runner:
+            def __init__(self, worker, **options):
+                pass
+
+            def run(self, *args, **kwargs):
+                return {'lines': 3}
+
+        manager = self.manager(Runner)
+        job = manager.start(dict(PARAMS))
+        self.wait(job)
+        self.assertEqual((job.status, job.report, job.error),
+                         (JobStatus.SUCCEEDED, {'lines': 3}, None))
+        self.assertIsNone(manager.active)
+
+    def test_known_error(self):
+        job = self.manager(runner_raising(WorkerError('worker mort'))).start(dict(PARAMS))
+        self.wait(job)
+        self.assertEqual((job.status, job.error), (JobStatus.FAILED, 'worker mort'))
+
+    def test_unexpected_error(self):
+        manager = self.manager(runner_raising(TypeError('argument inattendu')))
+        job = manager.start(dict(PARAMS))
+        self.wait(job)
+        self.assertEqual((job.status, job.error), (JobStatus.FAILED, 'argument inattendu'))
+        self.assertIn('Erreur: argument inattendu',
+                      [line['line'] for line in job.logs.read()['lines']])
+        # L'emplacement est libéré: un nouveau job peut démarrer
+        self.wait(manager.start(dict(PARAMS)))
+
+    def test_cancel(self):
+        started = threading.Event()
+
+        class Runner:
+            def __init__(self, worker, **options):
+                self.should_cancel = options['should_cancel']
+
+            def run(self, *args, **kwargs):
+                started.set()
+                while not self.should_cancel():
+                    time.sleep(0.01)
+                raise TranslationCancelled()
+
+        manager = self.manager(Runner)
+        job = manager.start(dict(PARAMS))
+        self.assertTrue(started.wait(5))
+        self.assertTrue(manager.cancel(job.id))
+        self.wait(job)
+        self.assertEqual(job.status, JobStatus.CANCELLED)
+        self.assertTrue(self.pool.killed.is_set())
+        self.assertFalse(manager.cancel(job.id))
+
+    def test_error_after_cancel_is_cancel(self):
+        # L'arrêt du worker fait échouer la requête en cours: c'est une annulation
+        started, release = threading.Event(), threading.Event()
+
+        class Runner:
+            def __init__(self, worker, **options):
+                pass
+
+            def run(self, *args, **kwargs):
+                started.set()
+                release.wait(5)
+                raise WorkerError('Le worker de traduction a été arrêté')
+
+        manager = self.manager(Runner)
+        job = manager.start(dict(PARAMS))
+        self.assertTrue(started.wait(5))
+        manager.cancel(job.id)
+        release.set()
+        self.wait(job)
+        self.assertEqual((job.status, job.error), (JobStatus.CANCELLED, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
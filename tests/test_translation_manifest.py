@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests des runs incrémentaux (src/backend/translation_manifest.py et
+TranslationRunner.run)
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from src.backend.translation_backends import STUB_PREFIX
+from src.backend.translation_manifest import TranslationManifest
+from src.backend.translation_runner import TranslationRunner
+
+MODEL = STUB_PREFIX + 'test'
+
+TL_SCRIPT = '''translate french start_1:
+
+    # e "Hello."
+    e "Hello."
+
+translate french start_2:
+
+    # e "Hi [name]!"
+    e "Hi [name]!"
+'''
+
+
+class FakeWorker:
+    """Worker en mémoire: préfixe 'FR ', ou perd les placeholders si demandé"""
+
+    backend = 'stub'
+
+    def __init__(self):
+        self.drop_placeholders = False
+        self.texts: List[str] = []
+
+    def translate(self, texts, model, source, target, backend):
+        self.texts.extend(texts)
+        if self.drop_placeholders:
+            return ['FR ' + text.split('PLACEHOLDER')[0] for text in texts]
+        return ['FR ' + text for text in texts]
+
+
+class TranslationManifestTest(unittest.TestCase):
+    """Un fichier n'est sauté que s'il a été entièrement traduit"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.folder = base / 'tl'
+        self.folder.mkdir()
+        self.script = self.folder / 'script.rpy'
+        self.script.write_text(TL_SCRIPT, encoding='utf-8')
+        self.worker = FakeWorker()
+        self.runner = TranslationRunner(self.worker, log=lambda line: None,
+                                        manifest_dir=base / 'manifests')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_folder(self, force: bool = False):
+        self.worker.texts = []
+        return self.runner.run(str(self.folder), False, MODEL, 'en', 'fr', force=force)
+
+    def test_unchanged_file_skipped(self):
+        first = self.run_folder()
+        self.assertEqual((first['lines'], first['filesSkipped']), (2, 0))
+        second = self.run_folder()
+        self.assertEqual((second['lines'], second['filesSkipped']), (0, 1))
+        self.assertEqual(self.worker.texts, [])
+
+    def test_modified_file_retranslated(self):
+        self.run_folder()
+        with open(self.script, 'a', encoding='utf-8') as f:
+            f.write('\ntranslate french start_3:\n\n    # e "Bye."\n    e "Bye."\n')
+        result = self.run_folder()
+        self.assertEqual((result['lines'], result['filesSkipped']), (1, 0))
+        self.assertEqual(self.worker.texts, ['Bye.'])
+
+    def test_same_size_touched_file_hashed(self):
+        self.run_folder()
+        stat = self.script.stat()
+        os.utime(self.script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        result = self.run_folder()
+        self.assertEqual((result['filesSkipped'], result['hashedFiles']), (1, 1))
+
+    def test_rejected_lines_retried(self):
+        self.worker.drop_placeholders = True
+        first = self.run_folder()
+        self.assertEqual((first['lines'], first['placeholderErrors']), (1, 1))
+        self.assertIn('FR Hello.', self.script.read_text(encoding='utf-8'))
+
+        # Le fichier n'est pas marqué comme fait: seule la ligne rejetée repart
+        self.worker.drop_placeholders = False
+        second = self.run_folder()
+        self.assertEqual((second['lines'], second['filesSkipped']), (1, 0))
+        self.assertEqual(self.worker.texts, ['Hi PLACEHOLDER_0!'])
+        self.assertIn('FR Hi [name]!', self.script.read_text(encoding='utf-8'))
+
+        third = self.run_folder()
+        self.assertEqual(third['filesSkipped'], 1)
+
+    def test_forget(self):
+        manifest = TranslationManifest(Path(self._tmp.name) / 'm.json',
+                                       str(self.folder), {'model': MODEL})
+        manifest.record(self.script, 'script.rpy')
+        self.assertTrue(manifest.is_unchanged(self.script, 'script.rpy'))
+        manifest.forget('script.rpy')
+        self.assertFalse(manifest.is_unchanged(self.script, 'script.rpy'))
+
+    def test_signature_change_invalidates(self):
+        self.run_folder()
+        result = self.runner.run(str(self.folder), False, MODEL, 'en', 'de')
+        self.assertEqual(result['filesSkipped'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests de la mémoire de traduction (src/backend/translation_memory.py)
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.backend.translation_memory import (MEMORY_FORMAT_VERSION, TranslationMemory,
+                                            memory_key, open_translation_memory)
+
+
+class TranslationMemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.file_path = Path(self._tmp.name) / 'translation_memory.json'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_least_recently_used_evicted(self):
+        memory = TranslationMemory(self.file_path, max_entries=2)
+        memory.store({'a': 'A', 'b': 'B'})
+        # 'a' relue: 'b' devient la plus ancienne
+        self.assertEqual(memory.lookup(['a']), {'a': 'A'})
+        memory.store({'c': 'C'})
+        self.assertEqual(memory.lookup(['a', 'b', 'c']), {'a': 'A', 'c': 'C'})
+        self.assertEqual(memory.stats()['entries'], 2)
+
+    def test_stats(self):
+        memory = TranslationMemory(self.file_path)
+        memory.store({'a': 'A'})
+        memory.lookup(['a', 'b', 'a', 'c'])
+        stats = memory.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hitRate']), (2, 2, 0.5))
+
+    def test_flush_keeps_lru_order(self):
+        memory = TranslationMemory(self.file_path, max_entries=3)
+        memory.store({'a': 'A', 'b': 'B', 'c': 'C'})
+        memory.lookup(['a'])
+        memory.flush()
+
+        # Relue avec une taille plus petite: les plus anciennes partent
+        reloaded = TranslationMemory(self.file_path, max_entries=2)
+        self.assertEqual(reloaded.lookup(['a', 'b', 'c']), {'a': 'A', 'c': 'C'})
+
+    def test_other_format_version_ignored(self):
+        self.file_path.write_text(json.dumps({'version': MEMORY_FORMAT_VERSION - 1,
+                                              'entries': [['a', 'A']]}), encoding='utf-8')
+        self.assertEqual(TranslationMemory(self.file_path).lookup(['a']), {})
+
+    def test_unreadable_file_starts_empty(self):
+        self.file_path.write_text('{', encoding='utf-8')
+        memory = TranslationMemory(self.file_path)
+        self.assertEqual(memory.lookup(['a']), {})
+        memory.store({'a': 'A'})
+        memory.flush()
+        self.assertEqual(TranslationMemory(self.file_path).lookup(['a']), {'a': 'A'})
+
+    def test_clear(self):
+        memory = TranslationMemory(self.file_path)
+        memory.store({'a': 'A'})
+        memory.clear()
+        self.assertEqual(TranslationMemory(self.file_path).stats()['entries'], 0)
+
+    def test_key(self):
+        key = memory_key('Hello', 'auto', 'fra_Latn', 'model', 'fp32')
+        self.assertNotEqual(key, memory_key('Hello', 'auto', 'fra_Latn', 'model', 'int8'))
+        self.assertNotEqual(key, memory_key('Hello', 'auto', 'deu_Latn', 'model', 'fp32'))
+        self.assertEqual(key, memory_key('Hello', '', 'fra_Latn', 'model', 'fp32'))
+
+    def test_disabled(self):
+        self.assertIsNone(open_translation_memory(self.file_path, 0))
+        self.assertIsNone(open_translation_memory(None, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
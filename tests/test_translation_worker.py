@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests du protocole du worker de traduction persistant
+(src/backend/translation_worker.py), avec le backend factice 'stub:'
+"""
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.backend.translation_backends import STUB_PREFIX
+from src.backend.translation_worker import TranslationWorkerClient, WorkerError
+
+
+class ScriptedProcess:
+    """Processus factice dont stdout rejoue des lignes; un callable est
+    appelé à la place d'une ligne (action concurrente pendant la lecture)"""
+
+    pid = 0
+
+    def __init__(self, lines):
+        self.stdin = io.StringIO()
+        self.stdout = self
+        self._lines = list(lines)
+        self.returncode = None
+
+    def readline(self) -> str:
+        while self._lines:
+            line = self._lines.pop(0)
+            if callable(line):
+                line()
+                continue
+            return line
+        return ''
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+class TranslationWorkerClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TranslationWorkerClient(idle_timeout=0)
+        self.client.on_stderr = lambda line: None
+
+    def tearDown(self):
+        self.client.stop()
+
+    def test_translate_keeps_worker(self):
+        self.assertEqual(self.client.translate(['Hello'], STUB_PREFIX + 'upper', 'en', 'fr'),
+                         ['HELLO'])
+        pid = self.client.status()['pid']
+        self.assertEqual(self.client.translate(['Bye'], STUB_PREFIX + 'upper', 'en', 'fr'),
+                         ['BYE'])
+        self.assertEqual(self.client.status()['pid'], pid)
+
+    def test_restart_after_kill(self):
+        self.client.request('ping')
+        self.client.kill()
+        self.assertFalse(self.client.is_running())
+        self.assertTrue(self.client.request('ping')['ok'])
+
+    def test_kill_during_request(self):
+        # Traduction longue annulée depuis un autre thread
+        errors = []
+
+        def translate():
+            try:
+                self.client.translate(['x' * 20000], STUB_PREFIX + 'cpu', 'en', 'fr')
+            except WorkerError as e:
+                errors.append(e)
+
+        self.client.request('ping')
+        thread = threading.Thread(target=translate)
+        thread.start()
+        time.sleep(0.3)
+        self.client.kill()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_output_noise_skipped(self):
+        self.client.process = ScriptedProcess(['Loading...\n', '{"ok": true, "id": 1}\n'])
+        self.assertTrue(self.client.request('ping')['ok'])
+
+    def test_kill_while_skipping_noise(self):
+        # kill() retire le processus pendant la lecture d'une ligne parasite
+        self.client.process = ScriptedProcess([self.client.kill, 'Loading...\n',
+                                               '{"ok": true, "id": 1}\n'])
+        with mock.patch('src.backend.translation_worker.kill_process_tree'):
+            with self.assertRaises(WorkerError):
+                self.client.request('ping')
+        self.assertIsNone(self.client.process)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests de la vérification des scripts reconstruits (src/backend/verification.py)
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.backend import verification
+from src.backend.backup_manager import BackupManager
+from src.backend.extraction import STRINGS_FILE, extract_game
+from src.backend.reconstruction import reconstruct_game
+
+SCRIPTS = {
+    'script.rpy': 'label start:\n    e "Hello {b}you{/b}."\n    "Nice day."\n',
+    'chapter.rpy': 'label chapter:\n    e "Hi [name]!"\n    "Bye."\n',
+    'ending.rpy': 'label ending:\n    "The end."\n',
+}
+
+
+class VerifyGameTest(unittest.TestCase):
+    """Les problèmes relevés ne dépendent pas du nombre de processus"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.temporary_dir = base / '01_Temporary'
+        self.reports_dir = base / '02_Reports'
+        self.game = base / 'Jeu'
+        scripts = self.game / 'game'
+        scripts.mkdir(parents=True)
+        for name, text in SCRIPTS.items():
+            (scripts / name).write_text(text, encoding='utf-8')
+
+        self.assertTrue(extract_game(str(self.game), self.temporary_dir)['success'])
+        strings = self.temporary_dir / 'Jeu' / STRINGS_FILE
+        strings.write_text(strings.read_text(encoding='utf-8').upper(), encoding='utf-8')
+        rebuilt = reconstruct_game(str(self.game), self.temporary_dir,
+                                   BackupManager(str(base)))
+        self.assertTrue(rebuilt['success'], rebuilt['error'])
+
+        # Balise cassée après reconstruction
+        script = scripts / 'script.rpy'
+        script.write_text(script.read_text(encoding='utf-8').replace('{/b}', '{/b'),
+                          encoding='utf-8')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def verify(self, max_workers: int):
+        result = verification.verify_game(str(self.game), self.temporary_dir,
+                                          self.reports_dir, max_workers=max_workers)
+        self.assertTrue(result['success'], result['error'])
+        return result
+
+    def test_pool_matches_serial(self):
+        serial = self.verify(1)
+        self.assertEqual((serial['verified'], serial['processes']), (3, 1))
+        self.assertGreater(serial['kinds']['tag'], 0)
+        self.assertEqual({issue['file'] for issue in serial['details']}, {'script.rpy'})
+
+        with mock.patch.object(verification, 'POOL_MIN_BYTES', 0):
+            pooled = self.verify(2)
+        self.assertEqual(pooled['processes'], 2)
+        for key in ('verified', 'lines', 'issues', 'kinds', 'details'):
+            self.assertEqual(pooled[key], serial[key], key)
+
+    def test_small_game_not_pooled(self):
+        self.assertEqual(self.verify(2)['processes'], 1)
+
+    def test_spawn_platform_not_pooled(self):
+        # Sans fork ni exécutable, les enfants relanceraient l'application
+        with mock.patch.object(verification, 'POOL_MIN_BYTES', 0), \
+                mock.patch.object(verification.sys, 'platform', 'win32'):
+            self.assertEqual(self.verify(2)['processes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()